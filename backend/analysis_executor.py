@@ -0,0 +1,187 @@
+"""Process pool for CPU-bound text analysis
+
+Mood analysis is pure Python and holds the GIL, so a long journal entry
+analyzed on a Flask worker thread stalls every other request served by that
+worker. AnalysisExecutor runs the analysis in a pool of child processes, each
+holding a warm MoodAnalyzer, and bounds how much work may queue up.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+
+class ExecutorBusy(Exception):
+    """Raised when too many analyses are already queued or running"""
+
+
+class AnalysisTimeout(Exception):
+    """Raised when an analysis does not finish within the timeout"""
+
+
+# Set in each child process by init_worker
+_analyzer = None
+
+
+def init_worker(lexicon_path, sentiment_backend, sentiment_lexicon_path):
+    """Pool initializer: build the child's analyzer once, when the process starts"""
+    global _analyzer
+    from models.ai_models import MoodAnalyzer
+    from models.sentiment import create_sentiment_backend
+    sentiment = create_sentiment_backend(sentiment_backend, sentiment_lexicon_path)
+    _analyzer = MoodAnalyzer(lexicon_path=lexicon_path, sentiment=sentiment)
+
+
+def worker_analyzer():
+    """The analyzer built by init_worker in this child process"""
+    return _analyzer
+
+
+def _analyze_text(text):
+    return _analyzer.analyze_text(text)
+
+
+def _analyze_sections(text, chunk_chars, max_sections):
+    return _analyzer.analyze_sections(text, chunk_chars=chunk_chars, max_sections=max_sections)
+
+
+class AnalysisExecutor:
+    """
+    Runs mood analysis in child processes
+
+    Texts shorter than ``min_chars`` are analyzed inline by ``inline_analyzer``
+    because shipping them to a child costs more than analyzing them. Results
+    go through ``cache`` (an AnalysisCache) in the parent, so repeated texts
+    never reach the pool. A timed-out analysis keeps running in its child
+    and counts against ``max_pending`` until it finishes. When a child dies
+    (for example killed for running out of memory) the broken pool is
+    replaced and the analysis retried once; a second failure raises
+    ExecutorBusy.
+    """
+
+    def __init__(self, inline_analyzer, workers=None, max_pending=64, timeout=10.0,
+                 min_chars=2000, cache=None, lexicon_path=None,
+                 sentiment_backend='lexicon', sentiment_lexicon_path=None):
+        self.inline_analyzer = inline_analyzer
+        self.workers = workers or multiprocessing.cpu_count()
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.min_chars = min_chars
+        self.cache = cache
+        self._initargs = (lexicon_path, sentiment_backend, sentiment_lexicon_path)
+        self._pool = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._counters = {'submitted': 0, 'inline': 0, 'rejected': 0, 'timeouts': 0, 'restarts': 0}
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn: children must not inherit the server's threads or sqlite handles
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=init_worker,
+                    initargs=self._initargs
+                )
+            return self._pool
+
+    def _release(self, future):
+        with self._lock:
+            self._pending -= 1
+
+    def _discard_pool(self, pool):
+        """Drop a broken pool so the next submit starts a fresh one"""
+        with self._lock:
+            if self._pool is not pool:
+                return  # another thread already replaced it
+            self._pool = None
+            self._counters['restarts'] += 1
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def analyze_text(self, text, timeout=None):
+        """Analyze text, in a child process when it is long enough to be worth it"""
+        if not text or len(text) < self.min_chars:
+            with self._lock:
+                self._counters['inline'] += 1
+            return self.inline_analyzer.analyze_text(text)
+
+        if self.cache is not None:
+            key = self.cache.key_for(text)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        result = self._run(timeout, _analyze_text, text)
+        if self.cache is not None:
+            self.cache.put(key, result)
+        return result
+
+    def analyze_sections(self, text, chunk_chars=4000, max_sections=20, timeout=None):
+        """Chunked analysis with per-section scores (MoodAnalyzer.analyze_sections)"""
+        if not text or len(text) < self.min_chars:
+            with self._lock:
+                self._counters['inline'] += 1
+            return self.inline_analyzer.analyze_sections(
+                text, chunk_chars=chunk_chars, max_sections=max_sections
+            )
+        return self._run(timeout, _analyze_sections, text, chunk_chars, max_sections)
+
+    def _run(self, timeout, fn, *args):
+        """Submit fn(*args) to the pool, retrying once on a fresh pool if a child died"""
+        for _ in range(2):
+            pool = self._get_pool()
+            try:
+                return self._submit(pool, timeout, fn, *args)
+            except BrokenProcessPool:
+                self._discard_pool(pool)
+        raise ExecutorBusy('Analysis worker process stopped unexpectedly')
+
+    def _submit(self, pool, timeout, fn, *args):
+        """Submit fn(*args) to pool, enforcing the queue limit and timeout"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._counters['rejected'] += 1
+                raise ExecutorBusy(f'Analysis queue is full ({self.max_pending} pending)')
+            self._pending += 1
+            self._counters['submitted'] += 1
+        try:
+            future = pool.submit(fn, *args)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            return future.result(timeout=self.timeout if timeout is None else timeout)
+        except FutureTimeout:
+            future.cancel()  # only succeeds if it has not started yet
+            with self._lock:
+                self._counters['timeouts'] += 1
+            raise AnalysisTimeout('Text analysis timed out')
+
+    def warmup(self):
+        """Start every child process and build its analyzer now"""
+        pool = self._get_pool()
+        futures = [pool.submit(_analyze_text, 'warmup') for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def shutdown(self):
+        """Stop the child processes, dropping queued work"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        """Return pool size, current queue depth and lifetime counters"""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'started': self._pool is not None,
+                'pending': self._pending,
+                'max_pending': self.max_pending,
+                'min_chars': self.min_chars,
+                **self._counters
+            }
@@ -1,15 +1,24 @@
 """Main Flask application for MindTrack backend"""
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
 import bcrypt
-from datetime import datetime
 import json
 import sqlite3
 
 from config import Config
-from database import get_db
-from models.ai_models import MoodAnalyzer, CognitiveAnalyzer, RecommendationEngine, WellnessChatbot
+from database import get_db, parse_timestamp, utc_timestamp, timestamp_days_ago
+import rollups
+import keywords
+import similarity
+import cognitive_trends
+from user_state import adjust_counter, get_user_state, refresh_latest, reset_counter
+from pagination import InvalidCursor, paginate
+import search
+import telemetry
+from ingestion import HEALTH_COLUMNS, game_type_error, parse_ndjson, validate_game_results, validate_health_samples
+from models.registry import ModelRegistry
+from analysis_executor import AnalysisTimeout, ExecutorBusy
 
 app = Flask(__name__)
 app.config.from_object(Config)
@@ -18,11 +27,88 @@ app.config.from_object(Config)
 CORS(app, resources={r"/api/*": {"origins": Config.CORS_ORIGINS}})
 jwt = JWTManager(app)
 
-# Initialize AI models
-mood_analyzer = MoodAnalyzer()
-cognitive_analyzer = CognitiveAnalyzer()
-recommendation_engine = RecommendationEngine()
-wellness_chatbot = WellnessChatbot()
+# AI models are imported and built lazily, on first use
+model_registry = ModelRegistry()
+
+
+def _build_analysis_cache():
+    from models.analysis_cache import AnalysisCache
+    return AnalysisCache(
+        max_entries=Config.ANALYSIS_CACHE_MAX_ENTRIES,
+        max_bytes=Config.ANALYSIS_CACHE_MAX_BYTES
+    )
+
+
+def _build_mood_analyzer():
+    from models.ai_models import MoodAnalyzer
+    from models.sentiment import create_sentiment_backend
+    cache = model_registry.get('analysis_cache') if Config.ANALYSIS_CACHE_ENABLED else None
+    sentiment = create_sentiment_backend(Config.SENTIMENT_BACKEND, Config.SENTIMENT_LEXICON_PATH)
+    return MoodAnalyzer(lexicon_path=Config.MOOD_LEXICON_PATH, cache=cache, sentiment=sentiment)
+
+
+def _build_cognitive_analyzer():
+    from models.ai_models import CognitiveAnalyzer
+    return CognitiveAnalyzer()
+
+
+def _build_recommendation_engine():
+    from models.ai_models import RecommendationEngine
+    return RecommendationEngine()
+
+
+def _build_wellness_chatbot():
+    # Shares the mood analyzer (and its cache) instead of building its own
+    from models.ai_models import WellnessChatbot
+    return WellnessChatbot(mood_analyzer=model_registry.get('mood_analyzer'))
+
+
+def _build_analysis_executor():
+    import atexit
+    from analysis_executor import AnalysisExecutor
+    executor = AnalysisExecutor(
+        model_registry.get('mood_analyzer'),
+        workers=Config.ANALYSIS_EXECUTOR_WORKERS or None,
+        max_pending=Config.ANALYSIS_EXECUTOR_MAX_PENDING,
+        timeout=Config.ANALYSIS_EXECUTOR_TIMEOUT_SECONDS,
+        min_chars=Config.ANALYSIS_EXECUTOR_MIN_CHARS,
+        cache=model_registry.get('analysis_cache') if Config.ANALYSIS_CACHE_ENABLED else None,
+        lexicon_path=Config.MOOD_LEXICON_PATH,
+        sentiment_backend=Config.SENTIMENT_BACKEND,
+        sentiment_lexicon_path=Config.SENTIMENT_LEXICON_PATH
+    )
+    atexit.register(executor.shutdown)
+    return executor
+
+
+def _build_population_index():
+    import atexit
+    from percentiles import PopulationIndex
+    index = PopulationIndex(
+        compression=Config.DIGEST_COMPRESSION,
+        persist_every=Config.DIGEST_PERSIST_EVERY,
+        persist_seconds=Config.DIGEST_PERSIST_SECONDS,
+        min_population=Config.COGNITIVE_PERCENTILE_MIN_POPULATION
+    )
+    
+    atexit.register(index.persist)
+    return index
+
+
+model_registry.register('analysis_cache', _build_analysis_cache)
+model_registry.register('mood_analyzer', _build_mood_analyzer)
+model_registry.register('cognitive_analyzer', _build_cognitive_analyzer)
+model_registry.register('recommendation_engine', _build_recommendation_engine)
+model_registry.register('wellness_chatbot', _build_wellness_chatbot)
+model_registry.register('analysis_executor', _build_analysis_executor)
+model_registry.register('population_index', _build_population_index)
+
+
+def warmup_models():
+    """Build every model now instead of on the first request"""
+    model_registry.warmup()
+    if Config.ANALYSIS_EXECUTOR_ENABLED:
+        model_registry.get('analysis_executor').warmup()
 
 
 # ============================================================================
@@ -53,6 +139,7 @@ def register():
                     (email, password_hash, full_name, date_of_birth)
                 )
                 user_id = cursor.lastrowid
+                cursor.execute('INSERT INTO user_state (user_id) VALUES (?)', (user_id,))
                 
                 # Create access token
                 access_token = create_access_token(identity=str(user_id))
@@ -97,7 +184,7 @@ def login():
             
             # Update last login
             cursor.execute('UPDATE users SET last_login = ? WHERE id = ?', 
-                         (datetime.now().isoformat(), user['id']))
+                         (utc_timestamp(), user['id']))
             
             # Create access token
             access_token = create_access_token(identity=str(user['id']))
@@ -129,16 +216,18 @@ def get_health_metrics():
         
         with get_db() as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                '''SELECT * FROM health_metrics 
-                   WHERE user_id = ? 
-                   ORDER BY timestamp DESC 
-                   LIMIT ?''',
-                (user_id, limit)
+            metrics, next_cursor, prev_cursor = paginate(
+                cursor, 'health_metrics', user_id, limit,
+                before=request.args.get('before'), after=request.args.get('after')
             )
-            metrics = [dict(row) for row in cursor.fetchall()]
             
-            return jsonify({'metrics': metrics}), 200
+            return jsonify({
+                'metrics': metrics,
+                'next_cursor': next_cursor,
+                'prev_cursor': prev_cursor
+            }), 200
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -163,12 +252,65 @@ def add_health_metrics():
                  data.get('steps'), data.get('activity_level'),
                  data.get('stress_level'))
             )
+            rollups.record_samples(cursor, 'health_metrics', user_id, [data])
+            refresh_latest(cursor, user_id, 'health_metrics')
             
             return jsonify({'message': 'Health metrics added successfully'}), 201
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/health/metrics/batch', methods=['POST'])
+@jwt_required()
+def add_health_metrics_batch():
+    """Add a batch of timestamped health samples (JSON array or NDJSON)"""
+    try:
+        user_id = int(get_jwt_identity())
+        
+        if request.mimetype in ('application/x-ndjson', 'application/ndjson'):
+            try:
+                samples = parse_ndjson(request.get_data(as_text=True))
+            except ValueError:
+                return jsonify({'error': 'Invalid NDJSON body'}), 400
+        else:
+            data = request.get_json()
+            samples = data.get('samples') if isinstance(data, dict) else data
+        
+        if not isinstance(samples, list) or not samples:
+            return jsonify({'error': 'Expected a non-empty array of samples'}), 400
+        if len(samples) > Config.HEALTH_BATCH_MAX_SAMPLES:
+            return jsonify({
+                'error': f'Batch exceeds {Config.HEALTH_BATCH_MAX_SAMPLES} samples'
+            }), 413
+        
+        rows, rejects = validate_health_samples(samples, Config.HEALTH_BATCH_MAX_FUTURE_SECONDS)
+        if not rows:
+            return jsonify({'error': 'No valid samples', 'inserted': 0, 'rejected': rejects}), 400
+        
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                '''INSERT INTO health_metrics 
+                   (user_id, timestamp, heart_rate, hrv_score, sleep_hours, 
+                    steps, stress_level, sleep_quality, activity_level)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                [(user_id,) + row for row in rows]
+            )
+            rollups.record_samples(
+                cursor, 'health_metrics', user_id,
+                [dict(zip(HEALTH_COLUMNS, row)) for row in rows]
+            )
+            refresh_latest(cursor, user_id, 'health_metrics')
+            
+            return jsonify({
+                'message': 'Health metrics batch added',
+                'inserted': len(rows),
+                'rejected': rejects
+            }), 201
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/api/health/trends', methods=['GET'])
 @jwt_required()
 def get_health_trends():
@@ -179,25 +321,22 @@ def get_health_trends():
         
         with get_db() as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                '''SELECT * FROM health_metrics 
-                   WHERE user_id = ? 
-                   AND datetime(timestamp) >= datetime('now', '-' || ? || ' days')
-                   ORDER BY timestamp ASC''',
-                (user_id, days)
+            samples, summary, daily = rollups.get_trends(
+                cursor, 'health_metrics', user_id, timestamp_days_ago(days)[:10]
             )
-            metrics = [dict(row) for row in cursor.fetchall()]
             
-            # Calculate trends
+            # Averages come from the daily rollups, so missing values are
+            # skipped rather than counted as zero
             trends = {
-                'avg_heart_rate': sum(m['heart_rate'] or 0 for m in metrics) / len(metrics) if metrics else 0,
-                'avg_sleep_hours': sum(m['sleep_hours'] or 0 for m in metrics) / len(metrics) if metrics else 0,
-                'avg_steps': sum(m['steps'] or 0 for m in metrics) / len(metrics) if metrics else 0,
-                'avg_stress_level': sum(m['stress_level'] or 0 for m in metrics) / len(metrics) if metrics else 0,
-                'data_points': len(metrics)
+                'avg_heart_rate': summary['heart_rate']['mean'],
+                'avg_sleep_hours': summary['sleep_hours']['mean'],
+                'avg_steps': summary['steps']['mean'],
+                'avg_stress_level': summary['stress_level']['mean'],
+                'data_points': samples,
+                'metrics': summary
             }
             
-            return jsonify({'trends': trends, 'data': metrics}), 200
+            return jsonify({'trends': trends, 'data': daily}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -216,7 +355,7 @@ def analyze_mood():
         text = data.get('text', '')
         
         # Perform AI analysis
-        analysis = mood_analyzer.analyze_text(text)
+        analysis = analyze_text(text)
         
         # Store in database
         with get_db() as conn:
@@ -224,17 +363,23 @@ def analyze_mood():
             cursor.execute(
                 '''INSERT INTO mood_assessments 
                    (user_id, mood_score, anxiety_level, stress_level, 
-                    depression_indicators, text_input, ai_analysis)
-                   VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                    depression_indicators, text_input, ai_analysis, analyzer_version)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
                 (user_id, analysis['mood_score'], analysis['anxiety_level'],
                  analysis['stress_level'], analysis['depression_indicators'],
-                 text, json.dumps(analysis))
+                 text, json.dumps(analysis), analyzer_version())
             )
+            rollups.record_samples(cursor, 'mood_assessments', user_id, [analysis])
+            refresh_latest(cursor, user_id, 'mood_assessments')
             
-            # Check for alerts
-            check_and_create_alerts(user_id, analysis)
+            # Check for alerts in the same transaction
+            check_and_create_alerts(cursor, user_id, analysis)
         
         return jsonify({'analysis': analysis}), 200
+    except ExecutorBusy as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
+    except AnalysisTimeout as e:
+        return jsonify({'error': str(e)}), 504
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -249,16 +394,44 @@ def get_mood_history():
         
         with get_db() as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                '''SELECT * FROM mood_assessments 
-                   WHERE user_id = ? 
-                   ORDER BY timestamp DESC 
-                   LIMIT ?''',
-                (user_id, limit)
+            history, next_cursor, prev_cursor = paginate(
+                cursor, 'mood_assessments', user_id, limit,
+                before=request.args.get('before'), after=request.args.get('after')
             )
-            history = [dict(row) for row in cursor.fetchall()]
             
-            return jsonify({'history': history}), 200
+            return jsonify({
+                'history': history,
+                'next_cursor': next_cursor,
+                'prev_cursor': prev_cursor
+            }), 200
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/mood/trends', methods=['GET'])
+@jwt_required()
+def get_mood_trends():
+    """Get mood trends from the daily rollups"""
+    try:
+        user_id = int(get_jwt_identity())
+        days = request.args.get('days', 30, type=int)
+        
+        with get_db() as conn:
+            cursor = conn.cursor()
+            samples, summary, daily = rollups.get_trends(
+                cursor, 'mood_assessments', user_id, timestamp_days_ago(days)[:10]
+            )
+            
+            trends = {
+                'avg_mood_score': summary['mood_score']['mean'],
+                'avg_anxiety_level': summary['anxiety_level']['mean'],
+                'data_points': samples,
+                'metrics': summary
+            }
+            
+            return jsonify({'trends': trends, 'data': daily}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -272,23 +445,48 @@ def create_journal_entry():
         data = request.get_json()
         content = data.get('content', '')
         
-        # Analyze sentiment
-        analysis = mood_analyzer.analyze_text(content)
+        # Analyze sentiment; long entries in chunks, with per-section scores
+        sections = None
+        if len(content) >= Config.JOURNAL_SECTIONS_MIN_CHARS:
+            analysis = analyze_sections(content)
+            sections = analysis['sections']
+        else:
+            analysis = analyze_text(content)
         
         with get_db() as conn:
             cursor = conn.cursor()
+            timestamp = utc_timestamp()
+            ranked = keywords.record_entry(
+                cursor, user_id, content, timestamp, terms=similarity.VECTOR_TERMS
+            )
+            entry_keywords = ranked[:Config.JOURNAL_KEYWORDS_TOP_K]
             cursor.execute(
                 '''INSERT INTO journal_entries 
-                   (user_id, content, sentiment_score, emotions, keywords)
-                   VALUES (?, ?, ?, ?, ?)''',
-                (user_id, content, analysis['mood_score'],
-                 json.dumps(analysis['emotions']), '')
+                   (user_id, timestamp, content, sentiment_score, emotions, keywords,
+                    sections, analyzer_version)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                (user_id, timestamp, content, analysis['mood_score'],
+                 json.dumps(analysis['emotions']),
+                 json.dumps([term for term, _ in entry_keywords]),
+                 json.dumps(sections) if sections is not None else None,
+                 analyzer_version())
             )
+            entry_id = cursor.lastrowid
+            similarity.index_entry(cursor, user_id, entry_id, ranked)
             
             return jsonify({
                 'message': 'Journal entry created',
-                'sentiment': analysis
+                'id': entry_id,
+                'sentiment': analysis,
+                'keywords': [{'term': term, 'weight': weight} for term, weight in entry_keywords],
+                'similar': similarity.get_similar_entries(
+                    cursor, user_id, entry_id, Config.JOURNAL_SIMILAR_ON_CREATE
+                )
             }), 201
+    except ExecutorBusy as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
+    except AnalysisTimeout as e:
+        return jsonify({'error': str(e)}), 504
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -301,18 +499,94 @@ def get_journal_entries():
         user_id = int(get_jwt_identity())
         limit = request.args.get('limit', 20, type=int)
         
+        with get_db() as conn:
+            cursor = conn.cursor()
+            entries, next_cursor, prev_cursor = paginate(
+                cursor, 'journal_entries', user_id, limit,
+                before=request.args.get('before'), after=request.args.get('after')
+            )
+            
+            return jsonify({
+                'entries': entries,
+                'next_cursor': next_cursor,
+                'prev_cursor': prev_cursor
+            }), 200
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/journal/themes', methods=['GET'])
+@jwt_required()
+def get_journal_themes():
+    """Get a user's top journal keywords over a window of days"""
+    try:
+        user_id = int(get_jwt_identity())
+        days = request.args.get('days', 30, type=int)
+        limit = request.args.get('limit', 10, type=int)
+        
+        with get_db() as conn:
+            themes = keywords.get_themes(
+                conn.cursor(), user_id, timestamp_days_ago(days)[:10], limit
+            )
+            
+            return jsonify({'themes': themes, 'days': days}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/journal/<int:entry_id>/similar', methods=['GET'])
+@jwt_required()
+def get_similar_journal_entries(entry_id):
+    """Get the user's past entries most similar to one of their entries"""
+    try:
+        user_id = int(get_jwt_identity())
+        limit = request.args.get('limit', 5, type=int)
+        
         with get_db() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                '''SELECT * FROM journal_entries 
-                   WHERE user_id = ? 
-                   ORDER BY timestamp DESC 
-                   LIMIT ?''',
-                (user_id, limit)
+                'SELECT id FROM journal_entries WHERE id = ? AND user_id = ?', (entry_id, user_id)
+            )
+            if not cursor.fetchone():
+                return jsonify({'error': 'Journal entry not found'}), 404
+            
+            similar = similarity.get_similar_entries(cursor, user_id, entry_id, limit)
+            return jsonify({'entry_id': entry_id, 'similar': similar}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/journal/search', methods=['GET'])
+@jwt_required()
+def search_journal():
+    """Full-text search over a user's journal entries and chat messages"""
+    try:
+        user_id = int(get_jwt_identity())
+        limit = request.args.get('limit', 20, type=int)
+        sources = request.args.get('sources', 'journal').split(',')
+        if not sources or any(source not in search.SOURCES for source in sources):
+            return jsonify({'error': f"sources must be a comma-separated list of: {', '.join(search.SOURCES)}"}), 400
+        
+        bounds = {}
+        for name in ('since', 'until'):
+            value = request.args.get(name)
+            if value:
+                parsed = parse_timestamp(value)
+                if parsed is None:
+                    return jsonify({'error': f'Invalid {name} timestamp'}), 400
+                bounds[name] = utc_timestamp(parsed)
+        
+        with get_db() as conn:
+            results, next_cursor = search.search(
+                conn.cursor(), user_id, request.args.get('q', ''), sources,
+                limit=limit, after=request.args.get('after'), **bounds
             )
-            entries = [dict(row) for row in cursor.fetchall()]
             
-            return jsonify({'entries': entries}), 200
+            return jsonify({'results': results, 'next_cursor': next_cursor}), 200
+    except (search.InvalidQuery, InvalidCursor) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -335,8 +609,12 @@ def submit_game_result():
         accuracy = data.get('accuracy', 0)
         difficulty = data.get('difficulty_level', 1)
         
+        error = game_type_error(game_type)
+        if error:
+            return jsonify({'error': error}), 400
+        
         # Analyze cognitive performance
-        analysis = cognitive_analyzer.analyze_game_result(
+        analysis = model_registry.get('cognitive_analyzer').analyze_game_result(
             game_type, score, reaction_time, accuracy, difficulty
         )
         
@@ -351,11 +629,151 @@ def submit_game_result():
                  analysis['cognitive_score'], analysis['memory_score'], 
                  analysis['focus_score'])
             )
+            assessment_id = cursor.lastrowid
+            cognitive_trends.record_assessments(cursor, user_id, assessment_id)
+            refresh_latest(cursor, user_id, 'cognitive_assessments')
             
+            # Rank against everyone else's results before adding this one
+            population = model_registry.get('population_index')
+            analysis['population_percentile'], analysis['population_size'] = population.percentile(
+                cursor, game_type, difficulty, analysis['cognitive_score']
+            )
+        
+        # Only once the insert has committed
+        population.add(game_type, difficulty, [analysis['cognitive_score']])
+        
+        return jsonify({
+            'message': 'Game result submitted',
+            'assessment_id': assessment_id,
+            'analysis': analysis
+        }), 201
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/cognitive/game-results/batch', methods=['POST'])
+@jwt_required()
+def submit_game_results_batch():
+    """Submit a batch of cognitive game results (JSON array or NDJSON)"""
+    try:
+        user_id = int(get_jwt_identity())
+        
+        if request.mimetype in ('application/x-ndjson', 'application/ndjson'):
+            try:
+                results = parse_ndjson(request.get_data(as_text=True))
+            except ValueError:
+                return jsonify({'error': 'Invalid NDJSON body'}), 400
+        else:
+            data = request.get_json()
+            results = data.get('results') if isinstance(data, dict) else data
+        
+        if not isinstance(results, list) or not results:
+            return jsonify({'error': 'Expected a non-empty array of results'}), 400
+        if len(results) > Config.COGNITIVE_BATCH_MAX_RESULTS:
             return jsonify({
-                'message': 'Game result submitted',
-                'analysis': analysis
+                'error': f'Batch exceeds {Config.COGNITIVE_BATCH_MAX_RESULTS} results'
+            }), 413
+        
+        rows, rejects = validate_game_results(results, Config.HEALTH_BATCH_MAX_FUTURE_SECONDS)
+        if not rows:
+            return jsonify({'error': 'No valid results', 'inserted': 0, 'rejected': rejects}), 400
+        
+        # Score every result in one vectorized pass
+        analyzer = model_registry.get('cognitive_analyzer')
+        timestamps, game_types, scores, reaction_times, accuracies, difficulties = zip(*rows)
+        analysis = analyzer.analyze_game_results_batch(
+            analyzer.encode_game_types(game_types), scores, reaction_times, accuracies, difficulties
+        )
+        columns = {key: values.tolist() for key, values in analysis.items()}
+        rejected = {reject['index'] for reject in rejects}
+        accepted = [index for index in range(len(results)) if index not in rejected]
+        
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                '''INSERT INTO cognitive_assessments 
+                   (user_id, timestamp, game_type, score, reaction_time, accuracy, 
+                    difficulty_level, cognitive_score, memory_score, focus_score)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                [
+                    (user_id,) + row + (cognitive, memory, focus)
+                    for row, cognitive, memory, focus in zip(
+                        rows, columns['cognitive_score'], columns['memory_score'], columns['focus_score']
+                    )
+                ]
+            )
+            # Read after the insert, inside its write transaction, so no other
+            # request's rows can fall in the range
+            cursor.execute('SELECT MAX(id) FROM cognitive_assessments')
+            first_id = cursor.fetchone()[0] - len(rows) + 1
+            cognitive_trends.record_assessments(cursor, user_id, first_id)
+            refresh_latest(cursor, user_id, 'cognitive_assessments')
+        
+        # Only once the batch has committed
+        population = model_registry.get('population_index')
+        by_key = {}
+        for row, cognitive in zip(rows, columns['cognitive_score']):
+            by_key.setdefault((row[1], row[5]), []).append(cognitive)
+        for (game_type, difficulty), scores in by_key.items():
+            population.add(game_type, difficulty, scores)
+        
+        return jsonify({
+            'message': 'Game results batch added',
+            'inserted': len(rows),
+            'rejected': rejects,
+            'results': [
+                dict(zip(columns, values), index=index)
+                for index, values in zip(accepted, zip(*columns.values()))
+            ]
+        }), 201
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/cognitive/game-result/<int:assessment_id>/telemetry', methods=['POST'])
+@jwt_required()
+def submit_game_telemetry(assessment_id):
+    """Store the per-trial data of a submitted game"""
+    try:
+        user_id = int(get_jwt_identity())
+        channels = telemetry.validate_trials(request.get_json(silent=True), Config.TELEMETRY_MAX_TRIALS)
+        
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT 1 FROM cognitive_assessments WHERE id = ? AND user_id = ?',
+                (assessment_id, user_id)
+            )
+            if cursor.fetchone() is None:
+                return jsonify({'error': 'Assessment not found'}), 404
+            stored_bytes = telemetry.store_telemetry(
+                cursor, assessment_id, user_id, channels, Config.TELEMETRY_COMPRESS
+            )
+            
+            return jsonify({
+                'message': 'Telemetry stored',
+                'stored_bytes': stored_bytes,
+                'summary': telemetry.summarize_trials(channels['reaction_times'], channels['correct'])
             }), 201
+    except telemetry.InvalidTelemetry as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/cognitive/telemetry', methods=['GET'])
+@jwt_required()
+def get_game_telemetry():
+    """Get trial-level variability of the latest games"""
+    try:
+        user_id = int(get_jwt_identity())
+        game_type = request.args.get('game_type')
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 200)
+        
+        with get_db() as conn:
+            games, pooled = telemetry.get_telemetry_summaries(conn.cursor(), user_id, game_type, limit)
+            
+            return jsonify({'games': games, 'pooled': pooled}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -372,29 +790,40 @@ def get_cognitive_assessment():
             cursor.execute(
                 '''SELECT * FROM cognitive_assessments 
                    WHERE user_id = ? 
-                   ORDER BY timestamp DESC 
+                   ORDER BY timestamp DESC, id DESC 
                    LIMIT 10''',
                 (user_id,)
             )
             assessments = [dict(row) for row in cursor.fetchall()]
             
             if assessments:
-                # Detect trends
-                trend_analysis = cognitive_analyzer.detect_decline_trend(assessments)
-                
-                # Calculate averages
-                avg_cognitive = sum(a['cognitive_score'] or 0 for a in assessments) / len(assessments)
-                avg_memory = sum(a['memory_score'] or 0 for a in assessments) / len(assessments)
-                avg_focus = sum(a['focus_score'] or 0 for a in assessments) / len(assessments)
+                # Trend and averages from the running statistics
+                analyzer = model_registry.get('cognitive_analyzer')
+                series = cognitive_trends.get_trend_stats(cursor, user_id)
+                overall = cognitive_trends.summarize(series[cognitive_trends.ALL_GAMES])
+                trend_analysis = analyzer.describe_trend(overall['slope'], overall['samples'])
+                trend_by_game = {}
+                for game_type, stats in series.items():
+                    if game_type == cognitive_trends.ALL_GAMES:
+                        continue
+                    summary = cognitive_trends.summarize(stats)
+                    trend_by_game[game_type] = dict(
+                        analyzer.describe_trend(summary['slope'], summary['samples']),
+                        samples=summary['samples'],
+                        avg_cognitive_score=round(summary['avg_cognitive_score'], 3)
+                    )
                 
                 return jsonify({
                     'summary': {
-                        'avg_cognitive_score': round(avg_cognitive, 3),
-                        'avg_memory_score': round(avg_memory, 3),
-                        'avg_focus_score': round(avg_focus, 3),
-                        'total_assessments': len(assessments)
+                        'avg_cognitive_score': round(overall['avg_cognitive_score'], 3),
+                        'avg_memory_score': round(overall['avg_memory_score'], 3),
+                        'avg_focus_score': round(overall['avg_focus_score'], 3),
+                        'total_assessments': overall['samples'],
+                        'lifetime_assessments': series[cognitive_trends.ALL_GAMES]['n'],
+                        'trend_mode': Config.COGNITIVE_TREND_MODE
                     },
                     'trend': trend_analysis,
+                    'trend_by_game': trend_by_game,
                     'recent_assessments': assessments
                 }), 200
             else:
@@ -413,19 +842,23 @@ def get_cognitive_trends():
     try:
         user_id = int(get_jwt_identity())
         days = request.args.get('days', 30, type=int)
+        limit = request.args.get('limit', 500, type=int)
         
         with get_db() as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                '''SELECT * FROM cognitive_assessments 
-                   WHERE user_id = ? 
-                   AND datetime(timestamp) >= datetime('now', '-' || ? || ' days')
-                   ORDER BY timestamp ASC''',
-                (user_id, days)
+            assessments, next_cursor, prev_cursor = paginate(
+                cursor, 'cognitive_assessments', user_id, limit,
+                before=request.args.get('before'), after=request.args.get('after'),
+                descending=False, where='timestamp >= ?', params=(timestamp_days_ago(days),)
             )
-            assessments = [dict(row) for row in cursor.fetchall()]
             
-            return jsonify({'trends': assessments}), 200
+            return jsonify({
+                'trends': assessments,
+                'next_cursor': next_cursor,
+                'prev_cursor': prev_cursor
+            }), 200
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -445,38 +878,20 @@ def get_recommendations():
         with get_db() as conn:
             cursor = conn.cursor()
             
-            # Latest health metrics
-            cursor.execute(
-                'SELECT * FROM health_metrics WHERE user_id = ? ORDER BY timestamp DESC LIMIT 1',
-                (user_id,)
-            )
-            health = cursor.fetchone()
-            
-            # Latest mood assessment
-            cursor.execute(
-                'SELECT * FROM mood_assessments WHERE user_id = ? ORDER BY timestamp DESC LIMIT 1',
-                (user_id,)
-            )
-            mood = cursor.fetchone()
-            
-            # Latest cognitive assessment
-            cursor.execute(
-                'SELECT * FROM cognitive_assessments WHERE user_id = ? ORDER BY timestamp DESC LIMIT 1',
-                (user_id,)
-            )
-            cognitive = cursor.fetchone()
+            # Latest health, mood and cognitive rows from the snapshot
+            state = get_user_state(cursor, user_id)
             
             # Compile user data
             user_data = {}
-            if health:
-                user_data.update(dict(health))
-            if mood:
-                user_data.update(dict(mood))
-            if cognitive:
-                user_data.update(dict(cognitive))
+            if state['health']:
+                user_data.update(state['health'])
+            if state['mood']:
+                user_data.update(state['mood'])
+            if state['cognitive']:
+                user_data.update(state['cognitive'])
             
             # Generate recommendations
-            recommendations = recommendation_engine.generate_recommendations(user_data)
+            recommendations = model_registry.get('recommendation_engine').generate_recommendations(user_data)
             
             # Store recommendations
             for rec in recommendations:
@@ -530,9 +945,11 @@ def acknowledge_alert(alert_id):
         with get_db() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                'UPDATE alerts SET acknowledged = 1 WHERE id = ? AND user_id = ?',
+                'UPDATE alerts SET acknowledged = 1 WHERE id = ? AND user_id = ? AND acknowledged = 0',
                 (alert_id, user_id)
             )
+            if cursor.rowcount:
+                adjust_counter(cursor, user_id, 'unread_alerts', -cursor.rowcount)
             
             return jsonify({'message': 'Alert acknowledged'}), 200
     except Exception as e:
@@ -587,37 +1004,14 @@ def get_dashboard():
         with get_db() as conn:
             cursor = conn.cursor()
             
-            # Latest metrics
-            cursor.execute(
-                'SELECT * FROM health_metrics WHERE user_id = ? ORDER BY timestamp DESC LIMIT 1',
-                (user_id,)
-            )
-            latest_health = cursor.fetchone()
-            
-            cursor.execute(
-                'SELECT * FROM mood_assessments WHERE user_id = ? ORDER BY timestamp DESC LIMIT 1',
-                (user_id,)
-            )
-            latest_mood = cursor.fetchone()
-            
-            cursor.execute(
-                'SELECT * FROM cognitive_assessments WHERE user_id = ? ORDER BY timestamp DESC LIMIT 1',
-                (user_id,)
-            )
-            latest_cognitive = cursor.fetchone()
-            
-            # Unacknowledged alerts
-            cursor.execute(
-                'SELECT COUNT(*) as count FROM alerts WHERE user_id = ? AND acknowledged = 0',
-                (user_id,)
-            )
-            alert_count = cursor.fetchone()['count']
+            # Latest metrics and unacknowledged alerts from the snapshot
+            state = get_user_state(cursor, user_id)
             
             dashboard = {
-                'health': dict(latest_health) if latest_health else None,
-                'mood': dict(latest_mood) if latest_mood else None,
-                'cognitive': dict(latest_cognitive) if latest_cognitive else None,
-                'unread_alerts': alert_count
+                'health': state['health'],
+                'mood': state['mood'],
+                'cognitive': state['cognitive'],
+                'unread_alerts': state['unread_alerts']
             }
             
             return jsonify({'dashboard': dashboard}), 200
@@ -641,28 +1035,17 @@ def chatbot_message():
         if not message or len(message.strip()) == 0:
             return jsonify({'error': 'Message cannot be empty'}), 400
         
+        # Analyze the message before opening the transaction
+        analysis = analyze_text(message)
+        
         with get_db() as conn:
             cursor = conn.cursor()
             
-            # Get user context (recent health metrics, mood, etc.)
-            cursor.execute(
-                'SELECT * FROM health_metrics WHERE user_id = ? ORDER BY timestamp DESC LIMIT 1',
-                (user_id,)
-            )
-            health = cursor.fetchone()
-            
-            cursor.execute(
-                'SELECT * FROM mood_assessments WHERE user_id = ? ORDER BY timestamp DESC LIMIT 1',
-                (user_id,)
-            )
-            mood = cursor.fetchone()
-            
-            # Get conversation count
-            cursor.execute(
-                'SELECT COUNT(*) as count FROM chatbot_conversations WHERE user_id = ?',
-                (user_id,)
-            )
-            conv_count = cursor.fetchone()['count']
+            # Get user context (recent health metrics, mood, conversation count)
+            state = get_user_state(cursor, user_id)
+            health = state['health']
+            mood = state['mood']
+            conv_count = state['conversation_count']
             
             # Compile user context
             user_context = {
@@ -681,15 +1064,18 @@ def chatbot_message():
                 })
             
             # Generate chatbot response
-            bot_response = wellness_chatbot.generate_response(message, user_context)
+            bot_response = model_registry.get('wellness_chatbot').generate_response(
+                message, user_context, analysis=analysis
+            )
             
             # Store user message
             cursor.execute(
                 '''INSERT INTO chatbot_conversations 
-                   (user_id, message, is_user, sentiment_score, emotion_detected)
-                   VALUES (?, ?, ?, ?, ?)''',
+                   (user_id, message, is_user, sentiment_score, emotion_detected,
+                    analyzer_version)
+                   VALUES (?, ?, ?, ?, ?, ?)''',
                 (user_id, message, 1, bot_response['sentiment_score'], 
-                 bot_response['emotion_detected'])
+                 bot_response['emotion_detected'], analyzer_version())
             )
             
             # Store bot response
@@ -700,13 +1086,14 @@ def chatbot_message():
                 (user_id, bot_response['response'], 0, 
                  bot_response['emotion_detected'], json.dumps(bot_response))
             )
+            adjust_counter(cursor, user_id, 'conversation_count', 2)
             
             # Update user profile
             cursor.execute(
                 '''INSERT OR REPLACE INTO chatbot_user_profiles 
                    (user_id, conversation_count, last_affirmation_date)
                    VALUES (?, ?, ?)''',
-                (user_id, conv_count + 1, datetime.now().isoformat())
+                (user_id, conv_count + 1, utc_timestamp())
             )
             
             return jsonify({
@@ -716,6 +1103,10 @@ def chatbot_message():
                 'recommended_exercise': bot_response['recommended_exercise'],
                 'emotion_detected': bot_response['emotion_detected']
             }), 200
+    except ExecutorBusy as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
+    except AnalysisTimeout as e:
+        return jsonify({'error': str(e)}), 504
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -730,17 +1121,20 @@ def get_chatbot_history():
         
         with get_db() as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                '''SELECT * FROM chatbot_conversations 
-                   WHERE user_id = ? 
-                   ORDER BY timestamp DESC 
-                   LIMIT ?''',
-                (user_id, limit)
+            conversations, next_cursor, prev_cursor = paginate(
+                cursor, 'chatbot_conversations', user_id, limit,
+                before=request.args.get('before'), after=request.args.get('after')
             )
-            conversations = [dict(row) for row in cursor.fetchall()]
             conversations.reverse()  # Show oldest first
             
-            return jsonify({'conversations': conversations}), 200
+            # next_cursor pages back to older messages, prev_cursor to newer ones
+            return jsonify({
+                'conversations': conversations,
+                'next_cursor': next_cursor,
+                'prev_cursor': prev_cursor
+            }), 200
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -750,7 +1144,7 @@ def get_chatbot_history():
 def get_daily_affirmation():
     """Get daily affirmation"""
     try:
-        affirmation = wellness_chatbot.get_daily_affirmation()
+        affirmation = model_registry.get('wellness_chatbot').get_daily_affirmation()
         return jsonify({'affirmation': affirmation}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -776,7 +1170,7 @@ def get_emotional_patterns():
             conversations = [dict(row) for row in cursor.fetchall()]
             
             # Analyze patterns
-            patterns = wellness_chatbot.analyze_emotional_patterns(conversations)
+            patterns = model_registry.get('wellness_chatbot').analyze_emotional_patterns(conversations)
             
             return jsonify({'patterns': patterns}), 200
     except Exception as e:
@@ -796,6 +1190,7 @@ def clear_chatbot_history():
                 'DELETE FROM chatbot_conversations WHERE user_id = ?',
                 (user_id,)
             )
+            reset_counter(cursor, user_id, 'conversation_count')
             
             return jsonify({'message': 'Conversation history cleared'}), 200
     except Exception as e:
@@ -803,43 +1198,156 @@ def clear_chatbot_history():
 
 
 # ============================================================================
-# Helper Functions
+# Data Export Routes
 # ============================================================================
 
-def check_and_create_alerts(user_id, analysis):
-    """Check analysis results and create alerts if needed"""
+# Tables included in a full-account export, with their user filter column
+EXPORT_TABLES = [
+    ('users', 'id'),
+    ('health_metrics', 'user_id'),
+    ('mood_assessments', 'user_id'),
+    ('journal_entries', 'user_id'),
+    ('cognitive_assessments', 'user_id'),
+    ('recommendations', 'user_id'),
+    ('alerts', 'user_id'),
+    ('caregivers', 'user_id'),
+    ('chatbot_conversations', 'user_id'),
+    ('chatbot_user_profiles', 'user_id')
+]
+
+# Never leave the server, even in the user's own export
+EXPORT_EXCLUDED_COLUMNS = {'password_hash'}
+
+
+def generate_export(user_id, batch_size):
+    """Yield a user's full history as NDJSON, one fetchmany batch at a time"""
+    with get_db() as conn:
+        # One read transaction gives the export a consistent snapshot
+        if not conn.in_transaction:
+            conn.execute('BEGIN')
+        cursor = conn.cursor()
+        yield json.dumps({'table': 'export', 'data': {
+            'user_id': user_id, 'exported_at': utc_timestamp()
+        }}) + '\n'
+        
+        for table, user_column in EXPORT_TABLES:
+            cursor.execute(
+                f'SELECT * FROM {table} WHERE {user_column} = ? ORDER BY id',
+                (user_id,)
+            )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                lines = []
+                for row in rows:
+                    record = {key: row[key] for key in row.keys()
+                              if key not in EXPORT_EXCLUDED_COLUMNS}
+                    lines.append(json.dumps({'table': table, 'data': record}, default=str))
+                yield '\n'.join(lines) + '\n'
+
+
+@app.route('/api/export', methods=['GET'])
+@jwt_required()
+def export_user_data():
+    """Stream every table for the user as NDJSON"""
     try:
-        with get_db() as conn:
-            cursor = conn.cursor()
-            
-            if analysis.get('anxiety_level', 0) > Config.ANXIETY_THRESHOLD:
-                cursor.execute(
-                    '''INSERT INTO alerts 
-                       (user_id, alert_type, severity, message)
-                       VALUES (?, ?, ?, ?)''',
-                    (user_id, 'anxiety', 'high', 
-                     'Elevated anxiety levels detected. Consider relaxation techniques.')
-                )
-            
-            if analysis.get('depression_indicators', 0) > Config.DEPRESSION_THRESHOLD:
-                cursor.execute(
-                    '''INSERT INTO alerts 
-                       (user_id, alert_type, severity, message)
-                       VALUES (?, ?, ?, ?)''',
-                    (user_id, 'depression', 'high',
-                     'Signs of depression detected. Consider speaking with a healthcare provider.')
-                )
-            
-            if analysis.get('stress_level', 0) > Config.STRESS_THRESHOLD:
-                cursor.execute(
-                    '''INSERT INTO alerts 
-                       (user_id, alert_type, severity, message)
-                       VALUES (?, ?, ?, ?)''',
-                    (user_id, 'stress', 'medium',
-                     'High stress levels detected. Take time for self-care.')
-                )
+        user_id = int(get_jwt_identity())
+        
+        return Response(
+            generate_export(user_id, Config.EXPORT_BATCH_SIZE),
+            mimetype='application/x-ndjson',
+            headers={
+                'Content-Disposition': f'attachment; filename=mindtrack-export-{user_id}.ndjson'
+            }
+        )
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# ============================================================================
+# System Routes
+# ============================================================================
+
+@app.route('/api/system/stats', methods=['GET'])
+@jwt_required()
+def get_system_stats():
+    """Get runtime counters for the analysis pipeline"""
+    try:
+        return jsonify({
+            'models': model_registry.stats(),
+            'analysis_executor': (
+                model_registry.get('analysis_executor').stats()
+                if Config.ANALYSIS_EXECUTOR_ENABLED else {'enabled': False}
+            ),
+            'analysis_cache': (
+                model_registry.get('analysis_cache').stats()
+                if Config.ANALYSIS_CACHE_ENABLED else {'enabled': False}
+            )
+        }), 200
     except Exception as e:
-        print(f"Error creating alerts: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+# ============================================================================
+# Helper Functions
+# ============================================================================
+
+def analyze_text(text):
+    """
+    Run mood analysis for a request
+    Long texts go to the analysis process pool so they don't hold the GIL on
+    the request thread. Raises ExecutorBusy or AnalysisTimeout.
+    """
+    if Config.ANALYSIS_EXECUTOR_ENABLED:
+        return model_registry.get('analysis_executor').analyze_text(text)
+    return model_registry.get('mood_analyzer').analyze_text(text)
+
+
+def analyzer_version():
+    """Version string stored with every row holding mood analysis output"""
+    return model_registry.get('mood_analyzer').version
+
+
+def analyze_sections(text):
+    """Chunked mood analysis with per-section scores, for long texts"""
+    options = {'chunk_chars': Config.ANALYSIS_CHUNK_CHARS, 'max_sections': Config.JOURNAL_MAX_SECTIONS}
+    if Config.ANALYSIS_EXECUTOR_ENABLED:
+        return model_registry.get('analysis_executor').analyze_sections(text, **options)
+    return model_registry.get('mood_analyzer').analyze_sections(text, **options)
+
+
+def check_and_create_alerts(cursor, user_id, analysis):
+    """
+    Check analysis results and create alerts if needed
+    Runs on the caller's cursor so the alerts commit or roll back together
+    with the assessment that triggered them.
+    Returns: number of alerts created
+    """
+    alerts = []
+    
+    if analysis.get('anxiety_level', 0) > Config.ANXIETY_THRESHOLD:
+        alerts.append((user_id, 'anxiety', 'high',
+                       'Elevated anxiety levels detected. Consider relaxation techniques.'))
+    
+    if analysis.get('depression_indicators', 0) > Config.DEPRESSION_THRESHOLD:
+        alerts.append((user_id, 'depression', 'high',
+                       'Signs of depression detected. Consider speaking with a healthcare provider.'))
+    
+    if analysis.get('stress_level', 0) > Config.STRESS_THRESHOLD:
+        alerts.append((user_id, 'stress', 'medium',
+                       'High stress levels detected. Take time for self-care.'))
+    
+    if alerts:
+        cursor.executemany(
+            '''INSERT INTO alerts 
+               (user_id, alert_type, severity, message)
+               VALUES (?, ?, ?, ?)''',
+            alerts
+        )
+        adjust_counter(cursor, user_id, 'unread_alerts', len(alerts))
+    
+    return len(alerts)
 
 
 # ============================================================================
@@ -877,4 +1385,7 @@ def expired_token_callback(jwt_header, jwt_payload):
 # ============================================================================
 
 if __name__ == '__main__':
+    # Not at import time: the executor's spawned children re-import this module
+    if Config.MODEL_WARMUP:
+        warmup_models()
     app.run(debug=Config.DEBUG, port=5000, host='0.0.0.0')
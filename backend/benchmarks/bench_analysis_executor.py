@@ -0,0 +1,106 @@
+"""Benchmark: mixed long-text and GET traffic, inline analysis vs. the process pool
+
+Serves the app from a threaded werkzeug server and runs, for --duration
+seconds per phase, --writers clients posting unique long journal entries
+next to --readers clients polling /api/mood/history. Phase 1 analyzes on
+the request threads (ANALYSIS_EXECUTOR_ENABLED off); phase 2 sends long
+texts to the warmed process pool. Prints GET throughput and latency and
+journal POST throughput for each phase.
+
+Usage:
+    python benchmarks/bench_analysis_executor.py [--duration 10] [--words 20000]
+"""
+import argparse
+import logging
+import random
+import threading
+import time
+import urllib.request
+
+from werkzeug.serving import make_server
+
+from common import use_temp_database, register_user, percentile
+
+from config import Config
+
+WORDS = ('i felt really anxious before the meeting but the walk afterwards was lovely and calm '
+         'work has been hectic and demanding tired lonely wonderful happy worried').split()
+
+
+def request(url, headers, body=None):
+    data = None if body is None else body.encode()
+    req = urllib.request.Request(url, data=data, headers={**headers, 'Content-Type': 'application/json'})
+    with urllib.request.urlopen(req, timeout=60) as response:
+        response.read()
+        return response.status
+
+
+def reader(url, headers, stop, latencies):
+    while not stop.is_set():
+        start = time.perf_counter()
+        request(url + '/api/mood/history?limit=20', headers)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+def writer(url, headers, stop, words, seed, completed):
+    rng = random.Random(seed)
+    while not stop.is_set():
+        content = ' '.join(rng.choice(WORDS) for _ in range(words))
+        request(url + '/api/journal/entry', headers, '{"content": "%s"}' % content)
+        completed.append(1)
+
+
+def run_phase(url, headers, args):
+    stop = threading.Event()
+    latencies, completed = [], []
+    threads = [threading.Thread(target=reader, args=(url, headers, stop, latencies))
+               for _ in range(args.readers)]
+    threads += [threading.Thread(target=writer, args=(url, headers, stop, args.words, i, completed))
+                for i in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return latencies, len(completed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--words', type=int, default=20000)
+    args = parser.parse_args()
+
+    use_temp_database()
+    import app as app_module
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    headers = register_user(app_module.app.test_client())
+    server = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_port}'
+
+    for label, enabled in (('inline analysis', False), ('process pool', True)):
+        Config.ANALYSIS_EXECUTOR_ENABLED = enabled
+        if enabled:
+            app_module.model_registry.get('analysis_executor').warmup()
+        else:
+            app_module.model_registry.get('mood_analyzer')
+        latencies, posts = run_phase(url, headers, args)
+        print(f'\n{label}: {args.readers} readers, {args.writers} writers x {args.words} words, '
+              f'{args.duration:g}s')
+        print(f'  GET  {len(latencies) / args.duration:8.1f} req/s  '
+              f'p50 {percentile(latencies, 50):7.1f} ms  p95 {percentile(latencies, 95):7.1f} ms  '
+              f'p99 {percentile(latencies, 99):7.1f} ms')
+        print(f'  POST {posts / args.duration:8.1f} req/s')
+
+    print(f"\nexecutor: {app_module.model_registry.get('analysis_executor').stats()}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
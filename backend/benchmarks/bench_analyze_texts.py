@@ -0,0 +1,49 @@
+"""Benchmark: MoodAnalyzer.analyze_text in a loop vs. analyze_texts
+
+Generates --count journal-style texts, checks that the batch API returns
+exactly the same dicts as the single-text path, and reports texts/sec.
+
+Usage:
+    python benchmarks/bench_analyze_texts.py [--count 5000]
+"""
+import argparse
+import random
+
+from common import Timer
+from models.ai_models import MoodAnalyzer
+
+PHRASES = [
+    'I felt anxious before the meeting', 'work has been hectic and demanding',
+    'had a lovely walk in the park', 'feeling tired and a bit lonely tonight',
+    'dinner with friends was wonderful', 'so much pressure this week',
+    'slept well and woke up happy', 'I am worried about the exam',
+    'everything feels hopeless lately', 'a calm and peaceful morning', ''
+]
+
+
+def make_texts(count, rng):
+    return [' '.join(rng.choice(PHRASES) for _ in range(rng.randint(1, 12))) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=5000)
+    args = parser.parse_args()
+
+    analyzer = MoodAnalyzer()
+    texts = make_texts(args.count, random.Random(9)) + ['', '   ']
+
+    with Timer() as single:
+        expected = [analyzer.analyze_text(text) for text in texts]
+    with Timer() as batch:
+        actual = analyzer.analyze_texts(texts)
+
+    mismatches = sum(1 for a, b in zip(expected, actual) if a != b)
+    print(f'\n{len(texts)} texts, {mismatches} mismatches')
+    print(f'  analyze_text loop {single.elapsed:7.2f}s  {len(texts) / single.elapsed:9.0f} texts/s')
+    print(f'  analyze_texts     {batch.elapsed:7.2f}s  {len(texts) / batch.elapsed:9.0f} texts/s')
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
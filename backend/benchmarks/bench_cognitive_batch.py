@@ -0,0 +1,102 @@
+"""Benchmark: scalar vs. vectorized scoring of cognitive game results
+
+Scores --sizes seeded random game results with
+CognitiveAnalyzer.analyze_game_result one at a time and with
+analyze_game_results_batch over columns, checks that both give the same
+domain scores and performance levels, and reports results/sec. Then uploads
+--uploads results through the API, once as single POST
+/api/cognitive/game-result calls and once as
+/api/cognitive/game-results/batch requests of --batch-size results.
+
+Usage:
+    python benchmarks/bench_cognitive_batch.py [--sizes 10000 100000 1000000] [--uploads 2000]
+"""
+import argparse
+import random
+
+from common import use_temp_database, register_user, Timer
+
+from models.ai_models import CognitiveAnalyzer
+
+SCORE_KEYS = ['cognitive_score', 'memory_score', 'focus_score', 'problem_solving_score', 'performance_level']
+
+
+def make_results(count, rng, game_types=CognitiveAnalyzer.GAME_TYPES + ['word_search']):
+    return [
+        {
+            'game_type': rng.choice(game_types),
+            'score': rng.randint(0, 100),
+            'reaction_time': round(rng.uniform(150, 2500), 1),
+            'accuracy': rng.randint(0, 100),
+            'difficulty_level': rng.randint(1, 5)
+        }
+        for _ in range(count)
+    ]
+
+
+def compare_analyzer(sizes, rng):
+    analyzer = CognitiveAnalyzer()
+    print(f'{"results":>9} {"scalar":>9} {"batch":>9} {"speedup":>8} {"mismatches":>11}')
+    for size in sizes:
+        results = make_results(size, rng)
+        columns = {key: [result[key] for result in results] for key in results[0]}
+
+        with Timer() as scalar:
+            expected = [
+                analyzer.analyze_game_result(r['game_type'], r['score'], r['reaction_time'],
+                                             r['accuracy'], r['difficulty_level'])
+                for r in results
+            ]
+        with Timer() as batch:
+            actual = analyzer.analyze_game_results_batch(
+                analyzer.encode_game_types(columns['game_type']), columns['score'],
+                columns['reaction_time'], columns['accuracy'], columns['difficulty_level']
+            )
+
+        actual = {key: actual[key].tolist() for key in SCORE_KEYS}
+        mismatches = sum(
+            any(e[key] != actual[key][i] for key in SCORE_KEYS) for i, e in enumerate(expected)
+        )
+        print(f'{size:>9,} {scalar.elapsed:>8.2f}s {batch.elapsed:>8.3f}s '
+              f'{scalar.elapsed / batch.elapsed:>7.0f}x {mismatches:>11}')
+
+
+def compare_api(uploads, batch_size, rng):
+    use_temp_database('cognitive_batch.db')
+    from app import app
+
+    client = app.test_client()
+    # The API rejects unknown game types
+    results = make_results(uploads, rng, CognitiveAnalyzer.GAME_TYPES)
+
+    headers = register_user(client, 'single@example.com')
+    with Timer() as single:
+        for result in results:
+            client.post('/api/cognitive/game-result', headers=headers, json=result)
+
+    headers = register_user(client, 'batch@example.com')
+    with Timer() as batch:
+        for start in range(0, uploads, batch_size):
+            response = client.post('/api/cognitive/game-results/batch', headers=headers,
+                                   json=results[start:start + batch_size])
+            assert response.status_code == 201, response.get_json()
+
+    print(f'\n{uploads} results through the API')
+    for label, timer in (('single POSTs', single), ('batch', batch)):
+        print(f'  {label:<13} {timer.elapsed:7.2f}s  {uploads / timer.elapsed:10.0f} rows/s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--uploads', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(22)
+    compare_analyzer(args.sizes, rng)
+    compare_api(args.uploads, args.batch_size, rng)
+
+
+if __name__ == '__main__':
+    main()
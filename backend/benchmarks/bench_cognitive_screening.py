@@ -0,0 +1,127 @@
+"""Benchmark: cohort-wide decline screening vs. per-user detect_decline_trend
+
+Generates a synthetic population of --users users with 1 to
+2 * --per-user assessments each (about --decliners of them on a downward
+trend), runs screening.screen_population over it with --workers processes,
+and reports rows/sec and total wall time. Then checks a sample of users
+against CognitiveAnalyzer.detect_decline_trend (one query per user, as the
+API does), and extrapolates that per-user path to the whole population.
+
+Pass --database to keep the generated data and reuse it on the next run.
+
+Usage:
+    python benchmarks/bench_cognitive_screening.py [--users 1000000] [--per-user 5] [--workers N]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from common import use_temp_database, Timer
+
+import database
+import screening
+from database import get_db, init_database, utc_timestamp
+from models.ai_models import CognitiveAnalyzer
+
+
+def generate(users, per_user, decliners, seed=24, batch_users=50000):
+    """Insert the synthetic population, users in id order; returns rows written"""
+    rng = np.random.default_rng(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    days = [utc_timestamp(start + timedelta(days=d, hours=9)) for d in range(2 * per_user * 7 + 1)]
+    written = 0
+    with get_db() as conn:
+        for first in range(1, users + 1, batch_users):
+            ids = np.arange(first, min(first + batch_users, users + 1))
+            counts = rng.integers(1, 2 * per_user + 1, len(ids))
+            user_ids = np.repeat(ids, counts)
+            position = np.arange(len(user_ids)) - np.repeat(np.cumsum(counts) - counts, counts)
+            base = np.repeat(rng.uniform(0.4, 0.9, len(ids)), counts)
+            slope = np.repeat(np.where(rng.random(len(ids)) < decliners,
+                                       rng.uniform(-0.12, -0.03, len(ids)),
+                                       rng.uniform(-0.03, 0.04, len(ids))), counts)
+            scores = np.clip(base + slope * position + rng.normal(0, 0.04, len(user_ids)), 0, 1).round(3)
+            gaps = rng.integers(1, 8, len(user_ids))
+            day = np.minimum(position * 7 + gaps, len(days) - 1)
+            conn.executemany(
+                '''INSERT INTO cognitive_assessments (user_id, timestamp, game_type, cognitive_score)
+                   VALUES (?, ?, 'memory_match', ?)''',
+                zip(user_ids.tolist(), (days[d] for d in day.tolist()), scores.tolist())
+            )
+            conn.commit()
+            written += len(user_ids)
+            print(f'  generated {ids[-1]:,} users, {written:,} assessments', end='\r', flush=True)
+    print()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=1000000)
+    parser.add_argument('--per-user', type=int, default=5)
+    parser.add_argument('--decliners', type=float, default=0.05)
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--chunk-rows', type=int, default=100000)
+    parser.add_argument('--sample', type=int, default=500)
+    parser.add_argument('--database', help='database file to generate into, or reuse if it exists')
+    args = parser.parse_args()
+
+    if args.database:
+        database.close_db()
+        reuse = os.path.exists(args.database)
+        database.DATABASE_NAME = args.database
+        init_database()
+    else:
+        use_temp_database('screening.db')
+        reuse = False
+
+    if not reuse:
+        with Timer() as timer:
+            rows = generate(args.users, args.per_user, args.decliners)
+        print(f'Generated {rows:,} assessments for {args.users:,} users in {timer.elapsed:.0f}s')
+
+    with Timer() as total:
+        with ProcessPoolExecutor(max_workers=args.workers,
+                                 mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=screening._init_worker,
+                                 initargs=(database.DATABASE_NAME,)) as pool:
+            with Timer() as scan:
+                run = screening.screen_population(pool, args.workers, args.chunk_rows)
+    print(f"\nScreened {run['users_screened']:,} users ({run['users_flagged']:,} flagged) "
+          f"from {run['rows_scanned']:,} rows with {args.workers} workers")
+    print(f"  scan {scan.elapsed:.1f}s ({run['rows_scanned'] / scan.elapsed:,.0f} rows/s), "
+          f"wall time including pool start-up {total.elapsed:.1f}s")
+
+    # Per-user path on a sample, for parity and for scale
+    analyzer = CognitiveAnalyzer()
+    with get_db() as conn:
+        cursor = conn.cursor()
+        high = cursor.execute('SELECT MAX(user_id) FROM cognitive_assessments').fetchone()[0]
+        sample = random.Random(24).sample(range(1, high + 1), min(args.sample, high))
+        flagged = {row[0] for row in cursor.execute(
+            f'''SELECT user_id FROM cognitive_screening_results
+                WHERE run_id = ? AND user_id IN ({', '.join('?' for _ in sample)})''',
+            [run['id']] + sample
+        )}
+        expected = set()
+        with Timer() as timer:
+            for user_id in sample:
+                cursor.execute('SELECT * FROM cognitive_assessments WHERE user_id = ?', (user_id,))
+                trend = analyzer.detect_decline_trend([dict(row) for row in cursor.fetchall()])
+                if trend['decline_detected']:
+                    expected.add(user_id)
+    per_user = timer.elapsed / len(sample)
+    print(f'  detect_decline_trend per user: {per_user * 1000:.2f} ms, '
+          f'~{per_user * high:,.0f}s for all {high:,} users')
+    print(f'  sample of {len(sample)}: {len(expected)} declining, '
+          f'{len(expected ^ flagged)} disagree with the batch job')
+    return 1 if expected != flagged else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,131 @@
+"""Benchmark: per-trial telemetry as packed blobs vs. one row per trial
+
+Stores --games synthetic games of --trials trials each for one user, once
+through telemetry.store_telemetry (raw and zlib blobs) and once as a
+row-per-trial table, and reports the database growth of each plus the time
+to compute the per-game summaries (median, IQR, intra-individual SD) of the
+user's latest --latest games from each layout.
+
+Usage:
+    python benchmarks/bench_cognitive_telemetry.py [--games 2000] [--trials 40] [--latest 200]
+"""
+import argparse
+import os
+import statistics
+
+import numpy as np
+
+from common import use_temp_database, percentile, Timer
+
+import telemetry
+from database import get_db
+
+USER_ID = 1
+
+
+def make_trials(rng, trials):
+    # Reaction times in whole milliseconds, as browsers report them
+    times = np.round(rng.lognormal(np.log(320), 0.25, trials))
+    correct = (rng.random(trials) > 0.08).astype(np.int16)
+    return times, correct
+
+
+def database_size(conn):
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+    return conn.execute('PRAGMA page_count').fetchone()[0] * page_size
+
+
+def row_summaries(cursor, latest):
+    """Per-game summaries from a row-per-trial table, in Python"""
+    cursor.execute(
+        '''SELECT assessment_id, reaction_time, correct FROM trial_rows
+           WHERE assessment_id IN (
+               SELECT id FROM cognitive_assessments WHERE user_id = ? ORDER BY id DESC LIMIT ?
+           )
+           ORDER BY assessment_id, trial''',
+        (USER_ID, latest)
+    )
+    games = {}
+    for assessment_id, reaction_time, correct in cursor.fetchall():
+        games.setdefault(assessment_id, []).append(reaction_time if correct else None)
+    summaries = []
+    for times in games.values():
+        hits = [t for t in times if t is not None]
+        q25, median, q75 = statistics.quantiles(hits, n=4, method='inclusive')
+        summaries.append((median, q75 - q25, statistics.stdev(hits)))
+    return summaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--games', type=int, default=2000)
+    parser.add_argument('--trials', type=int, default=40)
+    parser.add_argument('--latest', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    path = use_temp_database('telemetry.db')
+    rng = np.random.default_rng(25)
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TABLE trial_rows (
+                assessment_id INTEGER NOT NULL,
+                trial INTEGER NOT NULL,
+                reaction_time REAL NOT NULL,
+                correct INTEGER NOT NULL,
+                PRIMARY KEY (assessment_id, trial)
+            )
+        ''')
+        games = []
+        for _ in range(args.games):
+            cursor.execute(
+                "INSERT INTO cognitive_assessments (user_id, game_type, cognitive_score) VALUES (?, 'reaction_test', 0.7)",
+                (USER_ID,)
+            )
+            games.append((cursor.lastrowid,) + make_trials(rng, args.trials))
+        conn.commit()
+
+        sizes = {}
+        base = database_size(conn)
+        for label, compress in (('raw blob', False), ('zlib blob', True)):
+            cursor.execute('DELETE FROM cognitive_telemetry')
+            conn.commit()
+            conn.execute('VACUUM')
+            base = database_size(conn)
+            for assessment_id, times, correct in games:
+                telemetry.store_telemetry(cursor, assessment_id, USER_ID,
+                                          {'reaction_times': times, 'correct': correct}, compress)
+            conn.commit()
+            sizes[label] = database_size(conn) - base
+
+        # Keep the zlib blobs for the read comparison; measure the row layout on its own
+        before = database_size(conn)
+        cursor.executemany(
+            'INSERT INTO trial_rows (assessment_id, trial, reaction_time, correct) VALUES (?, ?, ?, ?)',
+            [(assessment_id, i, float(t), int(c))
+             for assessment_id, times, correct in games for i, (t, c) in enumerate(zip(times, correct))]
+        )
+        conn.commit()
+        sizes['row per trial'] = database_size(conn) - before
+
+        blob_times, row_times = [], []
+        for _ in range(args.repeat):
+            with Timer() as timer:
+                telemetry.get_telemetry_summaries(cursor, USER_ID, limit=args.latest)
+            blob_times.append(timer.elapsed * 1000)
+            with Timer() as timer:
+                row_summaries(cursor, args.latest)
+            row_times.append(timer.elapsed * 1000)
+
+    trials = args.games * args.trials
+    print(f'{args.games:,} games x {args.trials} trials ({trials:,} trials), {os.path.basename(path)}')
+    for label, size in sizes.items():
+        print(f'  {label:<14} {size / 1024:9.0f} KB  {size / trials:6.1f} bytes/trial')
+    print(f'  summaries of the latest {args.latest} games: blobs p50 {percentile(blob_times, 50):.1f} ms, '
+          f'rows p50 {percentile(row_times, 50):.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
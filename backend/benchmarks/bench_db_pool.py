@@ -0,0 +1,120 @@
+"""Benchmark: per-request connections vs. the pooled WAL connections
+
+Runs concurrent clients against /api/dashboard and /api/health/metrics (with a
+share of POST writers mixed in) once with SQLITE_POOL_ENABLED off (a fresh
+rollback-journal connection per request, the old behaviour) and once with the
+pool on, then prints p50/p99 latency per endpoint and how many connections
+were opened. With --thread-per-request every request runs on a new thread,
+as under the threaded development server (app.run); otherwise each client
+is one long-lived thread, as under gunicorn workers.
+
+Usage:
+    python benchmarks/bench_db_pool.py [--threads 8] [--requests 200] [--rows 5000] [--thread-per-request]
+"""
+import argparse
+import threading
+import time
+
+from common import use_temp_database, register_user, percentile, Timer
+
+import database
+from config import Config
+
+
+def seed(rows):
+    """Create a user with a realistic amount of history"""
+    from app import app
+
+    client = app.test_client()
+    headers = register_user(client)
+    with database.get_db() as conn:
+        conn.executemany(
+            '''INSERT INTO health_metrics
+               (user_id, heart_rate, hrv_score, sleep_hours, steps, stress_level)
+               VALUES (1, ?, ?, ?, ?, ?)''',
+            [(60 + i % 40, 40 + i % 30, 6 + i % 3, 4000 + i, (i % 10) / 10) for i in range(rows)]
+        )
+    return headers
+
+
+def worker(headers, requests, write_ratio, thread_per_request, latencies, lock):
+    from app import app
+
+    client = app.test_client()
+    local = {'dashboard': [], 'metrics': [], 'write': []}
+    for i in range(requests):
+        if write_ratio and i % int(1 / write_ratio) == 0:
+            key, request = 'write', lambda: client.post(
+                '/api/health/metrics', headers=headers, json={'heart_rate': 72, 'steps': 100}
+            )
+        elif i % 2:
+            key, request = 'dashboard', lambda: client.get('/api/dashboard', headers=headers)
+        else:
+            key, request = 'metrics', lambda: client.get('/api/health/metrics?limit=30', headers=headers)
+        start = time.perf_counter()
+        if thread_per_request:
+            thread = threading.Thread(target=request)
+            thread.start()
+            thread.join()
+        else:
+            request()
+        local[key].append((time.perf_counter() - start) * 1000)
+    with lock:
+        for key, values in local.items():
+            latencies[key].extend(values)
+
+
+def run(pool_enabled, args):
+    Config.SQLITE_POOL_ENABLED = pool_enabled
+    use_temp_database('pool.db' if pool_enabled else 'legacy.db')
+    headers = seed(args.rows)
+
+    opened = [0]
+    connect = database._connect
+
+    def counting_connect(*a, **kw):
+        opened[0] += 1
+        return connect(*a, **kw)
+
+    database._connect = counting_connect
+    latencies = {'dashboard': [], 'metrics': [], 'write': []}
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=worker, args=(headers, args.requests, args.write_ratio,
+                                              args.thread_per_request, latencies, lock))
+        for _ in range(args.threads)
+    ]
+    with Timer() as timer:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    database._connect = connect
+    database.close_db()
+
+    label = 'pooled WAL' if pool_enabled else 'per-request'
+    total = sum(len(v) for v in latencies.values())
+    print(f'\n{label}: {total} requests in {timer.elapsed:.2f}s ({total / timer.elapsed:.0f} req/s), '
+          f'{opened[0]} connections opened')
+    for key in ('dashboard', 'metrics', 'write'):
+        values = latencies[key]
+        if values:
+            print(f'  {key:<10} p50={percentile(values, 50):7.2f}ms  p99={percentile(values, 99):7.2f}ms  n={len(values)}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200, help='requests per thread')
+    parser.add_argument('--rows', type=int, default=5000, help='seeded health_metrics rows')
+    parser.add_argument('--write-ratio', type=float, default=0.1)
+    parser.add_argument('--thread-per-request', action='store_true',
+                        help='run each request on a new thread, like app.run')
+    args = parser.parse_args()
+
+    run(False, args)
+    run(True, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark: single-sample POSTs vs. /api/health/metrics/batch
+
+Uploads --samples buffered wearable readings once as individual
+POST /api/health/metrics calls and once as batch uploads of --batch-size
+samples (JSON array and NDJSON), and reports rows/sec for each.
+
+Usage:
+    python benchmarks/bench_health_batch.py [--samples 5000] [--batch-size 1000]
+"""
+import argparse
+import json
+import random
+from datetime import datetime, timedelta, timezone
+
+from common import use_temp_database, register_user, Timer
+
+
+def make_samples(count):
+    rng = random.Random(3)
+    start = datetime.now(timezone.utc) - timedelta(minutes=count)
+    return [
+        {
+            'timestamp': (start + timedelta(minutes=i)).isoformat(),
+            'heart_rate': rng.randint(55, 120),
+            'hrv_score': round(rng.uniform(20, 90), 1),
+            'steps': rng.randint(0, 200),
+            'stress_level': round(rng.random(), 2)
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--samples', type=int, default=5000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    use_temp_database('batch.db')
+    from app import app
+
+    client = app.test_client()
+    headers = register_user(client)
+    samples = make_samples(args.samples)
+    chunks = [samples[i:i + args.batch_size] for i in range(0, len(samples), args.batch_size)]
+
+    with Timer() as single:
+        for sample in samples:
+            client.post('/api/health/metrics', headers=headers, json=sample)
+
+    with Timer() as batch:
+        for chunk in chunks:
+            response = client.post('/api/health/metrics/batch', headers=headers, json=chunk)
+            assert response.status_code == 201, response.get_json()
+
+    with Timer() as ndjson:
+        for chunk in chunks:
+            body = '\n'.join(json.dumps(sample) for sample in chunk)
+            response = client.post('/api/health/metrics/batch', headers=headers,
+                                   data=body, content_type='application/x-ndjson')
+            assert response.status_code == 201, response.get_json()
+
+    print(f'\n{args.samples} samples')
+    for label, timer in (('single POSTs', single), ('batch (JSON)', batch), ('batch (NDJSON)', ndjson)):
+        print(f'  {label:<15} {timer.elapsed:7.2f}s  {args.samples / timer.elapsed:10.0f} rows/s')
+
+
+if __name__ == '__main__':
+    main()
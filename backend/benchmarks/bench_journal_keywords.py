@@ -0,0 +1,130 @@
+"""Benchmark: incremental vs. from-scratch TF-IDF keywords for new journal entries
+
+Grows a journal corpus of synthetic entries spread over --users users and,
+at each size in --sizes, times extracting the keywords of new entries two
+ways: keywords.record_entry (maintained document frequencies, work
+proportional to the entry) and a from-scratch ranking that tokenizes the
+whole corpus to count document frequencies. Also times the themes query
+and a full rebuild_keywords at the largest size.
+
+Usage:
+    python benchmarks/bench_journal_keywords.py [--sizes 1000 10000 50000] [--users 200]
+"""
+import argparse
+import math
+import os
+import random
+from collections import Counter
+
+from common import use_temp_database, percentile, Timer
+
+import keywords
+from database import get_db, utc_timestamp
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'sentiment_corpus.txt')
+
+
+def load_sentences():
+    with open(CORPUS, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+def make_entry(sentences, vocabulary, rng):
+    # Corpus sentences plus Zipf-distributed topic words, so the vocabulary grows
+    words = [vocabulary[min(int(rng.paretovariate(1.1)) - 1, len(vocabulary) - 1)]
+             for _ in range(rng.randint(5, 40))]
+    return ' '.join(rng.choice(sentences) for _ in range(rng.randint(2, 8))) + ' ' + ' '.join(words)
+
+
+def scratch_keywords(cursor, user_id, content, top_k):
+    """Rank one entry by counting document frequencies over the whole corpus"""
+    user_df, global_df = Counter(), Counter()
+    user_docs = global_docs = 0
+    cursor.execute('SELECT user_id, content FROM journal_entries')
+    for owner, text in cursor:
+        terms = keywords.extract_terms(text)
+        global_df.update(terms.keys())
+        global_docs += 1
+        if owner == user_id:
+            user_df.update(terms.keys())
+            user_docs += 1
+    counts = keywords.extract_terms(content)
+    share = user_docs / (user_docs + keywords.USER_PRIOR_DOCS)
+    weights = {}
+    for term, count in counts.items():
+        user_idf = math.log((1 + user_docs) / (1 + user_df[term])) + 1
+        global_idf = math.log((1 + global_docs) / (1 + global_df[term])) + 1
+        weights[term] = (1 + math.log(count)) * (share * user_idf + (1 - share) * global_idf)
+    return sorted(weights, key=lambda term: (-weights[term], term))[:top_k]
+
+
+def grow(cursor, target, users, sentences, vocabulary, rng):
+    """Insert entries through record_entry until the corpus holds target entries"""
+    current = cursor.execute('SELECT COUNT(*) FROM journal_entries').fetchone()[0]
+    for _ in range(target - current):
+        user_id = rng.randint(1, users)
+        content = make_entry(sentences, vocabulary, rng)
+        found = keywords.record_entry(cursor, user_id, content)
+        cursor.execute(
+            'INSERT INTO journal_entries (user_id, timestamp, content, keywords) VALUES (?, ?, ?, ?)',
+            (user_id, utc_timestamp(), content, ','.join(term for term, _ in found))
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--samples', type=int, default=20)
+    parser.add_argument('--scratch-samples', type=int, default=3)
+    args = parser.parse_args()
+
+    use_temp_database('keywords.db')
+    rng = random.Random(5)
+    sentences = load_sentences()
+    vocabulary = [f'topic{i}' for i in range(20000)]
+    top_k = 8
+
+    print(f'{"entries":>8} {"incremental p50":>16} {"p95":>8} {"from scratch":>13}')
+    with get_db() as conn:
+        cursor = conn.cursor()
+        for size in sorted(args.sizes):
+            grow(cursor, size, args.users, sentences, vocabulary, rng)
+            conn.commit()
+
+            incremental = []
+            for _ in range(args.samples):
+                user_id = rng.randint(1, args.users)
+                content = make_entry(sentences, vocabulary, rng)
+                conn.execute('SAVEPOINT sample')
+                with Timer() as timer:
+                    keywords.record_entry(cursor, user_id, content)
+                conn.execute('ROLLBACK TO sample')
+                conn.execute('RELEASE sample')
+                incremental.append(timer.elapsed * 1000)
+
+            scratch = []
+            for _ in range(args.scratch_samples):
+                with Timer() as timer:
+                    scratch_keywords(cursor, rng.randint(1, args.users),
+                                     make_entry(sentences, vocabulary, rng), top_k)
+                scratch.append(timer.elapsed * 1000)
+
+            print(f'{size:>8,} {percentile(incremental, 50):>13.2f} ms '
+                  f'{percentile(incremental, 95):>5.2f} ms {percentile(scratch, 50):>10.0f} ms')
+
+        themes = []
+        for _ in range(args.samples):
+            with Timer() as timer:
+                keywords.get_themes(cursor, rng.randint(1, args.users), '0000-00-00', 10)
+            themes.append(timer.elapsed * 1000)
+        print(f'Themes query p50: {percentile(themes, 50):.2f} ms')
+
+        with Timer() as timer:
+            keywords.rebuild_keywords(cursor)
+        conn.commit()
+        print(f'rebuild_keywords over {max(args.sizes):,} entries: {timer.elapsed:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
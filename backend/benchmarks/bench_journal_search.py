@@ -0,0 +1,84 @@
+"""Benchmark: LIKE scans vs. the FTS5 search index for journal search
+
+Fills journal_entries with --entries synthetic entries spread over --users
+users (the search_index triggers index them as they are inserted), then
+times one-word searches for random users with a ``content LIKE '%word%'``
+scan against search.search, and prints both query plans. The LIKE scan
+collects every match, as ranking them requires; its cost grows with the
+user's entries, while the index reads only the postings of the query word.
+
+Usage:
+    python benchmarks/bench_journal_search.py [--entries 200000] [--users 1000]
+"""
+import argparse
+import os
+import random
+
+from common import use_temp_database, percentile, Timer
+
+import search
+from database import get_db
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'sentiment_corpus.txt')
+
+LIKE_QUERY = '''SELECT id, timestamp, content FROM journal_entries
+                WHERE user_id = ? AND content LIKE ?'''
+
+
+def make_entry(sentences, rng):
+    # Corpus sentences plus Zipf-distributed topic words, for rarer terms
+    topics = [f'topic{int(rng.paretovariate(1.1))}' for _ in range(rng.randint(2, 10))]
+    return ' '.join(rng.choice(sentences) for _ in range(rng.randint(3, 12))) + ' ' + ' '.join(topics)
+
+
+def fill(entries, users, rng):
+    with open(CORPUS, encoding='utf-8') as f:
+        sentences = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    with get_db() as conn:
+        for start in range(0, entries, 10000):
+            conn.executemany(
+                'INSERT INTO journal_entries (user_id, content) VALUES (?, ?)',
+                [(rng.randint(1, users), make_entry(sentences, rng))
+                 for _ in range(min(10000, entries - start))]
+            )
+            conn.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=200_000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+
+    use_temp_database('search.db')
+    rng = random.Random(3)
+    with Timer() as timer:
+        fill(args.entries, args.users, rng)
+    print(f'Filled and indexed {args.entries:,} entries in {timer.elapsed:.1f}s')
+
+    words = ['anxious', 'walk', 'sleep', 'friends', 'work', 'tired', 'grateful', 'lonely',
+             'topic3', 'topic40', 'topic250', 'topic1000']
+    queries = [(rng.randint(1, args.users), rng.choice(words)) for _ in range(args.queries)]
+    like, fts = [], []
+    with get_db() as conn:
+        cursor = conn.cursor()
+        for user_id, word in queries:
+            with Timer() as timer:
+                cursor.execute(LIKE_QUERY, (user_id, f'%{word}%')).fetchall()
+            like.append(timer.elapsed * 1000)
+            with Timer() as timer:
+                search.search(cursor, user_id, word)
+            fts.append(timer.elapsed * 1000)
+
+        print('LIKE plan:', [row[3] for row in cursor.execute('EXPLAIN QUERY PLAN ' + LIKE_QUERY, (1, '%walk%'))])
+        print('FTS plan: ', [row[3] for row in cursor.execute(
+            "EXPLAIN QUERY PLAN SELECT rowid FROM search_index WHERE search_index MATCH ? ORDER BY rank",
+            (search.build_match(1, 'walk'),))])
+
+    print(f'{"":>6} {"p50":>9} {"p95":>9}')
+    print(f'{"LIKE":>6} {percentile(like, 50):>6.2f} ms {percentile(like, 95):>6.2f} ms')
+    print(f'{"FTS5":>6} {percentile(fts, 50):>6.2f} ms {percentile(fts, 95):>6.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Benchmark: inverted-index vs. brute-force "similar entries" queries
+
+Writes synthetic journal entries for a single heavy journaler through
+keywords.record_entry and similarity.index_entry, and at each size in
+--sizes times the top-k query two ways: similarity.similar_entries (reads
+the postings of the entry's strongest terms) and a brute-force cosine
+against every earlier vector of the user. Also reports how many of the
+brute-force top-k the index finds (recall) and the share of the exact
+top-k's total similarity that its own top-k reaches (captured); near-ties
+make recall understate the quality of the results.
+
+Usage:
+    python benchmarks/bench_journal_similar.py [--sizes 1000 5000 20000] [--k 5]
+"""
+import argparse
+import heapq
+import json
+import os
+import random
+
+from common import use_temp_database, percentile, Timer
+
+import keywords
+import similarity
+from database import get_db, utc_timestamp
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'sentiment_corpus.txt')
+USER_ID = 1
+
+
+def make_entry(sentences, rng):
+    # Corpus sentences plus Zipf-distributed topic words, so entries differ
+    topics = [f'topic{int(rng.paretovariate(1.1))}' for _ in range(rng.randint(3, 15))]
+    return ' '.join(rng.choice(sentences) for _ in range(rng.randint(2, 6))) + ' ' + ' '.join(topics)
+
+
+def brute_force(cursor, entry_id, k):
+    """Exact top-k by cosine against every earlier vector; returns (top ids, {id: similarity})"""
+    # Entries are written in id order, so the earlier ones have lower ids
+    cursor.execute('SELECT entry_id, terms FROM journal_vectors WHERE user_id = ? AND entry_id <= ?',
+                   (USER_ID, entry_id))
+    vectors = {row[0]: dict(json.loads(row[1])) for row in cursor.fetchall()}
+    query = vectors.pop(entry_id)
+    query = dict(list(query.items())[:similarity.QUERY_TERMS])
+    scores = {
+        other_id: sum(weight * vector.get(term, 0.0) for term, weight in query.items())
+        for other_id, vector in vectors.items()
+    }
+    best = heapq.nlargest(k, scores, key=lambda other_id: (scores[other_id], other_id))
+    return [other_id for other_id in best if scores[other_id] >= similarity.MIN_SIMILARITY], scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 20000])
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--queries', type=int, default=30)
+    args = parser.parse_args()
+
+    use_temp_database('similar.db')
+    rng = random.Random(9)
+    with open(CORPUS, encoding='utf-8') as f:
+        sentences = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+    print(f'{"entries":>8} {"index p50":>10} {"p95":>9} {"brute p50":>10} {"p95":>9} {"recall":>7} {"captured":>9}')
+    written = 0
+    with get_db() as conn:
+        cursor = conn.cursor()
+        for size in sorted(args.sizes):
+            while written < size:
+                content = make_entry(sentences, rng)
+                ranked = keywords.record_entry(cursor, USER_ID, content, terms=similarity.VECTOR_TERMS)
+                cursor.execute(
+                    'INSERT INTO journal_entries (user_id, timestamp, content) VALUES (?, ?, ?)',
+                    (USER_ID, utc_timestamp(), content)
+                )
+                similarity.index_entry(cursor, USER_ID, cursor.lastrowid, ranked)
+                written += 1
+            conn.commit()
+
+            indexed, brute = [], []
+            found = expected = captured = best = 0
+            for entry_id in rng.sample(range(1, written + 1), args.queries):
+                with Timer() as timer:
+                    matches = [other_id for other_id, _ in
+                               similarity.similar_entries(cursor, USER_ID, entry_id, args.k)]
+                indexed.append(timer.elapsed * 1000)
+                with Timer() as timer:
+                    exact, scores = brute_force(cursor, entry_id, args.k)
+                brute.append(timer.elapsed * 1000)
+                found += len(set(exact) & set(matches))
+                expected += len(exact)
+                captured += sum(scores[other_id] for other_id in matches)
+                best += sum(scores[other_id] for other_id in exact)
+
+            print(f'{size:>8,} {percentile(indexed, 50):>7.2f} ms {percentile(indexed, 95):>6.2f} ms '
+                  f'{percentile(brute, 50):>7.2f} ms {percentile(brute, 95):>6.2f} ms '
+                  f'{found / expected if expected else 1:>7.0%} {captured / best if best else 1:>9.1%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Microbenchmark: per-keyword substring scans vs. the compiled KeywordMatcher
+
+Times keyword counting on 100-word and 10k-word inputs, with the built-in
+MoodAnalyzer lexicon and with a large synthetic lexicon.
+
+Usage:
+    python benchmarks/bench_keyword_matcher.py [--repeat 200]
+"""
+import argparse
+import random
+import timeit
+
+import common  # noqa: F401  (puts the backend on sys.path)
+from models.ai_models import MoodAnalyzer
+from models.keyword_matcher import KeywordMatcher
+
+FILLER = ('today work walk friends family dinner morning evening meeting project '
+          'music coffee weather park read sleep call message plan week').split()
+
+
+def make_text(words, lexicon, rng):
+    pool = FILLER * 5 + [k for keywords in lexicon.values() for k in keywords]
+    return ' '.join(rng.choice(pool) for _ in range(words))
+
+
+def substring_counts(text, lexicon):
+    """The previous approach: text.lower() and a substring scan per keyword"""
+    return {
+        category: sum(1 for keyword in keywords if keyword in text.lower())
+        for category, keywords in lexicon.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    analyzer = MoodAnalyzer()
+    builtin = {
+        'anxiety': analyzer.anxiety_keywords,
+        'depression': analyzer.depression_keywords,
+        'stress': analyzer.stress_keywords
+    }
+    large = {
+        category: keywords + [f'{category}term{i}' for i in range(3000)]
+        for category, keywords in builtin.items()
+    }
+
+    for name, lexicon in (('built-in lexicon', builtin), ('3k words/category', large)):
+        matcher = KeywordMatcher(lexicon)
+        print(f'\n{name} ({sum(len(v) for v in lexicon.values())} keywords)')
+        for words in (100, 10_000):
+            text = make_text(words, builtin, rng)
+            repeat = max(1, args.repeat // (words // 100))
+            old = timeit.timeit(lambda: substring_counts(text, lexicon), number=repeat) / repeat
+            new = timeit.timeit(lambda: matcher.count(text.lower()), number=repeat) / repeat
+            print(f'  {words:>6} words: substring {old * 1e6:10.1f}us  matcher {new * 1e6:10.1f}us  '
+                  f'({old / new:5.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
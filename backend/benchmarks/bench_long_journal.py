@@ -0,0 +1,69 @@
+"""Benchmark: whole-text vs. chunked analysis of very long journal entries
+
+Analyzes generated entries of increasing size with MoodAnalyzer.analyze_text
+(one pass over the whole document) and with analyze_sections (paragraph- or
+sentence-sized chunks), reporting latency and peak traced memory for each,
+and the largest difference between their overall scores.
+
+Usage:
+    python benchmarks/bench_long_journal.py [--sizes 100000 1000000 5000000] [--backend lexicon]
+"""
+import argparse
+import random
+import tracemalloc
+
+from common import Timer
+from models.ai_models import MoodAnalyzer
+from models.sentiment import SENTIMENT_BACKENDS, create_sentiment_backend
+
+SENTENCES = [
+    'I felt really anxious before the meeting.', 'It went better than expected though!',
+    'Dinner with friends was wonderful and I am so happy.', 'Work has been hectic and exhausting.',
+    'Some days I feel hopeless and lonely.', 'A calm walk in the park helped a lot.',
+    'Not a bad day, just tiring.', 'I am grateful for the little things.'
+]
+
+
+def make_entry(chars, rng):
+    paragraphs, size = [], 0
+    while size < chars:
+        paragraph = ' '.join(rng.choice(SENTENCES) for _ in range(rng.randint(2, 8)))
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+    return '\n\n'.join(paragraphs)
+
+
+def measure(func, text):
+    """Time one untraced run, then trace a second run for its peak memory"""
+    with Timer() as timer:
+        result = func(text)
+    tracemalloc.start()
+    func(text)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, timer.elapsed, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000, 5000000])
+    parser.add_argument('--backend', choices=list(SENTIMENT_BACKENDS), default='lexicon')
+    args = parser.parse_args()
+
+    analyzer = MoodAnalyzer(sentiment=create_sentiment_backend(args.backend))
+    analyzer.analyze_text('warm up')
+    rng = random.Random(16)
+    for chars in args.sizes:
+        text = make_entry(chars, rng)
+        whole, whole_s, whole_mb = measure(analyzer.analyze_text, text)
+        chunked, chunked_s, chunked_mb = measure(analyzer.analyze_sections, text)
+        sections = chunked.pop('sections')
+        difference = max(abs(whole[key] - chunked[key]) for key in whole if isinstance(whole[key], float))
+        print(f'\n{len(text) / 1e6:.1f} MB entry ({len(sections)} sections), overall scores '
+              f'differ by at most {difference:.3f}')
+        print(f'  analyze_text      {whole_s * 1000:8.0f} ms  peak {whole_mb:7.1f} MB')
+        print(f'  analyze_sections  {chunked_s * 1000:8.0f} ms  peak {chunked_mb:7.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Concurrency check: mood assessments and their alerts in one unit of work
+
+Phase 1 runs /api/mood/analyze with busy_timeout = 0, so any lock wait inside
+a request (such as a second connection trying to write alerts while the
+assessment insert is still uncommitted) fails immediately instead of
+stalling. Phase 2 runs concurrent clients with the normal timeout and checks
+that every alert-triggering assessment produced exactly its alerts, with no
+"database is locked" errors.
+
+Usage:
+    python benchmarks/bench_mood_alerts.py [--threads 8] [--requests 50]
+"""
+import argparse
+import threading
+import time
+
+from common import use_temp_database, register_user, percentile, Timer
+
+import database
+from config import Config
+
+# Triggers the anxiety and stress alerts (anxiety and stress scores of 1.0)
+ALERT_TEXT = 'I feel anxious, worried and stressed, the pressure is intense'
+EXPECTED_ALERTS = 2
+
+
+def post_many(headers, requests, results, lock):
+    from app import app
+
+    client = app.test_client()
+    local = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.post('/api/mood/analyze', headers=headers, json={'text': ALERT_TEXT})
+        local.append(((time.perf_counter() - start) * 1000, response.status_code, response.get_json()))
+    database.close_db()
+    with lock:
+        results.extend(local)
+
+
+def check_counts():
+    with database.get_db() as conn:
+        assessments = conn.execute('SELECT COUNT(*) FROM mood_assessments').fetchone()[0]
+        alerts = conn.execute('SELECT COUNT(*) FROM alerts').fetchone()[0]
+        unread = conn.execute('SELECT SUM(unread_alerts) FROM user_state').fetchone()[0] or 0
+    return assessments, alerts, unread
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=50, help='requests per thread')
+    args = parser.parse_args()
+
+    use_temp_database('alerts.db')
+    from app import app
+
+    client = app.test_client()
+    users = [register_user(client, f'user{i}@example.com') for i in range(args.threads)]
+    lock = threading.Lock()
+
+    # Phase 1: no lock waits allowed at all
+    timeout = Config.SQLITE_BUSY_TIMEOUT_MS
+    Config.SQLITE_BUSY_TIMEOUT_MS = 0
+    database.close_db()
+    results = []
+    post_many(users[0], args.requests, results, lock)
+    failures = [body for _, status, body in results if status != 200]
+    print(f'\nbusy_timeout=0, single client: {len(results)} requests, {len(failures)} failures')
+    for body in failures[:3]:
+        print(f'  {body}')
+    Config.SQLITE_BUSY_TIMEOUT_MS = timeout
+    database.close_db()
+
+    # Phase 2: concurrent writers, one user per thread
+    results = []
+    threads = [
+        threading.Thread(target=post_many, args=(headers, args.requests, results, lock))
+        for headers in users
+    ]
+    with Timer() as timer:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    latencies = [ms for ms, _, _ in results]
+    locked = [body for _, status, body in results if status != 200]
+    assessments, alerts, unread = check_counts()
+    print(f'{args.threads} concurrent clients: {len(results)} requests in {timer.elapsed:.2f}s, '
+          f'{len(locked)} failures')
+    print(f'  p50={percentile(latencies, 50):.2f}ms  p99={percentile(latencies, 99):.2f}ms')
+    print(f'  assessments={assessments} alerts={alerts} (expected {assessments * EXPECTED_ALERTS}) '
+          f'unread counter={unread}')
+    ok = not failures and not locked and alerts == assessments * EXPECTED_ALERTS == unread
+    print('  OK' if ok else '  MISMATCH')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,102 @@
+"""Benchmark: t-digest population percentiles vs. exact counts
+
+Writes --size synthetic cognitive assessments spread over several game types
+and difficulties, rebuilds the digests, and for --queries random scores
+times the percentile lookup of PopulationIndex against an exact COUNT over
+cognitive_assessments. Reports the largest and mean percentile error of the
+digest, the stored digest sizes, and the cost of adding scores (including
+the periodic persist).
+
+Usage:
+    python benchmarks/bench_population_percentile.py [--size 1000000] [--queries 200]
+"""
+import argparse
+import random
+
+from common import use_temp_database, percentile, Timer
+
+import percentiles
+from config import Config
+from database import get_db, utc_timestamp
+
+GAME_TYPES = ['memory_match', 'reaction_test', 'sequence_recall']
+DIFFICULTIES = [1, 2, 3]
+
+
+def make_score(rng, difficulty):
+    # Skewed and rounded like real cognitive scores, so there are many ties
+    return round(min(max(rng.betavariate(5, 2) - 0.05 * difficulty, 0.0), 1.0), 3)
+
+
+def exact_percentile(cursor, game_type, difficulty, score):
+    cursor.execute(
+        '''SELECT SUM(cognitive_score < ?) + 0.5 * SUM(cognitive_score = ?), COUNT(*)
+           FROM cognitive_assessments WHERE game_type = ? AND difficulty_level = ?''',
+        (score, score, game_type, difficulty)
+    )
+    below, count = cursor.fetchone()
+    return 100 * below / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=1000000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--adds', type=int, default=10000)
+    args = parser.parse_args()
+
+    use_temp_database('percentiles.db')
+    rng = random.Random(23)
+    now = utc_timestamp()
+    with get_db() as conn:
+        cursor = conn.cursor()
+        rows = []
+        for i in range(args.size):
+            game_type, difficulty = rng.choice(GAME_TYPES), rng.choice(DIFFICULTIES)
+            rows.append((i % 1000 + 1, now, game_type, difficulty, make_score(rng, difficulty)))
+        cursor.executemany(
+            '''INSERT INTO cognitive_assessments (user_id, timestamp, game_type, difficulty_level, cognitive_score)
+               VALUES (?, ?, ?, ?, ?)''',
+            rows
+        )
+        del rows
+        conn.commit()
+
+        with Timer() as rebuild:
+            digests = percentiles.rebuild_digests(cursor, Config.DIGEST_COMPRESSION)
+        conn.commit()
+        sizes = [len(digest.to_json()) for digest in digests.values()]
+        print(f'{args.size:,} assessments, {len(digests)} digests')
+        print(f'  rebuild_digests {rebuild.elapsed:.1f}s, digest size {min(sizes):,}-{max(sizes):,} bytes')
+
+        index = percentiles.PopulationIndex(
+            compression=Config.DIGEST_COMPRESSION, persist_every=Config.DIGEST_PERSIST_EVERY,
+            persist_seconds=Config.DIGEST_PERSIST_SECONDS
+        )
+        fast, slow, errors = [], [], []
+        for _ in range(args.queries):
+            game_type, difficulty = rng.choice(GAME_TYPES), rng.choice(DIFFICULTIES)
+            score = make_score(rng, difficulty)
+            with Timer() as timer:
+                estimate, _ = index.percentile(cursor, game_type, difficulty, score)
+            fast.append(timer.elapsed * 1000)
+            with Timer() as timer:
+                exact = exact_percentile(cursor, game_type, difficulty, score)
+            slow.append(timer.elapsed * 1000)
+            errors.append(abs(estimate - exact))
+        print(f'  percentile lookup: digest p50 {percentile(fast, 50):.3f} ms, '
+              f'exact COUNT p50 {percentile(slow, 50):.1f} ms')
+        print(f'  error in percentile points: max {max(errors):.2f}, mean {sum(errors) / len(errors):.3f}')
+
+        adds = []
+        for _ in range(args.adds):
+            difficulty = rng.choice(DIFFICULTIES)
+            with Timer() as timer:
+                index.add(rng.choice(GAME_TYPES), difficulty, [make_score(rng, difficulty)])
+            adds.append(timer.elapsed * 1000)
+        print(f'  add one score: p50 {percentile(adds, 50):.3f} ms, p99 {percentile(adds, 99):.3f} ms '
+              f'(persist every {Config.DIGEST_PERSIST_EVERY})')
+
+
+if __name__ == '__main__':
+    main()
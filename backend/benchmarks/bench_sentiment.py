@@ -0,0 +1,64 @@
+"""Benchmark: sentiment backends and MoodAnalyzer latency/throughput
+
+Compares the TextBlob backend with the built-in lexicon backend on short
+(~20 word) and long (~500 word) journal-style texts: per-call p50/p95
+latency, texts/sec through score_many(), and end-to-end
+MoodAnalyzer.analyze_text with each backend (no result cache).
+
+Usage:
+    python benchmarks/bench_sentiment.py [--count 2000]
+"""
+import argparse
+import random
+import time
+
+from common import Timer, percentile
+from models.ai_models import MoodAnalyzer
+from models.sentiment import LexiconSentiment, TextBlobSentiment
+
+WORDS = ('i felt really anxious before the meeting but the walk afterwards was lovely and calm '
+         'work has been hectic demanding and not very rewarding lately so tired and lonely '
+         'dinner with friends was wonderful slept well woke up happy hopeless exhausted '
+         'proud grateful worried nervous great terrible okay fine!').split()
+
+
+def make_texts(count, words, rng):
+    return [' '.join(rng.choice(WORDS) for _ in range(words)) + '.' for _ in range(count)]
+
+
+def latencies(score, texts):
+    samples = []
+    for text in texts:
+        start = time.perf_counter()
+        score(text)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    backends = [TextBlobSentiment(), LexiconSentiment()]
+    for words, count in ((20, args.count), (500, max(args.count // 10, 1))):
+        texts = make_texts(count, words, rng)
+        print(f'\n{count} texts of {words} words')
+        for backend in backends:
+            samples = latencies(backend.score, texts)
+            with Timer() as batch:
+                backend.score_many(texts)
+            print(f'  {backend.name:9} p50 {percentile(samples, 50):7.3f} ms  '
+                  f'p95 {percentile(samples, 95):7.3f} ms  '
+                  f'{count / batch.elapsed:9.0f} texts/s')
+        for backend in backends:
+            analyzer = MoodAnalyzer(sentiment=backend)
+            with Timer() as timer:
+                for text in texts:
+                    analyzer.analyze_text(text)
+            print(f'  MoodAnalyzer.analyze_text ({backend.name:8}) {count / timer.elapsed:9.0f} texts/s')
+
+
+if __name__ == '__main__':
+    main()
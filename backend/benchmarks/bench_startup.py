@@ -0,0 +1,76 @@
+"""Startup benchmark: import-time profile of the app and first-request model cost
+
+Runs `python -X importtime -c "import app"` in a fresh interpreter and prints
+the total import time together with the slowest modules. It then times the
+first analysis request (which builds the mood model through the registry)
+against a second request that reuses it.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--top 15]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+import common
+from common import Timer
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_profile():
+    """Return [(cumulative_us, self_us, module)] for a cold `import app`"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        entries.append((int(cumulative_us), int(self_us), module.rstrip()))
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    totals = []
+    for _ in range(args.runs):
+        entries = import_profile()
+        totals.append(next(c for c, _, m in entries if m.strip() == 'app') / 1000)
+    print(f"import app: median {statistics.median(totals):.1f} ms over {args.runs} runs "
+          f"(min {min(totals):.1f}, max {max(totals):.1f})")
+
+    print(f"\nSlowest {args.top} modules by self time (last run):")
+    for cumulative_us, self_us, module in sorted(entries, key=lambda e: e[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms self {cumulative_us / 1000:8.1f} ms cumulative  {module.strip()}")
+
+    result = subprocess.run(
+        [sys.executable, '-c', 'import time; import app; start = time.perf_counter(); '
+                               'app.warmup_models(); print(time.perf_counter() - start)'],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    print(f"\nwarmup_models() after import: {float(result.stdout.split()[-1]) * 1000:.1f} ms")
+
+    common.use_temp_database()
+    import app as app_module
+    client = app_module.app.test_client()
+    headers = common.register_user(client)
+    payload = {'text': 'Feeling a little anxious about work but the walk helped.'}
+    for label in ('first request (builds model)', 'second request'):
+        with Timer() as timer:
+            response = client.post('/api/mood/analyze', json=payload, headers=headers)
+        assert response.status_code == 200, response.get_json()
+        print(f"{label}: {timer.elapsed * 1000:.1f} ms")
+    print(f"\nmodel registry: {app_module.model_registry.stats()}")
+
+
+if __name__ == '__main__':
+    main()
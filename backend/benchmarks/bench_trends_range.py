@@ -0,0 +1,98 @@
+"""Benchmark: function-wrapped vs. sargable timestamp range filters
+
+Fills health_metrics with --rows synthetic samples spread over --users users
+and a year of timestamps, then times the trends query with the old
+``datetime(timestamp) >= datetime('now', ...)`` predicate against the
+``timestamp >= ?`` index range scan, and prints both query plans.
+
+Usage:
+    python benchmarks/bench_trends_range.py [--rows 10000000] [--users 10000] [--days 7]
+"""
+import argparse
+import random
+from datetime import datetime, timedelta, timezone
+
+from common import use_temp_database, percentile, Timer
+
+import database
+from database import get_db, timestamp_days_ago, TIMESTAMP_FORMAT
+
+OLD_QUERY = '''SELECT * FROM health_metrics
+               WHERE user_id = ?
+               AND datetime(timestamp) >= datetime('now', '-' || ? || ' days')
+               ORDER BY timestamp ASC'''
+
+NEW_QUERY = '''SELECT * FROM health_metrics
+               WHERE user_id = ?
+               AND timestamp >= ?
+               ORDER BY timestamp ASC'''
+
+
+def fill(rows, users, batch=100000):
+    now = datetime.now(timezone.utc)
+    rng = random.Random(7)
+    with get_db() as conn:
+        inserted = 0
+        while inserted < rows:
+            size = min(batch, rows - inserted)
+            conn.executemany(
+                '''INSERT INTO health_metrics
+                   (user_id, timestamp, heart_rate, sleep_hours, steps, stress_level)
+                   VALUES (?, ?, ?, ?, ?, ?)''',
+                [
+                    (rng.randint(1, users),
+                     (now - timedelta(seconds=rng.randint(0, 365 * 86400))).strftime(TIMESTAMP_FORMAT),
+                     rng.randint(50, 110), rng.uniform(4, 9), rng.randint(0, 15000), rng.random())
+                    for _ in range(size)
+                ]
+            )
+            conn.commit()
+            inserted += size
+            print(f'  inserted {inserted:,} rows', end='\r')
+    print()
+
+
+def measure(sql, params_for, user_ids):
+    latencies = []
+    with get_db() as conn:
+        for user_id in user_ids:
+            with Timer() as timer:
+                conn.execute(sql, params_for(user_id)).fetchall()
+            latencies.append(timer.elapsed * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+
+    use_temp_database('trends.db')
+    print(f'Filling {database.DATABASE_NAME} with {args.rows:,} rows...')
+    with Timer() as timer:
+        fill(args.rows, args.users)
+    print(f'Filled in {timer.elapsed:.1f}s')
+
+    user_ids = random.Random(11).sample(range(1, args.users + 1), min(args.queries, args.users))
+    cutoff = timestamp_days_ago(args.days)
+    cases = [
+        ('datetime(timestamp) filter', OLD_QUERY, lambda u: (u, args.days)),
+        ('timestamp >= ? range scan', NEW_QUERY, lambda u: (u, cutoff)),
+    ]
+    with get_db() as conn:
+        for label, sql, params_for in cases:
+            plan = conn.execute('EXPLAIN QUERY PLAN ' + sql, params_for(user_ids[0])).fetchall()
+            print(f'\n{label}')
+            for row in plan:
+                print(f'  plan: {row[3]}')
+
+    for label, sql, params_for in cases:
+        latencies = measure(sql, params_for, user_ids)
+        print(f'{label:<28} p50={percentile(latencies, 50):8.2f}ms  p99={percentile(latencies, 99):8.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
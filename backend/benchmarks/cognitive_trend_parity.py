@@ -0,0 +1,136 @@
+"""Parity report: running cognitive trend statistics vs. np.polyfit
+
+Folds --series seeded random score sequences into cognitive_trends
+statistics and compares the slope and average of each fit mode with
+np.polyfit over the same assessments: the last window for 'window', every
+assessment for 'all', and a fit weighted by 0.5 ** (age / half-life) for
+'ewm'. Then writes random assessments, some with out-of-order timestamps,
+through cognitive_trends.record_assessments into a temporary database and
+checks the stored statistics against CognitiveAnalyzer.detect_decline_trend
+over the raw rows. Also times both ways of reading a user's trend.
+Exits non-zero if any difference exceeds --tolerance.
+
+Usage:
+    python benchmarks/cognitive_trend_parity.py [--series 2000] [--tolerance 1e-9]
+"""
+import argparse
+import random
+
+import numpy as np
+
+from common import use_temp_database, percentile, Timer
+
+import cognitive_trends
+from database import get_db
+from models.ai_models import CognitiveAnalyzer
+
+GAMES = ['memory', 'reaction', 'pattern']
+
+
+def random_scores(rng, length):
+    drift = rng.uniform(-0.02, 0.02)
+    return [min(max(0.6 + drift * i + rng.gauss(0, 0.08), 0.0), 1.0) for i in range(length)]
+
+
+def reference(scores, mode, window, decay):
+    """(slope, average cognitive score) by np.polyfit"""
+    if mode == 'window':
+        scores = scores[-window:]
+    y = np.array(scores)
+    x = np.arange(len(y), dtype=float)
+    if mode == 'ewm':
+        weights = decay ** (len(y) - 1 - x)
+        slope = np.polyfit(x, y, 1, w=np.sqrt(weights))[0] if len(y) > 1 else None
+        return slope, float(np.average(y, weights=weights))
+    slope = np.polyfit(x, y, 1)[0] if len(y) > 1 else None
+    return slope, float(y.mean())
+
+
+def compare_series(args, rng):
+    """Largest slope and average difference per mode over random sequences"""
+    errors = {mode: [0.0, 0.0] for mode in cognitive_trends.MODES}
+    for _ in range(args.series):
+        window = rng.choice([2, 5, 10, 30])
+        half_life = rng.choice([1, 3, 10, 50])
+        _, decay = cognitive_trends.trend_settings(window, half_life)
+        scores = random_scores(rng, rng.randint(1, args.max_length))
+        stats = cognitive_trends.empty_stats(window, decay)
+        for score in scores:
+            cognitive_trends.fold(stats, score, score, score)
+        for mode in cognitive_trends.MODES:
+            summary = cognitive_trends.summarize(stats, mode)
+            slope, average = reference(scores, mode, window, decay)
+            if (slope is None) != (summary['slope'] is None):
+                errors[mode][0] = float('inf')
+            elif slope is not None:
+                errors[mode][0] = max(errors[mode][0], abs(slope - summary['slope']))
+            errors[mode][1] = max(errors[mode][1], abs(average - summary['avg_cognitive_score']))
+    return errors
+
+
+def compare_database(args, rng):
+    """Largest slope difference between the stored statistics and the raw-row fit"""
+    use_temp_database('cognitive_trends.db')
+    analyzer = CognitiveAnalyzer()
+    worst, flag_changes, fast, slow = 0.0, 0, [], []
+    with get_db() as conn:
+        cursor = conn.cursor()
+        for user_id in range(1, args.users + 1):
+            day = 0
+            for _ in range(rng.randint(1, 60)):
+                # Mostly in order, sometimes back-dated
+                day += 1 if rng.random() > 0.1 else -rng.randint(1, 5)
+                score = rng.random()
+                cursor.execute(
+                    '''INSERT INTO cognitive_assessments
+                       (user_id, timestamp, game_type, cognitive_score, memory_score, focus_score)
+                       VALUES (?, ?, ?, ?, ?, ?)''',
+                    (user_id, f'2026-01-01 00:00:{day % 60:02d}' if day >= 0 else '2025-12-31 00:00:00',
+                     rng.choice(GAMES), score, score, score)
+                )
+                cognitive_trends.record_assessments(cursor, user_id, cursor.lastrowid)
+
+            with Timer() as timer:
+                stats = cognitive_trends.get_trend_stats(cursor, user_id)[cognitive_trends.ALL_GAMES]
+                summary = cognitive_trends.summarize(stats, 'window')
+                stored = analyzer.describe_trend(summary['slope'], summary['samples'])
+            fast.append(timer.elapsed * 1000)
+            with Timer() as timer:
+                cursor.execute('SELECT * FROM cognitive_assessments WHERE user_id = ?', (user_id,))
+                expected = analyzer.detect_decline_trend([dict(row) for row in cursor.fetchall()])
+            slow.append(timer.elapsed * 1000)
+
+            if 'slope' in expected:
+                worst = max(worst, abs(expected['slope'] - stored['slope']))
+            flag_changes += expected['trend'] != stored['trend']
+    return worst, flag_changes, fast, slow
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--series', type=int, default=2000)
+    parser.add_argument('--max-length', type=int, default=300)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--tolerance', type=float, default=1e-9)
+    args = parser.parse_args()
+    rng = random.Random(21)
+
+    failed = False
+    errors = compare_series(args, rng)
+    print(f'{args.series} random series of 1-{args.max_length} assessments')
+    for mode, (slope_error, average_error) in errors.items():
+        print(f'  {mode:<7} max slope error {slope_error:.3g}  max average error {average_error:.3g}')
+        failed |= max(slope_error, average_error) > args.tolerance
+
+    # describe_trend rounds the slope to 4 places
+    worst, flag_changes, fast, slow = compare_database(args, rng)
+    print(f'{args.users} users through record_assessments (window of 10)')
+    print(f'  max slope difference vs detect_decline_trend {worst:.3g}  trend changes {flag_changes}')
+    print(f'  read trend: stored statistics p50 {percentile(fast, 50):.3f} ms, '
+          f'polyfit over raw rows p50 {percentile(slow, 50):.3f} ms')
+    failed |= worst > 1e-4 or flag_changes > 0
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,52 @@
+"""Shared helpers for the MindTrack benchmark scripts"""
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+import database
+
+
+def use_temp_database(name='bench.db'):
+    """Point the database module at a fresh file in a temp directory"""
+    path = os.path.join(tempfile.mkdtemp(prefix='mindtrack-bench-'), name)
+    database.close_db()
+    database.DATABASE_NAME = path
+    database.init_database()
+    return path
+
+
+def register_user(client, email='bench@example.com'):
+    """Register a user through the API and return auth headers"""
+    response = client.post('/api/auth/register', json={
+        'email': email,
+        'password': 'benchmark-password',
+        'full_name': 'Benchmark User'
+    })
+    token = response.get_json()['access_token']
+    return {'Authorization': f'Bearer {token}'}
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class Timer:
+    """Context manager measuring wall time in seconds"""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+        return False
@@ -0,0 +1,70 @@
+"""Check: AnalysisExecutor recovers after one of its child processes dies
+
+Warms up an AnalysisExecutor, kills one of its children with SIGKILL (as
+the OOM killer would), and checks that the next long-text analysis still
+succeeds on a fresh pool. Then kills a child while an analysis is running
+in it and checks that the call is retried and succeeds. Exits non-zero if
+either call fails.
+
+Usage:
+    python benchmarks/executor_recovery.py [--workers 2]
+"""
+import argparse
+import os
+import signal
+import threading
+import time
+
+import common  # noqa: F401  (puts the backend on sys.path)
+from analysis_executor import AnalysisExecutor
+from models.ai_models import MoodAnalyzer
+
+TEXT = 'I felt really anxious before the meeting, but the walk helped. ' * 200
+
+
+def kill_child(executor):
+    pid = next(iter(executor._pool._processes))
+    os.kill(pid, signal.SIGKILL)
+    return pid
+
+
+def check(label, call):
+    try:
+        result = call()
+    except Exception as e:
+        print(f'  {label}: FAILED with {type(e).__name__}: {e}')
+        return False
+    print(f"  {label}: ok (mood_score {result['mood_score']})")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=2)
+    args = parser.parse_args()
+
+    executor = AnalysisExecutor(MoodAnalyzer(), workers=args.workers, timeout=30, min_chars=100)
+    executor.warmup()
+    expected = executor.inline_analyzer.analyze_text(TEXT)
+    ok = True
+    try:
+        pid = kill_child(executor)
+        print(f'Killed idle child {pid}')
+        time.sleep(0.5)  # let the pool notice
+        ok &= check('next analysis', lambda: executor.analyze_text(TEXT))
+
+        # Kill every child while a long analysis runs in one of them
+        long_text = TEXT * 200
+        threading.Timer(0.3, lambda: [os.kill(p, signal.SIGKILL) for p in list(executor._pool._processes)]).start()
+        print('Killing the children during an analysis')
+        ok &= check('analysis in flight', lambda: executor.analyze_text(long_text))
+        ok &= check('result unchanged', lambda: executor.analyze_text(TEXT + ' '))
+        ok &= executor.analyze_text(TEXT) == expected
+        print(f'  stats: {executor.stats()}')
+    finally:
+        executor.shutdown()
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,76 @@
+"""Check: search pages stay consistent when the index changes between pages
+
+Fills journal_entries with --entries synthetic entries, lists one user's
+matches for a word in a single page, then pages through the same search
+with --limit results per page while inserting entries between pages: other
+users' entries (which change the word's bm25 weight for everyone) and new
+matching entries of the user. Checks that the pages together return the
+single-page listing in the same order, each row once, and none of the rows
+added mid-listing. Exits non-zero otherwise.
+
+Usage:
+    python benchmarks/search_paging_check.py [--entries 5000] [--limit 7]
+"""
+import argparse
+import os
+import random
+
+from common import use_temp_database
+
+import search
+from database import get_db
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'sentiment_corpus.txt')
+USER_ID = 1
+WORD = 'walk'
+
+
+def make_entry(sentences, rng, word=''):
+    return ' '.join(rng.choice(sentences) for _ in range(rng.randint(3, 12))) + (' ' + word if word else '')
+
+
+def insert(conn, rows):
+    conn.executemany('INSERT INTO journal_entries (user_id, content) VALUES (?, ?)', rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--limit', type=int, default=7)
+    args = parser.parse_args()
+
+    use_temp_database('search_paging.db')
+    rng = random.Random(19)
+    with open(CORPUS, encoding='utf-8') as f:
+        sentences = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    with get_db() as conn:
+        insert(conn, [(rng.randint(1, args.users), make_entry(sentences, rng, rng.choice(['', '', WORD])))
+                      for _ in range(args.entries)])
+
+    with get_db() as conn:
+        expected, _ = search.search(conn.cursor(), USER_ID, WORD, limit=args.entries)
+    expected = [result['id'] for result in expected]
+
+    seen, after, pages = [], None, 0
+    while True:
+        with get_db() as conn:
+            results, after = search.search(conn.cursor(), USER_ID, WORD, limit=args.limit, after=after)
+            seen.extend(result['id'] for result in results)
+            pages += 1
+            if after is None:
+                break
+            insert(conn, [(rng.randint(2, args.users), make_entry(sentences, rng)) for _ in range(50)])
+            insert(conn, [(USER_ID, make_entry(sentences, rng, f'{WORD} {WORD} {WORD}'))])
+
+    duplicates = len(seen) - len(set(seen))
+    added = len(set(seen) - set(expected))
+    missing = len(set(expected) - set(seen))
+    print(f'{len(expected)} matches in {pages} pages of {args.limit}, with writes between pages')
+    print(f'  same order: {seen == expected}, duplicates {duplicates}, '
+          f'rows added mid-listing {added}, missing {missing}')
+    return 0 if seen == expected else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,77 @@
+"""Parity report: MoodAnalyzer.analyze_sections vs. analyze_text
+
+analyze_sections scores a long text chunk by chunk, so its overall scores
+are close to, but not always equal to, analyze_text on the whole text: the
+scorer carries a trailing intensifier or negation across a full stop
+("...through calmly. Pretty good"), a sentence longer than a chunk is cut at
+whitespace, and sums added chunk by chunk round differently. This builds
+--texts entries from the sentiment corpus (natural sentences) and as many
+from seeded random lexicon words, analyzes each both ways with small chunks
+to force many cuts, and reports how many agree exactly and the largest
+difference per score. Exits non-zero if any score differs by more than
+--tolerance.
+
+Usage:
+    python benchmarks/sections_parity.py [--texts 200] [--chunk-chars 500] [--tolerance 0.02]
+"""
+import argparse
+import random
+
+import common  # noqa: F401  (puts the backend on sys.path)
+from models.ai_models import MoodAnalyzer
+from models.sentiment import SENTIMENT_BACKENDS, create_sentiment_backend
+from sentiment_parity import load_corpus, synthetic_texts
+
+SCORES = ['mood_score', 'anxiety_level', 'depression_indicators', 'stress_level',
+          'sentiment_polarity', 'sentiment_subjectivity']
+
+
+def corpus_entry(corpus, chars, rng):
+    parts, size = [], 0
+    while size < chars:
+        parts.append(rng.choice(corpus))
+        parts.append(rng.choice([' ', ' ', '\n\n']))
+        size += len(parts[-2]) + len(parts[-1])
+    return ''.join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--texts', type=int, default=200, help='entries of each kind')
+    parser.add_argument('--chars', type=int, default=5000)
+    parser.add_argument('--chunk-chars', type=int, default=500)
+    parser.add_argument('--tolerance', type=float, default=0.02)
+    parser.add_argument('--backends', nargs='+', choices=list(SENTIMENT_BACKENDS), default=list(SENTIMENT_BACKENDS))
+    args = parser.parse_args()
+
+    rng = random.Random(16)
+    corpus = load_corpus()
+    words = list(create_sentiment_backend('lexicon')._index)
+    entries = {
+        'corpus': [corpus_entry(corpus, args.chars, rng) for _ in range(args.texts)],
+        'synthetic': [' '.join(synthetic_texts(args.chars // 150, words, rng)) for _ in range(args.texts)]
+    }
+
+    failed = False
+    for backend in args.backends:
+        analyzer = MoodAnalyzer(sentiment=create_sentiment_backend(backend))
+        for kind, texts in entries.items():
+            identical, label_changes = 0, 0
+            worst = dict.fromkeys(SCORES, 0.0)
+            for text in texts:
+                whole = analyzer.analyze_text(text)
+                chunked = analyzer.analyze_sections(text, chunk_chars=args.chunk_chars)
+                chunked.pop('sections')
+                identical += whole == chunked
+                label_changes += whole['emotions'] != chunked['emotions']
+                for score in SCORES:
+                    worst[score] = max(worst[score], abs(whole[score] - chunked[score]))
+            failed |= max(worst.values()) > args.tolerance
+            print(f'{backend} / {kind}: {identical} / {len(texts)} identical, '
+                  f'{label_changes} emotion label changes')
+            print('  max abs difference: ' + ', '.join(f'{score} {worst[score]:.3f}' for score in SCORES))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
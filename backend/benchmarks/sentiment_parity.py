@@ -0,0 +1,81 @@
+"""Parity report: built-in lexicon sentiment backend vs. TextBlob
+
+Scores the fixed corpus in benchmarks/data/sentiment_corpus.txt plus
+--synthetic seeded random texts built from lexicon words, negations,
+intensifiers, punctuation and emoticons. Reports how many texts score
+identically, the largest differences, and whether the emotion label that
+MoodAnalyzer derives from polarity (positive / negative / neutral) changes.
+Exits non-zero if any text differs by more than --tolerance.
+
+Usage:
+    python benchmarks/sentiment_parity.py [--synthetic 5000] [--tolerance 1e-9]
+"""
+import argparse
+import os
+import random
+
+import common  # noqa: F401  (puts the backend on sys.path)
+from models.sentiment import LexiconSentiment, TextBlobSentiment
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'sentiment_corpus.txt')
+FILLER = ("I you the day work was is felt feel today not never no n't don't can't really very "
+          "so quite extremely . , ! ? ... !!! :) :( :-D <3 ;-) (!) \"great\" Mr. etc. e.g. good:)").split()
+
+
+def load_corpus():
+    with open(CORPUS_PATH, encoding='utf-8') as f:
+        return [line.rstrip('\n') for line in f if line.strip() and not line.startswith('#')]
+
+
+def synthetic_texts(count, words, rng):
+    pool = words + FILLER * 20
+    texts = [' '.join(rng.choice(pool) for _ in range(rng.randint(1, 60))) for _ in range(count)]
+    return [text.lower() if rng.random() < 0.5 else text for text in texts]
+
+
+def label(polarity):
+    """The polarity part of MoodAnalyzer._extract_emotions"""
+    if polarity > 0.3:
+        return 'positive'
+    if polarity < -0.3:
+        return 'negative'
+    return 'neutral'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--synthetic', type=int, default=5000)
+    parser.add_argument('--tolerance', type=float, default=1e-9)
+    parser.add_argument('--show', type=int, default=10, help='worst differences to print')
+    args = parser.parse_args()
+
+    reference, candidate = TextBlobSentiment(), LexiconSentiment()
+    corpus = load_corpus()
+    texts = corpus + synthetic_texts(args.synthetic, list(candidate._index), random.Random(14))
+
+    diffs = []
+    for text in texts:
+        expected, actual = reference.score(text), candidate.score(text)
+        diffs.append((max(abs(expected[0] - actual[0]), abs(expected[1] - actual[1])),
+                      text, expected, actual))
+
+    differing = [d for d in diffs if d[0] > args.tolerance]
+    label_changes = sum(1 for _, _, e, a in diffs if label(e[0]) != label(a[0]))
+    polarity_error = [abs(e[0] - a[0]) for _, _, e, a in diffs]
+    subjectivity_error = [abs(e[1] - a[1]) for _, _, e, a in diffs]
+
+    print(f'{len(texts)} texts ({len(corpus)} corpus, {args.synthetic} synthetic), '
+          f'lexicon of {len(candidate)} entries')
+    print(f'  identical (<= {args.tolerance:g}):  {len(texts) - len(differing)} / {len(texts)}')
+    print(f'  polarity abs error:     max {max(polarity_error):.3g}  '
+          f'mean {sum(polarity_error) / len(texts):.3g}')
+    print(f'  subjectivity abs error: max {max(subjectivity_error):.3g}  '
+          f'mean {sum(subjectivity_error) / len(texts):.3g}')
+    print(f'  emotion label changes:  {label_changes}')
+    for diff, text, expected, actual in sorted(differing, reverse=True)[:args.show]:
+        print(f'  {diff:.3g}  textblob={expected}  lexicon={actual}  {text[:80]!r}')
+    return 1 if differing else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
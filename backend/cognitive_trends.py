@@ -0,0 +1,284 @@
+"""Running regression statistics for cognitive decline tracking
+
+Each cognitive assessment folds its scores into one cognitive_trend_stats row
+per (user_id, game_type) plus an ALL_GAMES row per user. A row holds the sums
+a least-squares fit of cognitive score against assessment number needs, in
+three flavours:
+
+- window: the last COGNITIVE_TREND_WINDOW assessments (the scores themselves
+  are kept so the oldest can be dropped again)
+- ewm: every assessment, weighted by 0.5 ** (age / COGNITIVE_TREND_HALF_LIFE)
+- all: every assessment, equally weighted
+
+so slope, averages and the decline flag of any flavour are read from one row
+instead of refitting the history. Assessments are ordered by (timestamp, id);
+one that arrives out of order, or a change to the window or half-life,
+recomputes the user's rows from cognitive_assessments.
+"""
+import json
+
+from config import Config
+
+ALL_GAMES = '*'
+MODES = ('window', 'ewm', 'all')
+
+# Score columns folded into the averages, the first one is also regressed
+SCORES = ('cognitive_score', 'memory_score', 'focus_score')
+
+STAT_COLUMNS = [
+    'window_size', 'ring', 'w_sum_y', 'w_sum_xy', 'w_sum_memory', 'w_sum_focus',
+    'n', 'sum_x', 'sum_y', 'sum_xy', 'sum_xx', 'sum_memory', 'sum_focus',
+    'ew_decay', 'ew_w', 'ew_x', 'ew_xx', 'ew_y', 'ew_xy', 'ew_memory', 'ew_focus',
+    'last_timestamp', 'last_id'
+]
+
+
+def create_trend_table(cursor):
+    """Create the cognitive_trend_stats table"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cognitive_trend_stats (
+            user_id INTEGER NOT NULL,
+            game_type TEXT NOT NULL,
+            window_size INTEGER NOT NULL,
+            ring TEXT NOT NULL DEFAULT '[]',
+            w_sum_y REAL NOT NULL DEFAULT 0,
+            w_sum_xy REAL NOT NULL DEFAULT 0,
+            w_sum_memory REAL NOT NULL DEFAULT 0,
+            w_sum_focus REAL NOT NULL DEFAULT 0,
+            n INTEGER NOT NULL DEFAULT 0,
+            sum_x REAL NOT NULL DEFAULT 0,
+            sum_y REAL NOT NULL DEFAULT 0,
+            sum_xy REAL NOT NULL DEFAULT 0,
+            sum_xx REAL NOT NULL DEFAULT 0,
+            sum_memory REAL NOT NULL DEFAULT 0,
+            sum_focus REAL NOT NULL DEFAULT 0,
+            ew_decay REAL NOT NULL,
+            ew_w REAL NOT NULL DEFAULT 0,
+            ew_x REAL NOT NULL DEFAULT 0,
+            ew_xx REAL NOT NULL DEFAULT 0,
+            ew_y REAL NOT NULL DEFAULT 0,
+            ew_xy REAL NOT NULL DEFAULT 0,
+            ew_memory REAL NOT NULL DEFAULT 0,
+            ew_focus REAL NOT NULL DEFAULT 0,
+            last_timestamp TEXT,
+            last_id INTEGER,
+            PRIMARY KEY (user_id, game_type)
+        ) WITHOUT ROWID
+    ''')
+
+
+def trend_settings(window=None, half_life=None):
+    """(window size, per-assessment decay) from the arguments or Config"""
+    window = max(int(window or Config.COGNITIVE_TREND_WINDOW), 2)
+    half_life = float(half_life or Config.COGNITIVE_TREND_HALF_LIFE)
+    return window, 0.5 ** (1 / half_life)
+
+
+def empty_stats(window, decay):
+    """Statistics of a series with no assessments"""
+    stats = {column: 0.0 for column in STAT_COLUMNS}
+    stats.update({
+        'window_size': window, 'ring': [], 'n': 0, 'ew_decay': decay,
+        'last_timestamp': None, 'last_id': None
+    })
+    return stats
+
+
+def fold(stats, cognitive, memory, focus):
+    """Add the next assessment of a series to its statistics in place"""
+    cognitive, memory, focus = cognitive or 0.0, memory or 0.0, focus or 0.0
+
+    # Window: x runs 0..m-1 over the kept scores; dropping the oldest shifts
+    # every remaining x down by one
+    ring = stats['ring']
+    if len(ring) >= stats['window_size']:
+        old_y, old_memory, old_focus = ring.pop(0)
+        stats['w_sum_y'] -= old_y
+        stats['w_sum_xy'] -= stats['w_sum_y']
+        stats['w_sum_memory'] -= old_memory
+        stats['w_sum_focus'] -= old_focus
+    stats['w_sum_xy'] += len(ring) * cognitive
+    stats['w_sum_y'] += cognitive
+    stats['w_sum_memory'] += memory
+    stats['w_sum_focus'] += focus
+    ring.append([cognitive, memory, focus])
+
+    # All-time: x is the assessment number
+    x = stats['n']
+    stats['n'] += 1
+    stats['sum_x'] += x
+    stats['sum_xx'] += x * x
+    stats['sum_y'] += cognitive
+    stats['sum_xy'] += x * cognitive
+    stats['sum_memory'] += memory
+    stats['sum_focus'] += focus
+
+    # Exponentially weighted: the newest assessment sits at x = 0, so the
+    # older ones move to x - 1 and lose one step of weight
+    decay = stats['ew_decay']
+    stats['ew_xx'] = decay * (stats['ew_xx'] - 2 * stats['ew_x'] + stats['ew_w'])
+    stats['ew_xy'] = decay * (stats['ew_xy'] - stats['ew_y'])
+    stats['ew_x'] = decay * (stats['ew_x'] - stats['ew_w'])
+    stats['ew_w'] = decay * stats['ew_w'] + 1
+    stats['ew_y'] = decay * stats['ew_y'] + cognitive
+    stats['ew_memory'] = decay * stats['ew_memory'] + memory
+    stats['ew_focus'] = decay * stats['ew_focus'] + focus
+    return stats
+
+
+def summarize(stats, mode=None):
+    """
+    Slope and averages of one series
+    Returns: dict with samples (assessments in the fit), slope (cognitive
+    score per assessment, None below two samples) and the average scores
+    """
+    mode = mode or Config.COGNITIVE_TREND_MODE
+    if mode == 'window':
+        m = len(stats['ring'])
+        weight, sum_x, sum_xx = m, m * (m - 1) / 2, (m - 1) * m * (2 * m - 1) / 6
+        sum_y, sum_xy = stats['w_sum_y'], stats['w_sum_xy']
+        sum_memory, sum_focus, samples = stats['w_sum_memory'], stats['w_sum_focus'], m
+    elif mode == 'ewm':
+        weight, sum_x, sum_xx = stats['ew_w'], stats['ew_x'], stats['ew_xx']
+        sum_y, sum_xy = stats['ew_y'], stats['ew_xy']
+        sum_memory, sum_focus, samples = stats['ew_memory'], stats['ew_focus'], stats['n']
+    elif mode == 'all':
+        weight, sum_x, sum_xx = stats['n'], stats['sum_x'], stats['sum_xx']
+        sum_y, sum_xy = stats['sum_y'], stats['sum_xy']
+        sum_memory, sum_focus, samples = stats['sum_memory'], stats['sum_focus'], stats['n']
+    else:
+        raise ValueError(f'Unknown trend mode: {mode}')
+
+    if not samples:
+        return {'samples': 0, 'slope': None, 'avg_cognitive_score': None,
+                'avg_memory_score': None, 'avg_focus_score': None}
+    spread = weight * sum_xx - sum_x * sum_x
+    slope = (weight * sum_xy - sum_x * sum_y) / spread if samples > 1 and spread > 0 else None
+    return {
+        'samples': samples,
+        'slope': slope,
+        'avg_cognitive_score': sum_y / weight,
+        'avg_memory_score': sum_memory / weight,
+        'avg_focus_score': sum_focus / weight
+    }
+
+
+def rebuild_trend_stats(cursor, user_id=None, window=None, half_life=None):
+    """Recompute the statistics from cognitive_assessments (all users, or one user)"""
+    window, decay = trend_settings(window, half_life)
+    where, params = ('WHERE user_id = ?', (user_id,)) if user_id is not None else ('', ())
+    cursor.execute(f'DELETE FROM cognitive_trend_stats {where}', params)
+    rows = cursor.execute(
+        f'''SELECT id, user_id, game_type, timestamp, {', '.join(SCORES)}
+            FROM cognitive_assessments {where}
+            ORDER BY user_id, timestamp, id''',
+        params
+    ).fetchall()
+
+    series = {}
+    for row in rows:
+        # A set, so a row stored with the ALL_GAMES game type is folded in once
+        for game_type in {row['game_type'], ALL_GAMES}:
+            stats = series.get((row['user_id'], game_type))
+            if stats is None:
+                stats = series[(row['user_id'], game_type)] = empty_stats(window, decay)
+            fold(stats, *(row[score] for score in SCORES))
+            stats['last_timestamp'], stats['last_id'] = row['timestamp'], row['id']
+    for (owner, game_type), stats in series.items():
+        _store(cursor, owner, game_type, stats)
+
+
+def record_assessments(cursor, user_id, first_id, window=None, half_life=None):
+    """
+    Fold the user's just-inserted cognitive assessments (ids from first_id on)
+    into their statistics
+    Recomputes the user's rows instead when one of them is older than an
+    assessment already folded in, or the stored window/half-life differ from
+    the settings
+    """
+    window, decay = trend_settings(window, half_life)
+    rows = cursor.execute(
+        f'''SELECT id, game_type, timestamp, {', '.join(SCORES)} FROM cognitive_assessments
+            WHERE user_id = ? AND id >= ?
+            ORDER BY timestamp, id''',
+        (user_id, first_id)
+    ).fetchall()
+    if not rows:
+        return
+
+    series = {}
+    for game_type in {row['game_type'] for row in rows} | {ALL_GAMES}:
+        stats = _load(cursor, user_id, game_type)
+        if stats is None:
+            stats = empty_stats(window, decay)
+        elif stats['window_size'] != window or stats['ew_decay'] != decay:
+            rebuild_trend_stats(cursor, user_id, window, half_life)
+            return
+        series[game_type] = stats
+    # The all-games row holds the newest assessment folded in so far
+    newest = series[ALL_GAMES]
+    if (newest['last_timestamp'] or '', newest['last_id'] or 0) > (rows[0]['timestamp'] or '', rows[0]['id']):
+        rebuild_trend_stats(cursor, user_id, window, half_life)
+        return
+
+    for row in rows:
+        # A set, so a row stored with the ALL_GAMES game type is folded in once
+        for game_type in {row['game_type'], ALL_GAMES}:
+            stats = series[game_type]
+            fold(stats, *(row[score] for score in SCORES))
+            stats['last_timestamp'], stats['last_id'] = row['timestamp'], row['id']
+    for game_type, stats in series.items():
+        _store(cursor, user_id, game_type, stats)
+
+
+def get_trend_stats(cursor, user_id, window=None, half_life=None):
+    """
+    The user's statistics per game type (ALL_GAMES for all of them), recomputed
+    first if they were built with another window or half-life
+    Returns: {game_type: stats}
+    """
+    window, decay = trend_settings(window, half_life)
+    cursor.execute('SELECT * FROM cognitive_trend_stats WHERE user_id = ?', (user_id,))
+    series = {row['game_type']: _from_row(row) for row in cursor.fetchall()}
+    if any(stats['window_size'] != window or stats['ew_decay'] != decay for stats in series.values()):
+        rebuild_trend_stats(cursor, user_id, window, half_life)
+        return get_trend_stats(cursor, user_id, window, half_life)
+    return series
+
+
+def _from_row(row):
+    stats = {column: row[column] for column in STAT_COLUMNS}
+    stats['ring'] = json.loads(stats['ring'])
+    return stats
+
+
+def _load(cursor, user_id, game_type):
+    cursor.execute(
+        'SELECT * FROM cognitive_trend_stats WHERE user_id = ? AND game_type = ?',
+        (user_id, game_type)
+    )
+    row = cursor.fetchone()
+    return _from_row(row) if row else None
+
+
+def _store(cursor, user_id, game_type, stats):
+    values = dict(stats, ring=json.dumps(stats['ring']))
+    cursor.execute(
+        f'''INSERT OR REPLACE INTO cognitive_trend_stats (user_id, game_type, {', '.join(STAT_COLUMNS)})
+            VALUES (?, ?, {', '.join('?' for _ in STAT_COLUMNS)})''',
+        [user_id, game_type] + [values[column] for column in STAT_COLUMNS]
+    )
+
+
+if __name__ == '__main__':
+    import sys
+    from database import get_db, init_database
+
+    if '--rebuild' in sys.argv:
+        init_database()
+        with get_db() as conn:
+            rebuild_trend_stats(conn.cursor())
+            count = conn.execute('SELECT COUNT(*) FROM cognitive_assessments').fetchone()[0]
+        print(f"Rebuilt cognitive trend statistics from {count} assessments")
+    else:
+        print('Usage: python cognitive_trends.py --rebuild')
@@ -17,13 +17,70 @@ class Config:
     
     # Database
     DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///mindtrack.db')
-    
+
+    # SQLite connection pool and pragmas
+    SQLITE_POOL_ENABLED = os.getenv('SQLITE_POOL_ENABLED', 'true').lower() == 'true'
+    SQLITE_POOL_SIZE = int(os.getenv('SQLITE_POOL_SIZE', 8))  # idle connections kept per process
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', 65536))
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 268435456))  # 256 MB
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_TEMP_STORE = os.getenv('SQLITE_TEMP_STORE', 'MEMORY')
+    SQLITE_STATEMENT_CACHE_SIZE = 256
+
     # CORS
     CORS_ORIGINS = ['http://localhost:5173', 'http://localhost:3000']
     
     # AI Models
     MOOD_MODEL_PATH = 'models/mood_classifier.pkl'
     COGNITIVE_MODEL_PATH = 'models/cognitive_analyzer.pkl'
+    MOOD_LEXICON_PATH = os.getenv('MOOD_LEXICON_PATH')  # optional custom keyword lexicon (JSON)
+    SENTIMENT_BACKEND = os.getenv('SENTIMENT_BACKEND', 'lexicon')  # 'lexicon' (built-in) or 'textblob'
+    SENTIMENT_LEXICON_PATH = os.getenv('SENTIMENT_LEXICON_PATH')  # defaults to models/lexicons/sentiment_en.tsv
+    
+    # Build every AI model at startup instead of on first use
+    MODEL_WARMUP = os.getenv('MODEL_WARMUP', 'false').lower() == 'true'
+    
+    # Analysis result cache (LRU, keyed by a hash of the normalized text)
+    ANALYSIS_CACHE_ENABLED = os.getenv('ANALYSIS_CACHE_ENABLED', 'true').lower() == 'true'
+    ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv('ANALYSIS_CACHE_MAX_ENTRIES', 4096))
+    ANALYSIS_CACHE_MAX_BYTES = int(os.getenv('ANALYSIS_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+    
+    # Process pool for long-text analysis, off the request threads
+    ANALYSIS_EXECUTOR_ENABLED = os.getenv('ANALYSIS_EXECUTOR_ENABLED', 'true').lower() == 'true'
+    ANALYSIS_EXECUTOR_WORKERS = int(os.getenv('ANALYSIS_EXECUTOR_WORKERS', 0))  # 0 = one per core, shared out among gunicorn workers
+    ANALYSIS_EXECUTOR_MAX_PENDING = int(os.getenv('ANALYSIS_EXECUTOR_MAX_PENDING', 64))
+    ANALYSIS_EXECUTOR_TIMEOUT_SECONDS = float(os.getenv('ANALYSIS_EXECUTOR_TIMEOUT_SECONDS', 10))
+    ANALYSIS_EXECUTOR_MIN_CHARS = int(os.getenv('ANALYSIS_EXECUTOR_MIN_CHARS', 2000))  # shorter texts run inline
+    
+    # Journal entries this long are analyzed in chunks and get per-section scores
+    JOURNAL_SECTIONS_MIN_CHARS = int(os.getenv('JOURNAL_SECTIONS_MIN_CHARS', 4000))
+    JOURNAL_MAX_SECTIONS = 20
+    ANALYSIS_CHUNK_CHARS = 4000  # paragraph/sentence-sized chunks for streaming analysis
+    
+    # TF-IDF keywords stored with each journal entry
+    JOURNAL_KEYWORDS_TOP_K = int(os.getenv('JOURNAL_KEYWORDS_TOP_K', 8))
+    JOURNAL_SIMILAR_ON_CREATE = 3  # similar past entries returned with a new entry
+    
+    # Cognitive game result batch uploads
+    COGNITIVE_BATCH_MAX_RESULTS = int(os.getenv('COGNITIVE_BATCH_MAX_RESULTS', 5000))
+    
+    # Per-trial telemetry of cognitive games, stored as packed (optionally zlib) blobs
+    TELEMETRY_MAX_TRIALS = int(os.getenv('TELEMETRY_MAX_TRIALS', 1000))
+    TELEMETRY_COMPRESS = os.getenv('TELEMETRY_COMPRESS', 'true').lower() == 'true'
+    
+    # Population percentiles of cognitive scores (t-digest per game type and difficulty)
+    DIGEST_COMPRESSION = 100
+    DIGEST_PERSIST_EVERY = int(os.getenv('DIGEST_PERSIST_EVERY', 100))  # scores buffered per process
+    DIGEST_PERSIST_SECONDS = float(os.getenv('DIGEST_PERSIST_SECONDS', 60))
+    COGNITIVE_PERCENTILE_MIN_POPULATION = int(os.getenv('COGNITIVE_PERCENTILE_MIN_POPULATION', 20))
+    
+    # Cognitive decline trend: fit over the last N assessments ('window'),
+    # exponentially weighted by age ('ewm') or over every assessment ('all')
+    COGNITIVE_TREND_MODE = os.getenv('COGNITIVE_TREND_MODE', 'window')
+    COGNITIVE_TREND_WINDOW = int(os.getenv('COGNITIVE_TREND_WINDOW', 10))
+    COGNITIVE_TREND_HALF_LIFE = float(os.getenv('COGNITIVE_TREND_HALF_LIFE', 10))  # in assessments
     
     # Thresholds
     STRESS_THRESHOLD = 0.7
@@ -31,6 +88,13 @@ class Config:
     DEPRESSION_THRESHOLD = 0.6
     COGNITIVE_DECLINE_THRESHOLD = 0.5
     
+    # Health metrics batch uploads
+    HEALTH_BATCH_MAX_SAMPLES = int(os.getenv('HEALTH_BATCH_MAX_SAMPLES', 5000))
+    HEALTH_BATCH_MAX_FUTURE_SECONDS = 300  # tolerated client clock skew
+    
+    # Data export
+    EXPORT_BATCH_SIZE = 500  # rows per fetchmany() while streaming
+    
     # Alert Settings
     ALERT_EMAIL_ENABLED = False
     ALERT_SMS_ENABLED = False
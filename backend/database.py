@@ -1,23 +1,187 @@
+import os
 import sqlite3
 import json
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta, timezone
 from contextlib import contextmanager
 
+from config import Config
+from migrations import migrate
+
 DATABASE_NAME = 'mindtrack.db'
 
+# Canonical timestamp text, identical to what SQLite's CURRENT_TIMESTAMP writes
+# (UTC, second resolution). Keeping every row in this one format makes the
+# text ordering chronological and lets range filters use the indexes.
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Process-wide connection pool: up to SQLITE_POOL_SIZE idle connections per
+# database file, most recently used first. A thread checks one out for its
+# outermost get_db() block and returns it afterwards, so routes reuse a warm
+# page cache and statement cache even though the development server starts a
+# new thread for every request.
+_pool_lock = threading.Lock()
+_pool_pid = None
+_idle = {}
+
+# The connection each thread has checked out, and its get_db() nesting depth
+_local = threading.local()
+
+
+def utc_timestamp(value=None):
+    """Format a datetime (default: now) as canonical UTC timestamp text"""
+    if value is None:
+        value = datetime.now(timezone.utc)
+    elif value.tzinfo is None:
+        value = value.astimezone()
+    return value.astimezone(timezone.utc).strftime(TIMESTAMP_FORMAT)
+
+
+def parse_timestamp(value):
+    """
+    Parse a client timestamp (ISO 8601 text or epoch seconds/milliseconds)
+    Returns: timezone-aware UTC datetime, or None if it cannot be parsed
+    """
+    try:
+        if isinstance(value, bool):
+            return None
+        if isinstance(value, (int, float)):
+            seconds = value / 1000 if abs(value) >= 1e11 else value
+            return datetime.fromtimestamp(seconds, timezone.utc)
+        if isinstance(value, str):
+            parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            return parsed.astimezone(timezone.utc)
+    except (ValueError, OverflowError, OSError):
+        return None
+    return None
+
+
+def timestamp_days_ago(days):
+    """Canonical timestamp text for the start of a trailing window of days"""
+    return utc_timestamp(datetime.now(timezone.utc) - timedelta(days=days))
+
+
+def _connect(check_same_thread=True):
+    """Open a new connection to DATABASE_NAME"""
+    conn = sqlite3.connect(
+        DATABASE_NAME,
+        timeout=Config.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        cached_statements=Config.SQLITE_STATEMENT_CACHE_SIZE,
+        check_same_thread=check_same_thread
+    )
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _configure_connection(conn):
+    """Apply the tuned pragmas to a pooled connection"""
+    conn.execute(f'PRAGMA journal_mode = {Config.SQLITE_JOURNAL_MODE}')
+    conn.execute(f'PRAGMA synchronous = {Config.SQLITE_SYNCHRONOUS}')
+    conn.execute(f'PRAGMA cache_size = -{int(Config.SQLITE_CACHE_SIZE_KB)}')
+    conn.execute(f'PRAGMA mmap_size = {int(Config.SQLITE_MMAP_SIZE)}')
+    conn.execute(f'PRAGMA busy_timeout = {int(Config.SQLITE_BUSY_TIMEOUT_MS)}')
+    conn.execute(f'PRAGMA temp_store = {Config.SQLITE_TEMP_STORE}')
+
+
+def _checkout(name):
+    """Take an idle pooled connection to name, or open a new one"""
+    global _pool_pid
+    pid = os.getpid()
+    with _pool_lock:
+        if _pool_pid != pid:
+            # Connections must never be shared across a fork
+            _pool_pid = pid
+            _idle.clear()
+        idle = _idle.get(name)
+        conn = idle.pop() if idle else None
+    if conn is None:
+        # Only one thread uses a connection at a time, but not always the same one
+        conn = _connect(check_same_thread=False)
+        _configure_connection(conn)
+    return conn
+
+
+def _checkin(name, conn):
+    """Return a connection to the pool, closing it if the pool is full"""
+    if not conn.in_transaction:
+        with _pool_lock:
+            idle = _idle.setdefault(name, [])
+            if _pool_pid == os.getpid() and len(idle) < Config.SQLITE_POOL_SIZE:
+                idle.append(conn)
+                return
+    conn.close()
+
+
+def _thread_checkouts():
+    """{database name: (connection, depth)} for the current thread"""
+    pid = os.getpid()
+    if getattr(_local, 'pid', None) != pid:
+        _local.pid = pid
+        _local.checkouts = {}
+    return _local.checkouts
+
+
+def close_db():
+    """Close every idle pooled connection of this process"""
+    with _pool_lock:
+        connections = [conn for idle in _idle.values() for conn in idle] if _pool_pid == os.getpid() else []
+        _idle.clear()
+    for conn in connections:
+        conn.close()
+
+
 @contextmanager
 def get_db():
-    """Context manager for database connections"""
-    conn = sqlite3.connect(DATABASE_NAME)
-    conn.row_factory = sqlite3.Row
+    """Context manager for database connections
+
+    Connections come from a process-wide pool and stay open between
+    requests. Nested calls on the same thread share the outer connection and
+    transaction through a savepoint, so only the outermost block commits.
+    """
+    if not Config.SQLITE_POOL_ENABLED:
+        conn = _connect()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException as e:
+            conn.rollback()
+            raise e
+        finally:
+            conn.close()
+        return
+
+    name = DATABASE_NAME
+    checkouts = _thread_checkouts()
+    conn, depth = checkouts.get(name, (None, 0))
+    if conn is None:
+        conn = _checkout(name)
+    checkouts[name] = (conn, depth + 1)
+    savepoint = f'nested_{depth}'
     try:
+        if depth:
+            conn.execute(f'SAVEPOINT {savepoint}')
         yield conn
-        conn.commit()
-    except Exception as e:
-        conn.rollback()
+        if depth:
+            conn.execute(f'RELEASE {savepoint}')
+        else:
+            conn.commit()
+    except BaseException as e:
+        # BaseException so a closed streaming generator also rolls back
+        if depth:
+            conn.execute(f'ROLLBACK TO {savepoint}')
+            conn.execute(f'RELEASE {savepoint}')
+        else:
+            conn.rollback()
         raise e
     finally:
-        conn.close()
+        if depth:
+            checkouts[name] = (conn, depth)
+        else:
+            del checkouts[name]
+            _checkin(name, conn)
+
 
 def init_database():
     """Initialize database with all required tables"""
@@ -176,6 +340,9 @@ def init_database():
             )
         ''')
         
+        # Indexes and later schema changes
+        migrate(conn)
+        
         print("Database initialized successfully!")
 
 if __name__ == '__main__':
@@ -0,0 +1,27 @@
+"""Gunicorn settings, loaded automatically when gunicorn runs from backend/
+
+Usage:
+    gunicorn -w 4 -b 0.0.0.0:5000 app:app
+
+Every gunicorn worker starts its own analysis process pool. Unless
+ANALYSIS_EXECUTOR_WORKERS is set, each pool gets an equal share of the cores
+(cores / gunicorn workers, at least one) instead of one process per core.
+"""
+import multiprocessing
+
+from config import Config
+
+
+def post_fork(server, worker):
+    # Runs in the worker before it loads app.py, which builds the executor from Config
+    if not Config.ANALYSIS_EXECUTOR_WORKERS:
+        Config.ANALYSIS_EXECUTOR_WORKERS = max(multiprocessing.cpu_count() // server.cfg.workers, 1)
+
+
+def post_worker_init(worker):
+    # Warm up once the worker has loaded the app, never at import time: the
+    # analysis executor's spawned children re-import app.py
+    if Config.MODEL_WARMUP:
+        from app import warmup_models
+
+        warmup_models()
@@ -0,0 +1,202 @@
+"""Validation for bulk uploads: wearable health metrics and cognitive game results"""
+import json
+import math
+import time
+
+from database import parse_timestamp, utc_timestamp
+
+# Accepted ranges for numeric health metrics (inclusive)
+HEALTH_NUMERIC_FIELDS = {
+    'heart_rate': (20, 250),
+    'hrv_score': (0, 300),
+    'sleep_hours': (0, 24),
+    'steps': (0, 200000),
+    'stress_level': (0, 1)
+}
+
+HEALTH_TEXT_FIELDS = ['sleep_quality', 'activity_level']
+
+# Column order used by the batch INSERT
+HEALTH_COLUMNS = ['timestamp'] + list(HEALTH_NUMERIC_FIELDS) + HEALTH_TEXT_FIELDS
+
+# Game result fields -> (default, lowest accepted value); difficulty is a whole number
+GAME_NUMERIC_FIELDS = {
+    'score': (0, 0),
+    'reaction_time': (0, 0),
+    'accuracy': (0, 0),
+    'difficulty_level': (1, 1)
+}
+# Column order of validated game result rows
+GAME_RESULT_COLUMNS = ['timestamp', 'game_type'] + list(GAME_NUMERIC_FIELDS)
+
+
+def game_type_error(game_type):
+    """Why game_type is not accepted, or None if it is one of CognitiveAnalyzer.GAME_TYPES"""
+    from models.ai_models import CognitiveAnalyzer  # deferred so importing the app stays cheap
+
+    if not isinstance(game_type, str) or not game_type.strip():
+        return 'game_type is required'
+    if game_type not in CognitiveAnalyzer.GAME_TYPES:
+        return 'game_type must be one of ' + ', '.join(CognitiveAnalyzer.GAME_TYPES)
+    return None
+
+
+def parse_ndjson(body):
+    """Parse a newline-delimited JSON body into a list of samples"""
+    samples = []
+    for line in body.splitlines():
+        line = line.strip()
+        if line:
+            samples.append(json.loads(line))
+    return samples
+
+
+def _to_float(value):
+    """Convert a JSON value to float; NaN marks missing, None marks invalid"""
+    if value is None or value == '':
+        return math.nan
+    if isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def validate_health_samples(samples, max_future_seconds=300):
+    """
+    Validate a batch of health samples in one vectorized pass
+    Returns: (rows, rejects) where rows are tuples in HEALTH_COLUMNS order and
+    rejects is a list of {'index', 'errors'} dicts
+    """
+    import numpy as np  # deferred so importing the app stays cheap
+
+    count = len(samples)
+    errors = [[] for _ in range(count)]
+
+    for i, sample in enumerate(samples):
+        if not isinstance(sample, dict):
+            errors[i].append('sample must be an object')
+    objects = [s if isinstance(s, dict) else {} for s in samples]
+
+    # Numeric columns: convert once, then check every row with array masks
+    columns = {}
+    present = np.zeros(count, dtype=bool)
+    for field, (low, high) in HEALTH_NUMERIC_FIELDS.items():
+        raw = [_to_float(s.get(field)) for s in objects]
+        bad_type = np.array([value is None for value in raw], dtype=bool)
+        values = np.array([math.nan if value is None else value for value in raw], dtype=float)
+        missing = np.isnan(values)
+        out_of_range = ~missing & ((values < low) | (values > high))
+        for i in np.flatnonzero(bad_type):
+            errors[i].append(f'{field} must be a number')
+        for i in np.flatnonzero(out_of_range):
+            errors[i].append(f'{field} must be between {low} and {high}')
+        present |= ~missing
+        columns[field] = values
+
+    for i in np.flatnonzero(~present):
+        if not errors[i]:
+            errors[i].append('sample has no health metrics')
+
+    # Client timestamps, normalized to canonical UTC text
+    latest_allowed = time.time() + max_future_seconds
+    timestamps = []
+    for i, sample in enumerate(objects):
+        value = sample.get('timestamp')
+        parsed = parse_timestamp(value) if value is not None else None
+        if value is None:
+            errors[i].append('timestamp is required')
+        elif parsed is None:
+            errors[i].append('timestamp must be ISO 8601 or epoch seconds/milliseconds')
+        elif parsed.timestamp() > latest_allowed:
+            errors[i].append('timestamp is in the future')
+        timestamps.append(utc_timestamp(parsed) if parsed else None)
+
+    for field in HEALTH_TEXT_FIELDS:
+        for i, sample in enumerate(objects):
+            value = sample.get(field)
+            if value is not None and not isinstance(value, str):
+                errors[i].append(f'{field} must be a string')
+
+    rows = []
+    rejects = []
+    numeric = [columns[field].tolist() for field in HEALTH_NUMERIC_FIELDS]
+    for i in range(count):
+        if errors[i]:
+            rejects.append({'index': i, 'errors': errors[i]})
+            continue
+        values = [None if math.isnan(column[i]) else column[i] for column in numeric]
+        text = [objects[i].get(field) for field in HEALTH_TEXT_FIELDS]
+        rows.append(tuple([timestamps[i]] + values + text))
+
+    return rows, rejects
+
+
+def validate_game_results(results, max_future_seconds=300):
+    """
+    Validate a batch of cognitive game results in one vectorized pass
+    Missing numbers take the single-result endpoint's defaults and a missing
+    timestamp means now.
+    Returns: (rows, rejects) where rows are tuples in GAME_RESULT_COLUMNS order
+    and rejects is a list of {'index', 'errors'} dicts
+    """
+    import numpy as np  # deferred so importing the app stays cheap
+
+    count = len(results)
+    errors = [[] for _ in range(count)]
+
+    for i, result in enumerate(results):
+        if not isinstance(result, dict):
+            errors[i].append('result must be an object')
+    objects = [r if isinstance(r, dict) else {} for r in results]
+
+    game_types = [r.get('game_type') for r in objects]
+    for i, game_type in enumerate(game_types):
+        error = game_type_error(game_type)
+        if error:
+            errors[i].append(error)
+
+    columns = {}
+    for field, (default, low) in GAME_NUMERIC_FIELDS.items():
+        raw = [_to_float(r.get(field)) for r in objects]
+        bad_type = np.array([value is None for value in raw], dtype=bool)
+        values = np.array([math.nan if value is None else value for value in raw], dtype=float)
+        values[np.isnan(values) & ~bad_type] = default
+        invalid = ~bad_type & (values < low)
+        if field == 'difficulty_level':
+            invalid |= ~bad_type & (values != np.floor(values))
+        for i in np.flatnonzero(bad_type):
+            errors[i].append(f'{field} must be a number')
+        for i in np.flatnonzero(invalid):
+            errors[i].append(
+                f'{field} must be a whole number of at least {low}' if field == 'difficulty_level'
+                else f'{field} must be at least {low}'
+            )
+        columns[field] = values
+
+    latest_allowed = time.time() + max_future_seconds
+    now = utc_timestamp()
+    timestamps = []
+    for i, result in enumerate(objects):
+        value = result.get('timestamp')
+        parsed = parse_timestamp(value) if value is not None else None
+        if value is not None and parsed is None:
+            errors[i].append('timestamp must be ISO 8601 or epoch seconds/milliseconds')
+        elif parsed is not None and parsed.timestamp() > latest_allowed:
+            errors[i].append('timestamp is in the future')
+        timestamps.append(utc_timestamp(parsed) if parsed else now)
+
+    rows = []
+    rejects = []
+    numeric = [columns[field].tolist() for field in GAME_NUMERIC_FIELDS]
+    for i in range(count):
+        if errors[i]:
+            rejects.append({'index': i, 'errors': errors[i]})
+            continue
+        values = [column[i] for column in numeric]
+        values[-1] = int(values[-1])
+        rows.append(tuple([timestamps[i], game_types[i]] + values))
+
+    return rows, rejects
@@ -0,0 +1,282 @@
+"""Incremental TF-IDF keywords for journal entries
+
+Document frequencies are kept per user and for the whole corpus
+(journal_term_df, with GLOBAL_USER as the corpus-wide user id) together with
+document counts. Each new entry bumps the frequencies of its own terms and
+is then ranked against them, so extracting its keywords costs time
+proportional to the entry, not to the corpus. The chosen keywords are also
+folded into per-day statistics that theme queries read directly.
+"""
+import heapq
+import json
+import math
+import re
+from collections import Counter
+
+from config import Config
+from database import utc_timestamp
+from models.chunking import iter_chunks
+from pagination import clamp_limit
+
+GLOBAL_USER = 0  # user_id of the corpus-wide rows (real user ids start at 1)
+
+# A user's own frequencies outweigh the corpus-wide ones once they have
+# written about this many entries
+USER_PRIOR_DOCS = 20
+
+_WORD = re.compile(r"[a-z][a-z']*[a-z]")
+
+STOPWORDS = frozenset('''
+    about above after again against all also am an and any are aren't as at be
+    because been before being below between both but by can can't cannot could
+    couldn't did didn't do does doesn't doing don't down during each even ever
+    every few for from further get gets getting got had hadn't has hasn't have
+    haven't having he he'd he'll he's her here here's hers herself him himself
+    his how how's however i'd i'll i'm i've if im in into is isn't it it's its
+    itself just let's like lot lots me more most much mustn't my myself no nor
+    not now of off on once one only or other ought our ours ourselves out over
+    own really same shan't she she'd she'll she's should shouldn't so some
+    still such than that that's the their theirs them themselves then there
+    there's these they they'd they'll they're they've thing things this those
+    through to too under until up upon us very was wasn't we we'd we'll we're
+    we've were weren't what what's when when's where where's which while who
+    who's whom why why's will with won't would wouldn't yet you you'd you'll
+    you're you've your yours yourself yourselves
+'''.split())
+
+
+def create_keyword_tables(cursor):
+    """Create the document-frequency and daily keyword tables"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS journal_doc_counts (
+            user_id INTEGER PRIMARY KEY,
+            documents INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS journal_term_df (
+            user_id INTEGER NOT NULL,
+            term TEXT NOT NULL,
+            df INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, term)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS journal_keyword_daily (
+            user_id INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            term TEXT NOT NULL,
+            entries INTEGER NOT NULL DEFAULT 0,
+            weight REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, day, term)
+        ) WITHOUT ROWID
+    ''')
+
+
+def extract_terms(text):
+    """Count the candidate keyword terms of a text (lowercased, without stopwords)"""
+    text = text.lower()
+    counts = Counter()
+    # Chunks end at whitespace, so no word is split and long entries never
+    # materialize one list of all their words
+    for start, end in iter_chunks(text, 65536):
+        counts.update(_WORD.findall(text, start, end))
+    for term in STOPWORDS.intersection(counts):
+        del counts[term]
+    return counts
+
+
+def record_entry(cursor, user_id, content, timestamp=None, top_k=None, terms=None):
+    """
+    Count a new entry into the frequencies and return its top terms
+    The first top_k terms are the entry's keywords; terms (default top_k)
+    sets how many ranked terms are returned.
+    Returns: [(term, weight), ...] best first, weights of the L2-normalized
+    TF-IDF vector
+    """
+    top_k = top_k or Config.JOURNAL_KEYWORDS_TOP_K
+    counts = extract_terms(content or '')
+    _add_documents(cursor, {user_id: 1})
+    _add_frequencies(cursor, Counter((user_id, term) for term in counts))
+    ranked = rank_terms(cursor, user_id, counts, max(top_k, terms or 0))
+    _add_daily(cursor, {
+        (user_id, (timestamp or utc_timestamp())[:10], term): (1, weight)
+        for term, weight in ranked[:top_k]
+    })
+    return ranked
+
+
+def rebuild_keywords(cursor, top_k=None, batch_size=500):
+    """
+    Recompute all frequencies, entry keywords and daily statistics
+    Keywords stored by record_entry were ranked against the corpus as it was
+    when each entry was written; the rebuild ranks every entry against the
+    current one.
+    """
+    top_k = top_k or Config.JOURNAL_KEYWORDS_TOP_K
+    for table in ('journal_doc_counts', 'journal_term_df', 'journal_keyword_daily'):
+        cursor.execute(f'DELETE FROM {table}')
+
+    # Pass 1: document frequencies, flushed once per batch
+    for rows in iter_entry_batches(cursor, batch_size):
+        documents = Counter(row[1] for row in rows)
+        frequencies = Counter()
+        for _, user_id, _, content in rows:
+            frequencies.update((user_id, term) for term in extract_terms(content or ''))
+        _add_documents(cursor, documents)
+        _add_frequencies(cursor, frequencies)
+
+    # Pass 2: rank every entry against the complete frequencies, which no
+    # longer change, so corpus-wide ones are read once per term
+    global_df = {}
+    for rows in iter_entry_batches(cursor, batch_size):
+        updates = []
+        daily = {}
+        for entry_id, user_id, timestamp, content in rows:
+            keywords = rank_terms(cursor, user_id, extract_terms(content or ''), top_k, global_df)
+            updates.append((json.dumps([term for term, _ in keywords]), entry_id))
+            for term, weight in keywords:
+                key = (user_id, (timestamp or '')[:10], term)
+                entries, total = daily.get(key, (0, 0.0))
+                daily[key] = (entries + 1, total + weight)
+        cursor.executemany('UPDATE journal_entries SET keywords = ? WHERE id = ?', updates)
+        _add_daily(cursor, daily)
+
+
+def get_themes(cursor, user_id, since_day, limit=10):
+    """A user's strongest keywords from since_day (inclusive) onward; limit is clamped to 1..MAX_PAGE_SIZE"""
+    cursor.execute(
+        '''SELECT term, SUM(weight) AS weight, SUM(entries) AS entries, COUNT(*) AS days,
+                  MAX(day) AS last_day
+           FROM journal_keyword_daily
+           WHERE user_id = ? AND day >= ?
+           GROUP BY term
+           ORDER BY weight DESC, term
+           LIMIT ?''',
+        (user_id, since_day, clamp_limit(limit))
+    )
+    return [
+        {'term': row['term'], 'weight': round(row['weight'], 3), 'entries': row['entries'],
+         'days': row['days'], 'last_day': row['last_day']}
+        for row in cursor.fetchall()
+    ]
+
+
+def iter_entry_batches(cursor, batch_size):
+    """Yield all journal entries as lists of (id, user_id, timestamp, content) rows, in id order"""
+    last_id = 0
+    while True:
+        cursor.execute(
+            '''SELECT id, user_id, timestamp, content FROM journal_entries
+               WHERE id > ? ORDER BY id LIMIT ?''',
+            (last_id, batch_size)
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def _add_documents(cursor, documents):
+    """documents: {user_id: new entries}; also counted into the global total"""
+    rows = list(documents.items()) + [(GLOBAL_USER, sum(documents.values()))]
+    cursor.executemany(
+        '''INSERT INTO journal_doc_counts (user_id, documents) VALUES (?, ?)
+           ON CONFLICT (user_id) DO UPDATE SET documents = documents + excluded.documents''',
+        rows
+    )
+
+
+def _add_frequencies(cursor, frequencies):
+    """frequencies: {(user_id, term): new entries containing term}"""
+    global_frequencies = Counter()
+    for (_, term), count in frequencies.items():
+        global_frequencies[term] += count
+    rows = [(user_id, term, count) for (user_id, term), count in frequencies.items()]
+    rows += [(GLOBAL_USER, term, count) for term, count in global_frequencies.items()]
+    cursor.executemany(
+        '''INSERT INTO journal_term_df (user_id, term, df) VALUES (?, ?, ?)
+           ON CONFLICT (user_id, term) DO UPDATE SET df = df + excluded.df''',
+        rows
+    )
+
+
+def _add_daily(cursor, daily):
+    """daily: {(user_id, day, term): (entries, weight)}"""
+    cursor.executemany(
+        '''INSERT INTO journal_keyword_daily (user_id, day, term, entries, weight)
+           VALUES (?, ?, ?, ?, ?)
+           ON CONFLICT (user_id, day, term) DO UPDATE SET
+               entries = entries + excluded.entries, weight = weight + excluded.weight''',
+        [key + value for key, value in daily.items()]
+    )
+
+
+def _document_frequencies(cursor, user_id, terms, chunk_size=500):
+    """{term: df} for the given terms, read in chunks to stay under SQLite's variable limit"""
+    frequencies = {}
+    for i in range(0, len(terms), chunk_size):
+        chunk = terms[i:i + chunk_size]
+        cursor.execute(
+            f'''SELECT term, df FROM journal_term_df
+                WHERE user_id = ? AND term IN ({', '.join('?' for _ in chunk)})''',
+            [user_id] + chunk
+        )
+        frequencies.update(cursor.fetchall())
+    return frequencies
+
+
+def rank_terms(cursor, user_id, counts, top_k, global_df=None):
+    """
+    Top-k TF-IDF terms of an entry already counted into the frequencies
+    counts: the entry's extract_terms()
+    global_df: optional {term: df} cache of corpus-wide frequencies, filled
+    as terms are read
+    """
+    if not counts:
+        return []
+    cursor.execute(
+        'SELECT user_id, documents FROM journal_doc_counts WHERE user_id IN (?, ?)',
+        (user_id, GLOBAL_USER)
+    )
+    documents = dict(cursor.fetchall())
+    user_docs, global_docs = documents.get(user_id, 0), documents.get(GLOBAL_USER, 0)
+    terms = list(counts)
+    user_df = _document_frequencies(cursor, user_id, terms)
+    if global_df is None:
+        global_df = _document_frequencies(cursor, GLOBAL_USER, terms)
+    else:
+        missing = [term for term in terms if term not in global_df]
+        global_df.update(_document_frequencies(cursor, GLOBAL_USER, missing))
+
+    # Smoothed idf from the user's entries, leaning on the corpus while they
+    # have written little
+    share = user_docs / (user_docs + USER_PRIOR_DOCS)
+    weights = {}
+    for term, count in counts.items():
+        user_idf = math.log((1 + user_docs) / (1 + user_df.get(term, 0))) + 1
+        global_idf = math.log((1 + global_docs) / (1 + global_df.get(term, 0))) + 1
+        idf = share * user_idf + (1 - share) * global_idf
+        weights[term] = (1 + math.log(count)) * idf
+
+    norm = math.sqrt(sum(w * w for w in weights.values()))
+    best = heapq.nsmallest(top_k, weights.items(), key=lambda item: (-item[1], item[0]))
+    return [(term, round(weight / norm, 4)) for term, weight in best]
+
+
+if __name__ == '__main__':
+    import sys
+    from database import get_db, init_database
+
+    if '--rebuild' in sys.argv:
+        from similarity import rebuild_similarity
+
+        init_database()
+        with get_db() as conn:
+            rebuild_keywords(conn.cursor())
+            rebuild_similarity(conn.cursor())
+            count = conn.execute('SELECT COUNT(*) FROM journal_entries').fetchone()[0]
+        print(f"Rebuilt keywords and similarity vectors for {count} journal entries")
+    else:
+        print('Usage: python keywords.py --rebuild')
@@ -0,0 +1,234 @@
+"""Versioned schema migrations for the MindTrack database
+
+The schema version is tracked in SQLite's ``PRAGMA user_version``. Each
+migration runs in its own transaction together with the version bump, so an
+interrupted upgrade can simply be re-run.
+"""
+
+MIGRATIONS = []
+
+# Tables whose hot queries are "WHERE user_id = ? ORDER BY timestamp DESC"
+HISTORY_TABLES = [
+    'health_metrics',
+    'mood_assessments',
+    'journal_entries',
+    'cognitive_assessments',
+    'alerts',
+    'chatbot_conversations'
+]
+
+
+# Tables holding MoodAnalyzer output (see reanalyze.py)
+ANALYZED_TABLES = ['mood_assessments', 'journal_entries', 'chatbot_conversations']
+
+
+def migration(version, description):
+    """Register a migration function for the given schema version"""
+    def register(func):
+        MIGRATIONS.append((version, description, func))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return func
+    return register
+
+
+def get_schema_version(conn):
+    """Return the schema version stored in the database file"""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def pending_migrations(conn):
+    """Return the migrations that have not been applied yet"""
+    current = get_schema_version(conn)
+    return [m for m in MIGRATIONS if m[0] > current]
+
+
+def migrate(conn):
+    """Apply all pending migrations and return the resulting schema version"""
+    if conn.in_transaction:
+        conn.commit()
+    for version, description, func in pending_migrations(conn):
+        conn.execute('BEGIN')
+        try:
+            func(conn.cursor())
+            conn.execute(f'PRAGMA user_version = {int(version)}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(f"Applied migration {version}: {description}")
+    return get_schema_version(conn)
+
+
+# ============================================================================
+# Migrations
+# ============================================================================
+
+@migration(1, 'Index history tables on (user_id, timestamp)')
+def _index_history_tables(cursor):
+    for table in HISTORY_TABLES:
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS idx_{table}_user_timestamp ON {table} (user_id, timestamp)'
+        )
+
+
+@migration(2, 'Index unread alerts and chatbot messages by sender')
+def _index_alerts_and_chatbot(cursor):
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_alerts_user_acknowledged ON alerts (user_id, acknowledged)'
+    )
+    cursor.execute(
+        '''CREATE INDEX IF NOT EXISTS idx_chatbot_conversations_user_sender
+           ON chatbot_conversations (user_id, is_user, timestamp)'''
+    )
+
+
+
+# Timestamp columns that may hold datetime.isoformat() text instead of the
+# canonical CURRENT_TIMESTAMP format
+TIMESTAMP_COLUMNS = [(table, 'timestamp') for table in HISTORY_TABLES] + [
+    ('recommendations', 'timestamp'),
+    ('users', 'created_at'),
+    ('users', 'last_login'),
+    ('chatbot_user_profiles', 'last_affirmation_date')
+]
+
+
+@migration(3, 'Normalize timestamps to canonical UTC text')
+def _normalize_timestamps(cursor):
+    for table, column in TIMESTAMP_COLUMNS:
+        # Naive isoformat() values were written in server local time; values
+        # carrying a Z or +HH:MM suffix are converted by SQLite itself
+        cursor.execute(
+            f'''UPDATE {table}
+                SET {column} = COALESCE(
+                    CASE
+                        WHEN {column} LIKE '%Z' OR substr({column}, -6, 1) IN ('+', '-')
+                        THEN strftime('%Y-%m-%d %H:%M:%S', {column})
+                        ELSE strftime('%Y-%m-%d %H:%M:%S', {column}, 'utc')
+                    END,
+                    {column})
+                WHERE {column} LIKE '____-__-__T%'
+            '''
+        )
+
+
+
+@migration(4, 'Add daily health and mood rollups')
+def _add_daily_rollups(cursor):
+    from rollups import ROLLUPS, create_rollup_table, rebuild_rollups
+
+    for source_table in ROLLUPS:
+        create_rollup_table(cursor, source_table)
+        rebuild_rollups(cursor, source_table)
+
+
+
+@migration(5, 'Add per-user latest-state snapshot')
+def _add_user_state(cursor):
+    from user_state import create_user_state_table, rebuild_user_state
+
+    create_user_state_table(cursor)
+    user_ids = [row[0] for row in cursor.execute('SELECT id FROM users').fetchall()]
+    for user_id in user_ids:
+        rebuild_user_state(cursor, user_id)
+
+
+
+@migration(6, 'Store per-section mood scores for long journal entries')
+def _add_journal_sections(cursor):
+    cursor.execute('ALTER TABLE journal_entries ADD COLUMN sections TEXT')
+
+
+@migration(7, 'Track analyzer version per analyzed row and add job checkpoints')
+def _add_analyzer_versions(cursor):
+    for table in ANALYZED_TABLES:
+        cursor.execute(f'ALTER TABLE {table} ADD COLUMN analyzer_version TEXT')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS job_checkpoints (
+            job TEXT PRIMARY KEY,
+            last_id INTEGER NOT NULL DEFAULT 0,
+            processed INTEGER NOT NULL DEFAULT 0,
+            analyzer_version TEXT,
+            started_at TEXT,
+            updated_at TEXT,
+            completed_at TEXT
+        )
+    ''')
+
+
+@migration(8, 'Add TF-IDF keyword statistics for journal entries')
+def _add_journal_keywords(cursor):
+    from keywords import create_keyword_tables, rebuild_keywords
+
+    create_keyword_tables(cursor)
+    rebuild_keywords(cursor)
+
+
+@migration(9, 'Add full-text search over journal entries and chat messages')
+def _add_search_index(cursor):
+    from search import create_search_index, rebuild_search_index
+
+    create_search_index(cursor)
+    rebuild_search_index(cursor)
+
+
+@migration(10, 'Add the similar-entries index for journal entries')
+def _add_similarity_index(cursor):
+    from similarity import create_similarity_tables, rebuild_similarity
+
+    create_similarity_tables(cursor)
+    rebuild_similarity(cursor)
+
+
+
+@migration(11, 'Add running cognitive trend statistics')
+def _add_cognitive_trend_stats(cursor):
+    from cognitive_trends import create_trend_table, rebuild_trend_stats
+
+    create_trend_table(cursor)
+    rebuild_trend_stats(cursor)
+
+
+
+@migration(12, 'Add population digests of cognitive scores')
+def _add_cognitive_score_digests(cursor):
+    from percentiles import create_digest_table, rebuild_digests
+
+    create_digest_table(cursor)
+    rebuild_digests(cursor)
+
+
+
+@migration(13, 'Add cognitive decline screening runs and results')
+def _add_cognitive_screening(cursor):
+    from screening import create_screening_tables
+
+    create_screening_tables(cursor)
+
+
+@migration(14, 'Add per-trial telemetry for cognitive games')
+def _add_cognitive_telemetry(cursor):
+    from telemetry import create_telemetry_table
+
+    create_telemetry_table(cursor)
+
+
+@migration(15, 'Drop population digests of unknown game types and difficulties')
+def _rebuild_cognitive_score_digests(cursor):
+    from percentiles import rebuild_digests
+
+    rebuild_digests(cursor)
+
+
+if __name__ == '__main__':
+    import sys
+    from database import get_db, init_database
+
+    if '--status' in sys.argv:
+        with get_db() as conn:
+            print(f"Schema version: {get_schema_version(conn)}")
+            for version, description, _ in pending_migrations(conn):
+                print(f"Pending migration {version}: {description}")
+    else:
+        # init_database creates any missing tables and applies pending migrations
+        init_database()
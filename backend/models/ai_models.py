@@ -1,26 +1,61 @@
 """AI models for mood detection and cognitive assessment"""
 import numpy as np
 import re
-from textblob import TextBlob
 from datetime import datetime, timedelta
+import hashlib
 import json
 
+from models.chunking import iter_chunks
+from models.keyword_matcher import KeywordMatcher, load_lexicon, tokenize
+from models.sentiment import create_sentiment_backend
+
+# Bump when MoodAnalyzer's scoring changes so stored results can be re-analyzed
+MOOD_ANALYZER_VERSION = 2
+
 class MoodAnalyzer:
     """Analyzes text and behavioral patterns to detect mood and mental health indicators"""
     
-    def __init__(self):
+    def __init__(self, lexicon_path=None, cache=None, sentiment=None):
+        self.cache = cache
+        # Any backend from models.sentiment; TextBlob unless told otherwise
+        self.sentiment = sentiment or create_sentiment_backend('textblob')
         self.anxiety_keywords = [
             'worried', 'anxious', 'nervous', 'panic', 'fear', 'scared', 
-            'overwhelmed', 'stressed', 'tense', 'uneasy', 'restless'
+            'overwhelmed', 'stressed', 'tense', 'uneasy', 'restless',
+            'panicked', 'panicking', 'fearful'
         ]
         self.depression_keywords = [
             'sad', 'depressed', 'hopeless', 'empty', 'worthless', 'tired',
-            'exhausted', 'lonely', 'isolated', 'numb', 'unmotivated'
+            'exhausted', 'lonely', 'isolated', 'numb', 'unmotivated',
+            'sadness'
         ]
         self.stress_keywords = [
             'stress', 'pressure', 'burden', 'overwhelmed', 'exhausted',
-            'demanding', 'hectic', 'chaotic', 'intense', 'struggling'
+            'demanding', 'hectic', 'chaotic', 'intense', 'struggling',
+            'stressed', 'stressful', 'pressured', 'burdened'
         ]
+        
+        # Keywords match whole words only, so common inflections are listed
+        # explicitly. Custom lexicon entries extend the built-in lists
+        if lexicon_path:
+            custom = load_lexicon(lexicon_path)
+            self.anxiety_keywords += custom.get('anxiety', [])
+            self.depression_keywords += custom.get('depression', [])
+            self.stress_keywords += custom.get('stress', [])
+        
+        # Compiled once; matches all three categories in one pass
+        self.keyword_matcher = KeywordMatcher({
+            'anxiety': self.anxiety_keywords,
+            'depression': self.depression_keywords,
+            'stress': self.stress_keywords
+        })
+        
+        # Stored with each result: scoring version, sentiment backend and lexicon
+        lexicon = json.dumps([self.anxiety_keywords, self.depression_keywords, self.stress_keywords])
+        self.version = '{}/{}/{}'.format(
+            MOOD_ANALYZER_VERSION, self.sentiment.name,
+            hashlib.blake2b(lexicon.encode('utf-8'), digest_size=4).hexdigest()
+        )
     
     def analyze_text(self, text):
         """
@@ -30,48 +65,178 @@ class MoodAnalyzer:
         if not text or len(text.strip()) == 0:
             return self._default_analysis()
         
-        # Sentiment analysis using TextBlob
-        blob = TextBlob(text.lower())
-        sentiment = blob.sentiment
+        if self.cache is not None:
+            key = self.cache.key_for(text)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+            result = self._analyze(text)
+            self.cache.put(key, result)
+            return result
+        return self._analyze(text)
+    
+    def _analyze(self, text):
+        """Run the full analysis pipeline on non-empty text"""
+        lowered = text.lower()
+        
+        # Sentiment analysis (polarity in [-1, 1], subjectivity in [0, 1])
+        polarity, subjectivity = self.sentiment.score(lowered)
         
-        # Keyword detection
-        anxiety_count = sum(1 for keyword in self.anxiety_keywords if keyword in text.lower())
-        depression_count = sum(1 for keyword in self.depression_keywords if keyword in text.lower())
-        stress_count = sum(1 for keyword in self.stress_keywords if keyword in text.lower())
+        # Keyword detection (distinct whole-word matches per category)
+        counts = self.keyword_matcher.count(lowered)
+        
+        return self._build_analysis(*self._scores(polarity, subjectivity, counts, len(text.split())))
+    
+    def _scores(self, polarity, subjectivity, counts, word_count):
+        """Turn sentiment, keyword counts and word count into the score tuple for _build_analysis"""
+        anxiety_count = counts['anxiety']
+        depression_count = counts['depression']
+        stress_count = counts['stress']
         
         # Calculate scores (0-1 scale)
-        word_count = len(text.split())
         anxiety_score = min(anxiety_count / max(word_count * 0.1, 1), 1.0)
         depression_score = min(depression_count / max(word_count * 0.1, 1), 1.0)
         stress_score = min(stress_count / max(word_count * 0.1, 1), 1.0)
         
         # Overall mood score (0 = very negative, 1 = very positive)
-        mood_score = (sentiment.polarity + 1) / 2  # Convert from [-1, 1] to [0, 1]
+        mood_score = (polarity + 1) / 2  # Convert from [-1, 1] to [0, 1]
         
         # Adjust mood score based on negative indicators
         mood_score = mood_score * (1 - (anxiety_score + depression_score + stress_score) / 3)
         
-        # Extract emotions
-        emotions = self._extract_emotions(text, sentiment, anxiety_score, depression_score, stress_score)
-        
+        return mood_score, anxiety_score, depression_score, stress_score, polarity, subjectivity
+    
+    def analyze_sections(self, text, chunk_chars=4000, max_sections=20):
+        """
+        Analyze a long text chunk by chunk
+        Only one paragraph- or sentence-sized chunk is lowercased and tokenized
+        at a time; sentiment sums and distinct keyword matches are accumulated
+        across chunks. Consecutive chunks are grouped into about max_sections
+        equally long sections, each scored as if it were a text of its own.
+        The overall scores approximate analyze_text on the whole text: an
+        intensifier or negation ending one chunk no longer modifies the first
+        word of the next, sentences longer than a chunk are cut at whitespace,
+        and summing per chunk rounds differently. benchmarks/sections_parity.py
+        pins the difference (at most 0.02 per score).
+        Returns: the analyze_text dict plus 'sections', a list of per-section
+        scores with character offsets
+        """
+        if not text or len(text.strip()) == 0:
+            return {**self._default_analysis(), 'sections': []}
+        
+        section_chars = -(-len(text) // max_sections)
+        total = _SectionTotals(0)
+        sections = []
+        current = None
+        for start, end in iter_chunks(text, min(chunk_chars, section_chars)):
+            chunk = text[start:end]
+            lowered = chunk.lower()
+            parts = self.sentiment.score_parts(lowered)
+            matched = self.keyword_matcher.find(tokenize(lowered))
+            words = len(chunk.split())
+            
+            if current is None:
+                current = _SectionTotals(start)
+            for totals in (total, current):
+                totals.add(parts, matched, words, end)
+            if end - current.start >= section_chars:
+                sections.append(self._section_scores(current, len(sections)))
+                current = None
+        if current is not None:
+            sections.append(self._section_scores(current, len(sections)))
+        
+        analysis = self._build_analysis(*self._totals_scores(total))
+        analysis['sections'] = sections
+        return analysis
+    
+    def _totals_scores(self, totals):
+        polarity = totals.polarity / totals.assessments if totals.assessments else 0.0
+        subjectivity = totals.subjectivity / totals.assessments if totals.assessments else 0.0
+        counts = self.keyword_matcher.count_matches(totals.matched)
+        return self._scores(polarity, subjectivity, counts, totals.words)
+    
+    def _section_scores(self, totals, index):
+        mood, anxiety, depression, stress, polarity, _ = self._totals_scores(totals)
+        return {
+            'index': index,
+            'start': totals.start,
+            'end': totals.end,
+            'mood_score': round(mood, 3),
+            'sentiment_polarity': round(polarity, 3),
+            'anxiety_level': round(anxiety, 3),
+            'depression_indicators': round(depression, 3),
+            'stress_level': round(stress, 3)
+        }
+    
+    def analyze_texts(self, texts):
+        """
+        Analyze many texts at once
+        Keyword counts are gathered into a matrix and every score is computed
+        with NumPy array operations; results are identical to analyze_text.
+        Returns: list of analysis dicts in input order
+        """
+        results = [
+            None if text and len(text.strip()) > 0 else self._default_analysis()
+            for text in texts
+        ]
+        keys = {}
+        if self.cache is not None:
+            for i, text in enumerate(texts):
+                if results[i] is None:
+                    keys[i] = self.cache.key_for(text)
+                    results[i] = self.cache.get(keys[i])
+        indices = [i for i, result in enumerate(results) if result is None]
+        if not indices:
+            return results
+        
+        lowered = [texts[i].lower() for i in indices]
+        sentiments = self.sentiment.score_many(lowered)
+        polarity = np.array([p for p, _ in sentiments], dtype=float)
+        subjectivity = [s for _, s in sentiments]
+        
+        # Keyword count matrix: one row per text, one column per category
+        categories = ('anxiety', 'depression', 'stress')
+        counts = np.array([
+            [c[category] for category in categories]
+            for c in (self.keyword_matcher.count(text) for text in lowered)
+        ], dtype=float)
+        word_counts = np.array([len(texts[i].split()) for i in indices], dtype=float)
+        
+        # Same formulas as analyze_text, evaluated column-wise
+        scores = np.minimum(counts / np.maximum(word_counts * 0.1, 1)[:, None], 1.0)
+        anxiety, depression, stress = scores[:, 0], scores[:, 1], scores[:, 2]
+        mood = (polarity + 1) / 2
+        mood = mood * (1 - (anxiety + depression + stress) / 3)
+        
+        columns = zip(mood.tolist(), anxiety.tolist(), depression.tolist(),
+                      stress.tolist(), polarity.tolist(), subjectivity)
+        for i, values in zip(indices, columns):
+            results[i] = self._build_analysis(*values)
+            if self.cache is not None:
+                self.cache.put(keys[i], results[i])
+        return results
+    
+    def _build_analysis(self, mood_score, anxiety_score, depression_score, stress_score,
+                        polarity, subjectivity):
+        """Assemble the analysis dict from raw scores"""
         return {
             'mood_score': round(mood_score, 3),
             'anxiety_level': round(anxiety_score, 3),
             'depression_indicators': round(depression_score, 3),
             'stress_level': round(stress_score, 3),
-            'sentiment_polarity': round(sentiment.polarity, 3),
-            'sentiment_subjectivity': round(sentiment.subjectivity, 3),
-            'emotions': emotions,
+            'sentiment_polarity': round(polarity, 3),
+            'sentiment_subjectivity': round(subjectivity, 3),
+            'emotions': self._extract_emotions(polarity, anxiety_score, depression_score, stress_score),
             'analysis': self._generate_analysis(mood_score, anxiety_score, depression_score, stress_score)
         }
     
-    def _extract_emotions(self, text, sentiment, anxiety, depression, stress):
+    def _extract_emotions(self, polarity, anxiety, depression, stress):
         """Extract dominant emotions from analysis"""
         emotions = []
         
-        if sentiment.polarity > 0.3:
+        if polarity > 0.3:
             emotions.append('positive')
-        elif sentiment.polarity < -0.3:
+        elif polarity < -0.3:
             emotions.append('negative')
         else:
             emotions.append('neutral')
@@ -122,9 +287,47 @@ class MoodAnalyzer:
         }
 
 
+class _SectionTotals:
+    """Running sentiment sums, keyword matches and word count for a span of text"""
+    
+    def __init__(self, start):
+        self.start = start
+        self.end = start
+        self.polarity = 0.0
+        self.subjectivity = 0.0
+        self.assessments = 0
+        self.words = 0
+        self.matched = set()
+    
+    def add(self, parts, matched, words, end):
+        polarity, subjectivity, assessments = parts
+        self.polarity += polarity
+        self.subjectivity += subjectivity
+        self.assessments += assessments
+        self.words += words
+        self.matched |= matched
+        self.end = end
+
+
 class CognitiveAnalyzer:
     """Analyzes cognitive game performance to detect cognitive decline"""
     
+    # Game types with their own domain weighting; the batch API takes their
+    # index in GAME_TYPES as the game type code (-1 for any other game)
+    GAME_TYPES = ['memory_match', 'sequence_recall', 'reaction_test', 'attention_task']
+    MEMORY_GAMES = ('memory_match', 'sequence_recall')
+    FOCUS_GAMES = ('reaction_test', 'attention_task')
+    PERFORMANCE_LEVELS = [(0.8, 'Excellent'), (0.6, 'Good'), (0.4, 'Fair')]
+    # Results of these game types at difficulty 1..MAX_DIFFICULTY are ranked
+    # in population percentiles
+    MAX_DIFFICULTY = 10
+    
+    # Trends fit the last TREND_WINDOW assessments; a slope (score per
+    # assessment) below -TREND_SLOPE_THRESHOLD counts as a decline
+    TREND_WINDOW = 10
+    TREND_MIN_SAMPLES = 3
+    TREND_SLOPE_THRESHOLD = 0.05
+    
     def __init__(self):
         self.baseline_scores = {
             'memory': 70,
@@ -164,15 +367,70 @@ class CognitiveAnalyzer:
             )
         }
     
+    def encode_game_types(self, game_types):
+        """Game type names -> int codes for analyze_game_results_batch"""
+        codes = {game_type: code for code, game_type in enumerate(self.GAME_TYPES)}
+        return np.array([codes.get(game_type, -1) for game_type in game_types], dtype=np.int8)
+    
+    def analyze_game_results_batch(self, game_type_codes, scores, reaction_times, accuracies, difficulties):
+        """
+        Score many game results at once; same formulas as analyze_game_result
+        Arguments are equal-length columns, game types coded by encode_game_types
+        Returns: dict of arrays (the domain scores and performance_level),
+        without the per-result recommendations
+        """
+        codes = np.asarray(game_type_codes)
+        normalized_score = np.minimum(np.asarray(scores, dtype=float) / 100, 1.0)
+        normalized_accuracy = np.minimum(np.asarray(accuracies, dtype=float) / 100, 1.0)
+        reaction_score = np.maximum(0, 1 - np.asarray(reaction_times, dtype=float) / 2000)
+        difficulty_multiplier = 1 + (np.asarray(difficulties, dtype=float) - 1) * 0.2
+        
+        memory_games = np.isin(codes, [self.GAME_TYPES.index(g) for g in self.MEMORY_GAMES])
+        focus_games = np.isin(codes, [self.GAME_TYPES.index(g) for g in self.FOCUS_GAMES])
+        memory_score = np.where(
+            memory_games,
+            normalized_score * 0.6 + normalized_accuracy * 0.4,
+            normalized_score * 0.5 + normalized_accuracy * 0.5
+        )
+        focus_score = np.where(
+            focus_games,
+            reaction_score * 0.7 + normalized_accuracy * 0.3,
+            reaction_score * 0.5 + normalized_accuracy * 0.5
+        )
+        problem_solving_score = np.minimum(normalized_score * difficulty_multiplier, 1.0)
+        cognitive_score = (memory_score + focus_score + problem_solving_score) / 3
+        
+        performance_level = np.select(
+            [cognitive_score >= threshold for threshold, _ in self.PERFORMANCE_LEVELS],
+            [level for _, level in self.PERFORMANCE_LEVELS],
+            default='Needs Improvement'
+        )
+        return {
+            'cognitive_score': self._round_scores(cognitive_score),
+            'memory_score': self._round_scores(memory_score),
+            'focus_score': self._round_scores(focus_score),
+            'problem_solving_score': self._round_scores(problem_solving_score),
+            'performance_level': performance_level
+        }
+    
+    def _round_scores(self, values):
+        """np.round to 3 places, with round() where they can disagree (near a half)"""
+        rounded = np.round(values, 3)
+        scaled = values * 1000
+        near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+        if near_half.any():
+            rounded[near_half] = [round(value, 3) for value in values[near_half].tolist()]
+        return rounded
+    
     def _calculate_memory_score(self, game_type, score, accuracy):
         """Calculate memory domain score"""
-        if game_type in ['memory_match', 'sequence_recall']:
+        if game_type in self.MEMORY_GAMES:
             return (score * 0.6 + accuracy * 0.4)
         return score * 0.5 + accuracy * 0.5
     
     def _calculate_focus_score(self, game_type, reaction_score, accuracy):
         """Calculate focus domain score"""
-        if game_type in ['reaction_test', 'attention_task']:
+        if game_type in self.FOCUS_GAMES:
             return (reaction_score * 0.7 + accuracy * 0.3)
         return reaction_score * 0.5 + accuracy * 0.5
     
@@ -183,14 +441,10 @@ class CognitiveAnalyzer:
     
     def _get_performance_level(self, score):
         """Get performance level description"""
-        if score >= 0.8:
-            return 'Excellent'
-        elif score >= 0.6:
-            return 'Good'
-        elif score >= 0.4:
-            return 'Fair'
-        else:
-            return 'Needs Improvement'
+        for threshold, level in self.PERFORMANCE_LEVELS:
+            if score >= threshold:
+                return level
+        return 'Needs Improvement'
     
     def _generate_cognitive_recommendations(self, cognitive, memory, focus, problem_solving):
         """Generate personalized cognitive recommendations"""
@@ -213,24 +467,36 @@ class CognitiveAnalyzer:
     def detect_decline_trend(self, historical_scores):
         """
         Detect cognitive decline trend from historical data
+        Fits the last 10 assessments in time order, whatever order they are
+        passed in (the routes fetch them newest first)
         Returns: dict with trend analysis
         """
-        if len(historical_scores) < 3:
+        if len(historical_scores) < self.TREND_MIN_SAMPLES:
+            return self.describe_trend(None, len(historical_scores))
+        
+        # Calculate trend using simple linear regression
+        ordered = sorted(historical_scores, key=lambda s: (s.get('timestamp') or '', s.get('id') or 0))
+        scores = [s['cognitive_score'] for s in ordered[-self.TREND_WINDOW:]]  # Last 10 assessments
+        x = np.arange(len(scores))
+        slope = float(np.polyfit(x, scores, 1)[0])
+        return self.describe_trend(slope, len(scores))
+    
+    def describe_trend(self, slope, samples):
+        """
+        Classify a regression slope of cognitive scores per assessment
+        Returns: dict with trend analysis
+        """
+        if slope is None or samples < self.TREND_MIN_SAMPLES:
             return {
                 'trend': 'insufficient_data',
                 'decline_detected': False,
                 'message': 'More data needed for trend analysis.'
             }
         
-        # Calculate trend using simple linear regression
-        scores = [s['cognitive_score'] for s in historical_scores[-10:]]  # Last 10 assessments
-        x = np.arange(len(scores))
-        slope = np.polyfit(x, scores, 1)[0]
-        
-        decline_detected = slope < -0.05  # Declining trend
+        decline_detected = slope < -self.TREND_SLOPE_THRESHOLD  # Declining trend
         
         return {
-            'trend': 'declining' if decline_detected else 'stable' if abs(slope) < 0.05 else 'improving',
+            'trend': 'declining' if decline_detected else 'stable' if abs(slope) < self.TREND_SLOPE_THRESHOLD else 'improving',
             'decline_detected': decline_detected,
             'slope': round(slope, 4),
             'message': self._get_trend_message(slope, decline_detected)
@@ -240,7 +506,7 @@ class CognitiveAnalyzer:
         """Generate trend message"""
         if decline_detected:
             return "Cognitive performance shows declining trend. Consider consulting a healthcare provider."
-        elif slope > 0.05:
+        elif slope > self.TREND_SLOPE_THRESHOLD:
             return "Cognitive performance is improving. Keep up the good work!"
         else:
             return "Cognitive performance is stable."
@@ -322,8 +588,9 @@ class RecommendationEngine:
 class WellnessChatbot:
     """AI-powered Mental Health Chatbot for empathetic support and wellness guidance"""
     
-    def __init__(self):
-        self.mood_analyzer = MoodAnalyzer()
+    def __init__(self, mood_analyzer=None):
+        # Share the application's analyzer (and its cache) when given one
+        self.mood_analyzer = mood_analyzer or MoodAnalyzer()
         
         # Affirmations database
         self.affirmations = {
@@ -450,13 +717,15 @@ class WellnessChatbot:
             ]
         }
     
-    def generate_response(self, user_message, user_context=None):
+    def generate_response(self, user_message, user_context=None, analysis=None):
         """
         Generate empathetic chatbot response based on user message and context
         user_context: dict with user's recent mood, stress levels, activity patterns
+        analysis: precomputed MoodAnalyzer result for user_message, if available
         """
         # Analyze the user's message
-        analysis = self.mood_analyzer.analyze_text(user_message)
+        if analysis is None:
+            analysis = self.mood_analyzer.analyze_text(user_message)
         
         # Determine primary emotion
         primary_emotion = self._determine_primary_emotion(analysis)
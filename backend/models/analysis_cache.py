@@ -0,0 +1,86 @@
+"""Bounded LRU cache for mood analysis results"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+# Rough per-entry overhead (key, OrderedDict node, dict objects) in bytes
+ENTRY_OVERHEAD = 512
+
+
+class AnalysisCache:
+    """
+    Thread-safe LRU cache keyed by a hash of the normalized text
+
+    Bounded both by entry count and by an estimate of the memory held by the
+    cached results. Only the 16-byte digest of the text is stored, never the
+    text itself.
+    """
+
+    def __init__(self, max_entries=4096, max_bytes=16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key_for(text):
+        """Cache key for a text; analysis is case- and edge-whitespace-insensitive"""
+        return hashlib.blake2b(text.strip().lower().encode('utf-8'), digest_size=16).digest()
+
+    def get(self, key):
+        """Return a copy of the cached result, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return _copy_result(entry[0])
+
+    def put(self, key, result):
+        """Store a result, evicting least recently used entries as needed"""
+        size = len(json.dumps(result)) + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (_copy_result(result), size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every cached entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Return hit/miss/eviction counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+
+def _copy_result(result):
+    """Shallow copy that also copies nested lists, so callers can't mutate the cache"""
+    return {key: list(value) if isinstance(value, list) else value for key, value in result.items()}
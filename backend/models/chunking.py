@@ -0,0 +1,33 @@
+"""Split long text into paragraph- or sentence-sized chunks"""
+
+_SENTENCE_ENDS = ('. ', '! ', '? ', '.\n', '!\n', '?\n')
+
+
+def iter_chunks(text, max_chars=4000):
+    """
+    Yield (start, end) offsets of consecutive chunks covering text
+
+    A chunk ends at the last paragraph break ("\\n\\n") that fits within
+    max_chars, otherwise at the last sentence end, otherwise at the last
+    whitespace; only text without any whitespace is cut mid-word. Offsets are
+    yielded instead of substrings so callers decide when to copy.
+    """
+    length = len(text)
+    start = 0
+    while start < length:
+        limit = start + max_chars
+        if limit >= length:
+            yield start, length
+            return
+        end = text.rfind('\n\n', start, limit)
+        if end > start:
+            end += 2
+        else:
+            end = max(text.rfind(mark, start, limit) for mark in _SENTENCE_ENDS)
+            if end > start:
+                end += 2
+            else:
+                end = max(text.rfind(' ', start, limit), text.rfind('\n', start, limit))
+                end = end + 1 if end > start else limit
+        yield start, end
+        start = end
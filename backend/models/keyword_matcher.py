@@ -0,0 +1,83 @@
+"""Single-pass keyword matching for the mood lexicons"""
+import json
+import string
+
+# Punctuation becomes whitespace so str.split() yields words; apostrophes are
+# kept for contractions ("can't", "i'm") and curly ones are normalized
+_TOKEN_TABLE = str.maketrans({
+    **{c: ' ' for c in string.punctuation if c != "'"},
+    **{c: ' ' for c in '\u2014\u2013\u2026\u201c\u201d'},
+    '\u2019': "'"
+})
+
+
+def tokenize(text):
+    """Split lowercased text into word tokens"""
+    tokens = text.translate(_TOKEN_TABLE).split()
+    if "'" in text or '\u2019' in text:
+        tokens = [token.strip("'") for token in tokens]
+    return tokens
+
+
+def load_lexicon(path):
+    """
+    Load a custom lexicon file
+    Format: JSON object mapping category name to a list of keywords or
+    multi-word phrases, e.g. {"anxiety": ["on edge", "jittery"]}
+    """
+    with open(path, encoding='utf-8') as f:
+        lexicon = json.load(f)
+    if not isinstance(lexicon, dict):
+        raise ValueError(f'Lexicon {path} must map categories to keyword lists')
+    return {category: [str(k) for k in keywords] for category, keywords in lexicon.items()}
+
+
+class KeywordMatcher:
+    """
+    Counts lexicon keywords for several categories in one pass over the text
+
+    Keywords are matched on whole words only, so 'stress' does not match
+    inside 'distressing'. A keyword may belong to more than one category.
+    Lookups are hash-based, so cost depends on the text length and the
+    longest phrase, not on the lexicon size.
+    """
+
+    def __init__(self, categories):
+        self.categories = list(categories)
+        self._lookup = {}
+        self._max_ngram = 1
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                tokens = tokenize(keyword.lower())
+                if not tokens:
+                    continue
+                phrase = ' '.join(tokens)
+                owners = self._lookup.setdefault(phrase, [])
+                if category not in owners:
+                    owners.append(category)
+                self._max_ngram = max(self._max_ngram, len(tokens))
+        self._single_words = {phrase for phrase in self._lookup if ' ' not in phrase}
+
+    def find(self, tokens):
+        """Return the set of distinct lexicon entries present in a token list"""
+        matched = self._single_words.intersection(tokens)
+        if self._max_ngram > 1:
+            lookup = self._lookup
+            for size in range(2, self._max_ngram + 1):
+                for i in range(len(tokens) - size + 1):
+                    phrase = ' '.join(tokens[i:i + size])
+                    if phrase in lookup:
+                        matched.add(phrase)
+        return matched
+
+    def count_matches(self, matched):
+        """Count matched entries per category"""
+        counts = dict.fromkeys(self.categories, 0)
+        for phrase in matched:
+            for category in self._lookup[phrase]:
+                counts[category] += 1
+        return counts
+
+    def count(self, text):
+        """Count distinct keywords per category in lowercased text"""
+        return self.count_matches(self.find(tokenize(text)))
@@ -0,0 +1,57 @@
+"""Lazy registry for the AI models used by the Flask app
+
+Models are registered as factories and only imported and built the first time
+a request needs them, which keeps worker boot fast. ``warmup()`` builds them
+ahead of time for deployments that prefer paying the cost at startup (for
+example from the gunicorn ``post_worker_init`` hook in gunicorn.conf.py).
+"""
+import threading
+import time
+
+
+class ModelRegistry:
+    """Builds each registered model once, on first use, in a thread-safe way"""
+
+    def __init__(self):
+        self._factories = {}
+        self._instances = {}
+        self._load_times = {}
+        self._lock = threading.RLock()
+
+    def register(self, name, factory):
+        """Register a zero-argument factory that builds the named model"""
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+
+    def get(self, name):
+        """Return the named model, building it on first use"""
+        try:
+            return self._instances[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._instances:
+                if name not in self._factories:
+                    raise KeyError(f'Unknown model: {name}')
+                start = time.perf_counter()
+                self._instances[name] = self._factories[name]()
+                self._load_times[name] = round((time.perf_counter() - start) * 1000, 1)
+            return self._instances[name]
+
+    def is_loaded(self, name):
+        """Whether the named model has been built already"""
+        return name in self._instances
+
+    def warmup(self, names=None):
+        """Build the given models (default: all registered) right away"""
+        for name in names or list(self._factories):
+            self.get(name)
+
+    def stats(self):
+        """Return which models are loaded and how long each took to build (ms)"""
+        with self._lock:
+            return {
+                name: {'loaded': name in self._instances, 'load_ms': self._load_times.get(name)}
+                for name in self._factories
+            }
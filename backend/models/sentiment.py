@@ -0,0 +1,261 @@
+"""Pluggable sentiment backends for the mood analyzer
+
+Every backend exposes ``score(text)`` and ``score_many(texts)``, returning
+``(polarity, subjectivity)`` with polarity in [-1, 1] and subjectivity in [0, 1].
+``score_parts(text)`` returns the unaveraged ``(polarity_sum,
+subjectivity_sum, assessments)`` so scores of consecutive chunks of a long
+text can be combined without scoring the whole text at once.
+
+- ``textblob``: TextBlob's pattern analyzer (the original behaviour)
+- ``lexicon``: a built-in engine with the same scoring rules that loads the
+  lexicon once into array-backed tables and scores in one tokenizer pass,
+  without building a TextBlob object per call
+"""
+import os
+import re
+from array import array
+
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(__file__), 'lexicons', 'sentiment_en.tsv')
+
+
+class TextBlobSentiment:
+    """Sentiment from TextBlob's default (pattern) analyzer"""
+
+    name = 'textblob'
+
+    def __init__(self):
+        from textblob import TextBlob  # imported here; slow to load
+        from textblob.en import sentiment as pattern_sentiment
+        self._textblob = TextBlob
+        self._pattern_sentiment = pattern_sentiment
+
+    def score(self, text):
+        sentiment = self._textblob(text).sentiment
+        return sentiment.polarity, sentiment.subjectivity
+
+    def score_many(self, texts):
+        return [self.score(text) for text in texts]
+
+    def score_parts(self, text):
+        # The analyzer TextBlob.sentiment calls, keeping its per-word assessments
+        assessments = self._pattern_sentiment(text).assessments
+        return (sum(a[1] for a in assessments), sum(a[2] for a in assessments),
+                len(assessments))
+
+
+# Tokenizer and scoring rules follow the pattern library's sentiment analyzer,
+# which is what TextBlob uses, so both backends agree on the same lexicon
+_PUNCTUATION = ".,;:!?()[]{}`'\"@#$^&*+-|=~_"
+_LEADING = _PUNCTUATION.replace('.', '')
+_QUOTES = str.maketrans({c: f' {c} ' for c in '“”‘’\'"'})
+# Trailing periods are kept on abbreviations ("etc.", "e.g.", "Mr.")
+_ABBREVIATIONS = frozenset((
+    'a.', 'a.m.', 'adj.', 'adv.', 'al.', 'c.', 'cf.', 'comp.', 'conf.', 'def.',
+    'e.g.', 'ed.', 'esp.', 'etc.', 'ex.', 'f.', 'fig.', 'gen.', 'i.e.', 'id.',
+    'int.', 'l.', 'm.', 'Med.', 'Mil.', 'Mr.', 'n.', 'n.q.', 'orig.', 'p.m.',
+    'pl.', 'pred.', 'pres.', 'ref.', 'v.', 'vs.', 'w/'
+))
+_ABBREVIATION = re.compile(r'^([A-Za-z]\.)+$|^[A-Z][bcdfghjklmnpqrstvwxz]+.$')
+_NEGATIONS = frozenset(('no', 'not', "n't", 'never'))
+
+_EMOTICONS = (  # (polarity, forms); the first matching group wins
+    (+1.00, ('<3', '♥')),
+    (+1.00, ('>:D', ':-D', ':D', '=-D', '=D', 'X-D', 'x-D', 'XD', 'xD', '8-D')),
+    (+0.75, ('>:P', ':-P', ':P', ':-p', ':p', ':-b', ':b', ':c)', ':o)', ':^)')),
+    (+0.50, ('>:)', ':-)', ':)', '=)', '=]', ':]', ':}', ':>', ':3', '8)', '8-)')),
+    (+0.25, ('>;]', ';-)', ';)', ';-]', ';]', ';D', ';^)', '*-)', '*)')),
+    (+0.05, ('>:o', ':-O', ':O', ':o', ':-o', 'o_O', 'o.O', '°O°', '°o°')),
+    (-0.25, ('>:/', ':-/', ':/', ':\\', '>:\\', ':-.', ':-s', ':s', ':S', ':-S', '>.>')),
+    (-0.75, ('>:[', ':-(', ':(', '=(', ':-[', ':[', ':{', ':-<', ':c', ':-c', '=/')),
+    (-1.00, (":'(", ":'''(", ";'(")),
+)
+_EMOTICON_POLARITY = {}
+for _polarity, _forms in _EMOTICONS:
+    for _form in _forms:
+        _EMOTICON_POLARITY.setdefault(_form.lower(), _polarity)
+# Tokenizing splits emoticons at punctuation (": )"); this joins them again
+_EMOTICON_JOIN = re.compile('(%s)($|\\s)' % '|'.join(
+    ' ?'.join(re.escape(c) for c in form) for _, forms in _EMOTICONS for form in forms
+))
+_EMOTICON_CHARS = frozenset(':;=<>*8°♥')
+_SARCASM = re.compile(r'\( ?! ?\)')
+
+
+def tokenize(text):
+    """Split text into lowercased word, punctuation and emoticon tokens"""
+    text = text.replace("n't", " n't").translate(_QUOTES)
+    tokens = []
+    for chunk in text.split():
+        stripped = chunk.lstrip(_LEADING)
+        if len(stripped) != len(chunk):
+            tokens.extend(chunk[:len(chunk) - len(stripped)])
+            chunk = stripped
+        if not chunk or chunk[-1] not in _PUNCTUATION:
+            if chunk:
+                tokens.append(chunk)
+            continue
+        tail = []
+        while chunk.endswith(tuple(_PUNCTUATION)):
+            if chunk[-1] in _LEADING:
+                tail.append(chunk[-1])
+                chunk = chunk[:-1]
+            if chunk.endswith('...'):
+                tail.append('...')
+                chunk = chunk[:-3].rstrip('.')
+            if chunk.endswith('.'):
+                if chunk in _ABBREVIATIONS or _ABBREVIATION.match(chunk):
+                    break
+                tail.append('.')
+                chunk = chunk[:-1]
+        if chunk:
+            tokens.append(chunk)
+        tokens.extend(reversed(tail))
+    joined = ' '.join(tokens)
+    if '(' in joined:
+        joined = _SARCASM.sub('(!)', joined)
+    if not _EMOTICON_CHARS.isdisjoint(joined):
+        joined = _EMOTICON_JOIN.sub(lambda m: m.group(1).replace(' ', '') + m.group(2), joined)
+    return joined.lower().split()
+
+
+class LexiconSentiment:
+    """
+    Lexicon sentiment scored in a single pass over the tokens
+
+    Known words are averaged; a preceding adverb multiplies the next word by
+    its intensity, a negation flips and halves it, '!' boosts the last word
+    and emoticons count as words of their own.
+    """
+
+    name = 'lexicon'
+
+    def __init__(self, path=None):
+        self.path = path or DEFAULT_LEXICON_PATH
+        self._index = {}
+        self._polarity = array('d')
+        self._subjectivity = array('d')
+        self._intensity = array('d')
+        self._modifier = bytearray()
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip() or line.startswith('#'):
+                    continue
+                word, polarity, subjectivity, intensity, modifier = line.rstrip('\n').split('\t')
+                self._index[word] = len(self._polarity)
+                self._polarity.append(float(polarity))
+                self._subjectivity.append(float(subjectivity))
+                self._intensity.append(float(intensity))
+                self._modifier.append(modifier == '1')
+
+    def __len__(self):
+        return len(self._index)
+
+    def score(self, text):
+        return _average(self._assess(tokenize(text)))
+
+    def score_many(self, texts):
+        return [_average(self._assess(tokenize(text))) for text in texts]
+
+    def score_parts(self, text):
+        return self._assess(tokenize(text))
+
+    def _assess(self, tokens):
+        """Return (polarity_sum, subjectivity_sum, assessments) for a token list"""
+        index = self._index
+        # Each assessment is [polarity, subjectivity, intensity, negated]
+        assessments = []
+        modifier = None  # preceding adverb ("really good")
+        negation = None  # preceding negation ("not good")
+        for word in tokens:
+            i = index.get(word)
+            if i is not None:
+                if modifier is None:
+                    assessments.append([self._polarity[i], self._subjectivity[i],
+                                        self._intensity[i], False])
+                else:
+                    last = assessments[-1]
+                    last[0] = max(-1.0, min(self._polarity[i] * last[2], 1.0))
+                    last[1] = max(-1.0, min(self._subjectivity[i] * last[2], 1.0))
+                    last[2] = self._intensity[i]
+                if negation is not None:
+                    last = assessments[-1]
+                    last[2] = 1.0 / last[2]
+                    last[3] = True
+                modifier = word if self._modifier[i] else None
+                negation = word if word in _NEGATIONS else None
+                continue
+
+            if word in _NEGATIONS:
+                negation = word
+            elif negation and len(word.strip("'")) > 1:
+                negation = None  # negation carries over small words ("not a good")
+            if negation is not None and modifier is not None and modifier.endswith('ly'):
+                assessments[-1][3] = True  # "really not good"
+                negation = None
+            elif modifier and len(word) > 2:
+                modifier = None
+            if word == '!' and assessments:
+                assessments[-1][0] = max(-1.0, min(assessments[-1][0] * 1.25, 1.0))
+            if word == '(!)':
+                assessments.append([0.0, 1.0, 1.0, False])  # sarcasm
+            if not word.isalpha() and len(word) <= 5 and word not in _PUNCTUATION:
+                polarity = _EMOTICON_POLARITY.get(word)
+                if polarity is not None:
+                    assessments.append([polarity, 1.0, 1.0, False])
+
+        polarity = sum(p * -0.5 if negated else p for p, _, _, negated in assessments)
+        subjectivity = sum(a[1] for a in assessments)
+        return polarity, subjectivity, len(assessments)
+
+
+def _average(parts):
+    polarity, subjectivity, count = parts
+    if not count:
+        return 0.0, 0.0
+    return polarity / count, subjectivity / count
+
+
+SENTIMENT_BACKENDS = {
+    TextBlobSentiment.name: TextBlobSentiment,
+    LexiconSentiment.name: LexiconSentiment,
+}
+
+
+def create_sentiment_backend(name='textblob', lexicon_path=None):
+    """Build the named sentiment backend"""
+    if name not in SENTIMENT_BACKENDS:
+        raise ValueError(f"Unknown sentiment backend '{name}' "
+                         f"(expected one of: {', '.join(SENTIMENT_BACKENDS)})")
+    if name == LexiconSentiment.name:
+        return LexiconSentiment(lexicon_path)
+    return SENTIMENT_BACKENDS[name]()
+
+
+def export_textblob_lexicon(path):
+    """Write TextBlob's English sentiment lexicon in the lexicon backend's format"""
+    from textblob.en import sentiment
+    sentiment.load()
+    rows = []
+    for word, senses in dict.items(sentiment):
+        # Tokens never contain spaces or apostrophes, so those entries can't match
+        if not word or ' ' in word or "'" in word:
+            continue
+        polarity, subjectivity, intensity = senses[None]
+        rows.append((word, polarity, subjectivity, intensity, 'RB' in senses))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('# MindTrack sentiment lexicon, derived from the pattern library\'s\n'
+                '# en-sentiment.xml as shipped with TextBlob (BSD license).\n'
+                '# word<TAB>polarity<TAB>subjectivity<TAB>intensity<TAB>modifier\n')
+        for word, polarity, subjectivity, intensity, modifier in sorted(rows):
+            f.write(f'{word}\t{polarity!r}\t{subjectivity!r}\t{intensity!r}\t{int(modifier)}\n')
+    return len(rows)
+
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) == 3 and sys.argv[1] == '--export-textblob':
+        count = export_textblob_lexicon(sys.argv[2])
+        print(f"Wrote {count} entries to {sys.argv[2]}")
+    else:
+        print('Usage: python -m models.sentiment --export-textblob <path>')
@@ -0,0 +1,103 @@
+"""Keyset (cursor) pagination for the history endpoints
+
+Pages are addressed by opaque cursors encoding a row's ``(timestamp, id)``.
+Every page is a single seek on the ``(user_id, timestamp)`` index followed by
+``limit + 1`` rows, so fetching old pages costs the same as fetching the
+newest one.
+"""
+import base64
+import json
+
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor we did not issue"""
+
+
+def encode_token(values):
+    """Encode a list of JSON values as an opaque cursor"""
+    payload = json.dumps(values, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_token(token, size):
+    """Decode a cursor made by encode_token back into its list of size values"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        raise InvalidCursor('Invalid cursor')
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor('Invalid cursor')
+    return values
+
+
+def encode_cursor(row):
+    """Encode a row's (timestamp, id) position as an opaque cursor"""
+    return encode_token([row['timestamp'], row['id']])
+
+
+def decode_cursor(token):
+    """Decode a cursor back into a (timestamp, id) tuple"""
+    timestamp, row_id = decode_token(token, 2)
+    if not isinstance(timestamp, str) or not isinstance(row_id, int) or isinstance(row_id, bool):
+        raise InvalidCursor('Invalid cursor')
+    return timestamp, row_id
+
+
+def clamp_limit(limit):
+    """Page size between 1 and MAX_PAGE_SIZE; SQLite reads LIMIT -1 as no limit"""
+    return min(max(limit, 1), MAX_PAGE_SIZE)
+
+
+def paginate(cursor, table, user_id, limit, before=None, after=None,
+             descending=True, where='', params=(), columns='*'):
+    """
+    Fetch one page of a user's rows ordered by (timestamp, id)
+    descending: listing order; ``before``/``after`` are cursors from an
+    earlier page and select rows older/newer than that position
+    limit is clamped to 1..MAX_PAGE_SIZE
+    Returns: (rows, next_cursor, prev_cursor) where next_cursor continues in
+    the listing direction and prev_cursor pages back toward the start
+    """
+    if before and after:
+        raise InvalidCursor('Use either before or after, not both')
+    limit = clamp_limit(limit)
+
+    forward_token = before if descending else after
+    backward_token = after if descending else before
+    backward = backward_token is not None
+
+    # Scan away from the cursor; backward pages are reversed afterwards
+    scan_descending = descending != backward
+    conditions = ['user_id = ?']
+    values = [user_id]
+    if where:
+        conditions.append(where)
+        values.extend(params)
+    token = backward_token if backward else forward_token
+    if token is not None:
+        conditions.append(f"(timestamp, id) {'<' if scan_descending else '>'} (?, ?)")
+        values.extend(decode_cursor(token))
+
+    order = 'DESC' if scan_descending else 'ASC'
+    cursor.execute(
+        f'''SELECT {columns} FROM {table}
+            WHERE {' AND '.join(conditions)}
+            ORDER BY timestamp {order}, id {order}
+            LIMIT ?''',
+        values + [limit + 1]
+    )
+    rows = [dict(row) for row in cursor.fetchall()]
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if backward:
+        rows.reverse()
+        next_cursor = encode_cursor(rows[-1]) if rows else backward_token
+        prev_cursor = encode_cursor(rows[0]) if rows and has_more else None
+    else:
+        next_cursor = encode_cursor(rows[-1]) if rows and has_more else None
+        prev_cursor = encode_cursor(rows[0]) if rows else forward_token
+    return rows, next_cursor, prev_cursor
@@ -0,0 +1,314 @@
+"""Population percentiles of cognitive scores per game type and difficulty
+
+Each (game_type, difficulty_level) has a t-digest of every cognitive score
+recorded for it: a few hundred weighted centroids whose sizes shrink towards
+the tails, so percentiles stay accurate at the extremes in constant space.
+Digests merge, which keeps several server processes consistent: each process
+adds new scores to a pending digest and to its own view, and every
+DIGEST_PERSIST_EVERY scores or DIGEST_PERSIST_SECONDS seconds merges the
+pending digest into the stored one (cognitive_score_digests) and reloads it.
+A percentile lookup is a binary search over the view's centroids.
+"""
+import bisect
+import json
+import math
+import sqlite3
+import threading
+import time
+
+from database import get_db, utc_timestamp
+from models.ai_models import CognitiveAnalyzer
+
+
+class TDigest:
+    """Merging t-digest (Dunning & Ertl) with the arcsine scale function"""
+
+    def __init__(self, compression=100):
+        self.compression = compression
+        self.means = []
+        self.weights = []
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._cumulative = []  # weight before each centroid
+        self._buffer = []
+
+    def add(self, value, weight=1.0):
+        """Add one value"""
+        self._buffer.append((value, weight))
+        self.count += weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._buffer) >= 5 * self.compression:
+            self._compress()
+
+    def merge(self, other):
+        """Add every value summarized by another digest"""
+        other._compress()
+        self._buffer.extend(zip(other.means, other.weights))
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+
+    def cdf(self, value):
+        """
+        Estimated share of the values below value, counting values equal to
+        it as half below
+        """
+        self._compress()
+        if not self.count or value < self.min:
+            return 0.0
+        if value > self.max:
+            return 1.0
+        if self.min == self.max:
+            return 0.5
+        means, weights, cumulative = self.means, self.weights, self._cumulative
+        low = bisect.bisect_left(means, value)
+        high = bisect.bisect_right(means, value, low)
+        if low < high:
+            # Centroids at exactly this value: half of their weight is below
+            below = cumulative[low] + sum(weights[low:high]) / 2
+        elif low == 0:
+            below = weights[0] / 2 * (value - self.min) / (means[0] - self.min)
+        elif low == len(means):
+            last = len(means) - 1
+            below = self.count - weights[last] / 2 * (self.max - value) / (self.max - means[last])
+        else:
+            # Between the centres of two centroids, half of each on that side
+            left = low - 1
+            span = (weights[left] + weights[low]) / 2
+            below = cumulative[left] + weights[left] / 2 + span * (value - means[left]) / (means[low] - means[left])
+        return min(max(below / self.count, 0.0), 1.0)
+
+    def to_json(self):
+        self._compress()
+        return json.dumps({
+            'compression': self.compression,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+            'centroids': [[mean, weight] for mean, weight in zip(self.means, self.weights)]
+        })
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        digest = cls(data['compression'])
+        if data['centroids']:
+            digest.means = [mean for mean, _ in data['centroids']]
+            digest.weights = [weight for _, weight in data['centroids']]
+            digest.count = float(sum(digest.weights))
+            digest.min, digest.max = data['min'], data['max']
+            digest._index()
+        return digest
+
+    def _k(self, q):
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _q_limit(self, q):
+        # Largest quantile a centroid starting at q may reach: one k unit on
+        k = min(self._k(q) + 1, self.compression / 4)
+        return (math.sin(k * 2 * math.pi / self.compression) + 1) / 2
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        points = sorted(list(zip(self.means, self.weights)) + self._buffer)
+        self._buffer = []
+        total = sum(weight for _, weight in points)
+        means, weights = [], []
+        mean, weight = points[0]
+        before = 0.0
+        limit = self._q_limit(0.0)
+        for next_mean, next_weight in points[1:]:
+            if (before + weight + next_weight) / total <= limit:
+                weight += next_weight
+                mean += (next_mean - mean) * next_weight / weight
+            else:
+                means.append(mean)
+                weights.append(weight)
+                before += weight
+                limit = self._q_limit(before / total)
+                mean, weight = next_mean, next_weight
+        means.append(mean)
+        weights.append(weight)
+        self.means, self.weights, self.count = means, weights, total
+        self._index()
+
+    def _index(self):
+        self._cumulative = []
+        total = 0.0
+        for weight in self.weights:
+            self._cumulative.append(total)
+            total += weight
+
+
+def create_digest_table(cursor):
+    """Create the cognitive_score_digests table"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cognitive_score_digests (
+            game_type TEXT NOT NULL,
+            difficulty_level INTEGER NOT NULL,
+            count REAL NOT NULL DEFAULT 0,
+            digest TEXT NOT NULL,
+            updated_at TEXT,
+            PRIMARY KEY (game_type, difficulty_level)
+        ) WITHOUT ROWID
+    ''')
+
+
+def digest_key(game_type, difficulty):
+    """
+    (game_type, difficulty_level) a result is ranked in, or None if it is not
+    ranked; only known game types and difficulties get a digest, so clients
+    cannot grow the table or every process's views with made-up keys
+    """
+    if game_type not in CognitiveAnalyzer.GAME_TYPES:
+        return None
+    try:
+        difficulty = int(difficulty)
+    except (TypeError, ValueError):
+        return None
+    return (game_type, difficulty) if 1 <= difficulty <= CognitiveAnalyzer.MAX_DIFFICULTY else None
+
+
+def load_digest(cursor, key, compression=100):
+    cursor.execute(
+        'SELECT digest FROM cognitive_score_digests WHERE game_type = ? AND difficulty_level = ?', key
+    )
+    row = cursor.fetchone()
+    return TDigest.from_json(row[0]) if row else TDigest(compression)
+
+
+def store_digest(cursor, key, digest):
+    cursor.execute(
+        '''INSERT OR REPLACE INTO cognitive_score_digests
+           (game_type, difficulty_level, count, digest, updated_at)
+           VALUES (?, ?, ?, ?, ?)''',
+        key + (digest.count, digest.to_json(), utc_timestamp())
+    )
+
+
+def rebuild_digests(cursor, compression=100):
+    """Recompute every digest from cognitive_assessments"""
+    cursor.execute('DELETE FROM cognitive_score_digests')
+    rows = cursor.execute(
+        '''SELECT game_type, difficulty_level, cognitive_score FROM cognitive_assessments
+           WHERE cognitive_score IS NOT NULL
+           ORDER BY game_type, difficulty_level'''
+    )
+    digests = {}
+    for game_type, difficulty, score in rows:
+        key = digest_key(game_type, difficulty)
+        if key is not None:
+            digests.setdefault(key, TDigest(compression)).add(score)
+    for key, digest in digests.items():
+        store_digest(cursor, key, digest)
+    return digests
+
+
+class PopulationIndex:
+    """Per-process digest views with pending additions, see the module docstring"""
+
+    def __init__(self, compression=100, persist_every=100, persist_seconds=60, min_population=20):
+        self.compression = compression
+        self.persist_every = persist_every
+        self.persist_seconds = persist_seconds
+        self.min_population = min_population
+        self._views = {}
+        self._pending = {}
+        self._pending_count = 0
+        self._last_persist = time.monotonic()
+        self._lock = threading.Lock()
+
+    def percentile(self, cursor, game_type, difficulty, score):
+        """
+        Share of the population's scores below score, as 0-100
+        Returns: (percentile, population), percentile None while fewer than
+        min_population scores are known
+        """
+        key = digest_key(game_type, difficulty)
+        if key is None:
+            return None, 0
+        with self._lock:
+            view = self._view(cursor, key)
+            if view.count < self.min_population:
+                return None, int(view.count)
+            return round(100 * view.cdf(score), 1), int(view.count)
+
+    def add(self, game_type, difficulty, scores):
+        """
+        Add the scores of committed assessments, persisting the pending ones
+        when due. Call it only after the transaction that stored the scores
+        has committed: the views and pending digests are in memory and would
+        not roll back with it. A persist that fails on a database error
+        keeps the scores pending for the next one.
+        """
+        key = digest_key(game_type, difficulty)
+        if key is None:
+            return
+        with self._lock:
+            if key not in self._views:
+                with get_db() as conn:
+                    self._views[key] = load_digest(conn.cursor(), key, self.compression)
+            view = self._views[key]
+            pending = self._pending.setdefault(key, TDigest(self.compression))
+            for score in scores:
+                view.add(score)
+                pending.add(score)
+            self._pending_count += len(scores)
+            if (self._pending_count >= self.persist_every
+                    or time.monotonic() - self._last_persist >= self.persist_seconds):
+                try:
+                    self._persist()
+                except sqlite3.Error:
+                    pass
+
+    def persist(self):
+        """Merge the pending scores into the stored digests"""
+        with self._lock:
+            self._persist()
+
+    def _view(self, cursor, key):
+        view = self._views.get(key)
+        if view is None:
+            view = self._views[key] = load_digest(cursor, key, self.compression)
+        return view
+
+    def _persist(self):
+        # In a transaction of its own; the pending digests are only dropped
+        # once it has committed
+        pending, self._pending = self._pending, {}
+        self._pending_count = 0
+        self._last_persist = time.monotonic()
+        if not pending:
+            return
+        stored = {}
+        try:
+            with get_db() as conn:
+                cursor = conn.cursor()
+                for key, digest in pending.items():
+                    stored[key] = load_digest(cursor, key, self.compression)
+                    stored[key].merge(digest)
+                    store_digest(cursor, key, stored[key])
+        except BaseException:
+            self._pending = pending
+            raise
+        # Stored digests may include other processes' scores; reloading them
+        # brings those into this process's views
+        self._views.update(stored)
+
+
+if __name__ == '__main__':
+    import sys
+    from config import Config
+    from database import get_db, init_database
+
+    if '--rebuild' in sys.argv:
+        init_database()
+        with get_db() as conn:
+            digests = rebuild_digests(conn.cursor(), Config.DIGEST_COMPRESSION)
+        print(f"Rebuilt {len(digests)} cognitive score digests from "
+              f"{int(sum(d.count for d in digests.values()))} assessments")
+    else:
+        print('Usage: python percentiles.py --rebuild')
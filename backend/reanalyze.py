@@ -0,0 +1,230 @@
+"""Re-score stored mood analysis after the analyzer changes
+
+Streams the rows of each analyzed table in id order, fans batches out to a
+pool of processes running MoodAnalyzer, and writes the results back one batch
+per transaction together with a checkpoint, so an interrupted run resumes
+where it stopped. Every rewritten row records the analyzer version that
+produced it; rows already at the current version are skipped.
+
+Usage:
+    python reanalyze.py [--tables mood_assessments journal_entries chatbot_conversations]
+                        [--workers N] [--batch-size 500] [--restart]
+    python reanalyze.py --status
+"""
+import argparse
+import json
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import rollups
+from analysis_executor import init_worker, worker_analyzer
+from config import Config
+from database import get_db, init_database, utc_timestamp
+from user_state import refresh_latest
+
+# table -> (text column, extra filter, UPDATE statement, analysis -> values)
+SOURCES = {
+    'mood_assessments': (
+        'text_input', '',
+        '''UPDATE mood_assessments
+           SET mood_score = ?, anxiety_level = ?, stress_level = ?,
+               depression_indicators = ?, ai_analysis = ?, analyzer_version = ?
+           WHERE id = ?''',
+        lambda a: (a['mood_score'], a['anxiety_level'], a['stress_level'],
+                   a['depression_indicators'], json.dumps(a))
+    ),
+    'journal_entries': (
+        'content', '',
+        '''UPDATE journal_entries
+           SET sentiment_score = ?, emotions = ?, sections = ?, analyzer_version = ?
+           WHERE id = ?''',
+        lambda a: (a['mood_score'], json.dumps(a['emotions']),
+                   json.dumps(a['sections']) if 'sections' in a else None)
+    ),
+    'chatbot_conversations': (
+        'message', 'AND is_user = 1',
+        '''UPDATE chatbot_conversations
+           SET sentiment_score = ?, analyzer_version = ?
+           WHERE id = ?''',
+        lambda a: (a['mood_score'],)
+    )
+}
+
+
+def _analyze_rows(table, rows, options):
+    """Analyze (id, text) rows in a pool process; returns analyses in row order"""
+    analyzer = worker_analyzer()
+    if table == 'journal_entries':
+        # Long entries keep their per-section scores, as when they were created
+        return [
+            analyzer.analyze_sections(text, options['chunk_chars'], options['max_sections'])
+            if len(text) >= options['sections_min_chars'] else analyzer.analyze_text(text)
+            for _, text in rows
+        ]
+    return analyzer.analyze_texts([text for _, text in rows])
+
+
+def get_checkpoint(cursor, job):
+    cursor.execute('SELECT * FROM job_checkpoints WHERE job = ?', (job,))
+    row = cursor.fetchone()
+    return dict(row) if row else None
+
+
+def reset_checkpoint(cursor, job, version):
+    cursor.execute(
+        '''INSERT OR REPLACE INTO job_checkpoints
+           (job, last_id, processed, analyzer_version, started_at, updated_at, completed_at)
+           VALUES (?, 0, 0, ?, ?, ?, NULL)''',
+        (job, version, utc_timestamp(), utc_timestamp())
+    )
+
+
+def _read_batch(table, after_id, version, batch_size, restart):
+    text_column, extra, _, _ = SOURCES[table]
+    stale = '' if restart else 'AND (analyzer_version IS NULL OR analyzer_version != ?)'
+    params = (after_id,) + (() if restart else (version,)) + (batch_size,)
+    with get_db() as conn:
+        return conn.execute(
+            f'''SELECT id, user_id, COALESCE({text_column}, '') FROM {table}
+                WHERE id > ? {extra} {stale}
+                ORDER BY id LIMIT ?''',
+            params
+        ).fetchall()
+
+
+def _write_batch(table, job, rows, analyses, version):
+    """Write one batch of results and advance the checkpoint in one transaction"""
+    _, _, update, values = SOURCES[table]
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            update,
+            [values(analysis) + (version, row[0]) for row, analysis in zip(rows, analyses)]
+        )
+        cursor.execute(
+            '''UPDATE job_checkpoints
+               SET last_id = ?, processed = processed + ?, updated_at = ?
+               WHERE job = ?''',
+            (rows[-1][0], len(rows), utc_timestamp(), job)
+        )
+
+
+def _finish(table, job):
+    """Rebuild data derived from the re-scored rows and mark the job complete"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        if table == 'mood_assessments':
+            rollups.rebuild_rollups(cursor, 'mood_assessments')
+            cursor.execute('SELECT DISTINCT user_id FROM mood_assessments')
+            for (user_id,) in cursor.fetchall():
+                refresh_latest(cursor, user_id, 'mood_assessments')
+        cursor.execute(
+            'UPDATE job_checkpoints SET completed_at = ? WHERE job = ?', (utc_timestamp(), job)
+        )
+
+
+def reanalyze_table(pool, table, version, workers, batch_size, options, restart=False):
+    """Re-score one table; returns (rows written, seconds)"""
+    job = f'reanalyze:{table}'
+    with get_db() as conn:
+        cursor = conn.cursor()
+        checkpoint = get_checkpoint(cursor, job)
+        if restart or checkpoint is None or checkpoint['analyzer_version'] != version:
+            reset_checkpoint(cursor, job, version)
+            checkpoint = get_checkpoint(cursor, job)
+        elif checkpoint['last_id']:
+            print(f"{table}: resuming after id {checkpoint['last_id']} "
+                  f"({checkpoint['processed']} rows done)")
+
+    start = time.perf_counter()
+    written = batches = 0
+    read_id = checkpoint['last_id']
+    exhausted = False
+    in_flight = deque()
+    while True:
+        # Keep every worker busy with a batch queued behind it
+        while not exhausted and len(in_flight) < workers * 2:
+            rows = _read_batch(table, read_id, version, batch_size, restart)
+            if not rows:
+                exhausted = True
+                break
+            read_id = rows[-1][0]
+            future = pool.submit(_analyze_rows, table, [(row[0], row[2]) for row in rows], options)
+            in_flight.append((rows, future))
+        if not in_flight:
+            break
+
+        # Results are written in id order, so the checkpoint only moves forward
+        rows, future = in_flight.popleft()
+        _write_batch(table, job, rows, future.result(), version)
+        written += len(rows)
+        batches += 1
+        if batches % 20 == 0:
+            elapsed = time.perf_counter() - start
+            print(f'{table}: {written} rows, {written / elapsed:.0f} rows/s, at id {rows[-1][0]}',
+                  flush=True)
+
+    if written or checkpoint['completed_at'] is None:
+        _finish(table, job)
+    return written, time.perf_counter() - start
+
+
+def print_status():
+    with get_db() as conn:
+        cursor = conn.cursor()
+        for table, (_, extra, _, _) in SOURCES.items():
+            cursor.execute(
+                f'''SELECT analyzer_version, COUNT(*) FROM {table}
+                    WHERE 1 = 1 {extra} GROUP BY analyzer_version'''
+            )
+            versions = ', '.join(f'{v or "unversioned"}: {n}' for v, n in cursor.fetchall())
+            checkpoint = get_checkpoint(cursor, f'reanalyze:{table}')
+            print(f"{table}: {versions or 'no rows'}")
+            if checkpoint:
+                state = f"completed {checkpoint['completed_at']}" if checkpoint['completed_at'] \
+                    else f"in progress since {checkpoint['started_at']}"
+                print(f"  checkpoint: version {checkpoint['analyzer_version']}, "
+                      f"last id {checkpoint['last_id']}, {checkpoint['processed']} rows, {state}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tables', nargs='+', choices=list(SOURCES), default=list(SOURCES))
+    parser.add_argument('--workers', type=int,
+                        default=Config.ANALYSIS_EXECUTOR_WORKERS or multiprocessing.cpu_count())
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--restart', action='store_true',
+                        help='ignore checkpoints and re-score every row, even current ones')
+    parser.add_argument('--status', action='store_true', help='show row versions and checkpoints')
+    args = parser.parse_args()
+
+    init_database()
+    if args.status:
+        print_status()
+        return
+
+    initargs = (Config.MOOD_LEXICON_PATH, Config.SENTIMENT_BACKEND, Config.SENTIMENT_LEXICON_PATH)
+    init_worker(*initargs)
+    version = worker_analyzer().version
+    options = {
+        'sections_min_chars': Config.JOURNAL_SECTIONS_MIN_CHARS,
+        'chunk_chars': Config.ANALYSIS_CHUNK_CHARS,
+        'max_sections': Config.JOURNAL_MAX_SECTIONS
+    }
+    print(f'Analyzer version {version}, {args.workers} workers, batches of {args.batch_size}')
+
+    with ProcessPoolExecutor(max_workers=args.workers,
+                             mp_context=multiprocessing.get_context('spawn'),
+                             initializer=init_worker, initargs=initargs) as pool:
+        for table in args.tables:
+            written, elapsed = reanalyze_table(
+                pool, table, version, args.workers, args.batch_size, options, args.restart
+            )
+            rate = written / elapsed if elapsed else 0
+            print(f'{table}: {written} rows re-analyzed in {elapsed:.1f}s ({rate:.0f} rows/s)')
+
+
+if __name__ == '__main__':
+    main()
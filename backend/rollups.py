@@ -0,0 +1,172 @@
+"""Per-user daily rollups for health and mood trends
+
+Each write to health_metrics or mood_assessments also folds its values into a
+(user_id, day) rollup row holding count, sum, min, max and sum of squares per
+metric. Trend queries then read one row per day instead of every raw sample.
+"""
+import math
+
+from database import utc_timestamp
+
+# source table -> (rollup table, rolled-up metrics)
+ROLLUPS = {
+    'health_metrics': (
+        'health_daily_rollups',
+        ['heart_rate', 'hrv_score', 'sleep_hours', 'steps', 'stress_level']
+    ),
+    'mood_assessments': (
+        'mood_daily_rollups',
+        ['mood_score', 'anxiety_level']
+    )
+}
+
+STAT_SUFFIXES = ['count', 'sum', 'min', 'max', 'sumsq']
+
+
+def create_rollup_table(cursor, source_table):
+    """Create the rollup table for a source table"""
+    table, metrics = ROLLUPS[source_table]
+    columns = []
+    for metric in metrics:
+        columns += [
+            f'{metric}_count INTEGER NOT NULL DEFAULT 0',
+            f'{metric}_sum REAL NOT NULL DEFAULT 0',
+            f'{metric}_min REAL',
+            f'{metric}_max REAL',
+            f'{metric}_sumsq REAL NOT NULL DEFAULT 0'
+        ]
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {table} (
+            user_id INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            samples INTEGER NOT NULL DEFAULT 0,
+            {', '.join(columns)},
+            PRIMARY KEY (user_id, day)
+        ) WITHOUT ROWID
+    ''')
+
+
+def rebuild_rollups(cursor, source_table, user_id=None):
+    """Recompute rollups from the raw rows (all users, or one user)"""
+    table, metrics = ROLLUPS[source_table]
+    aggregates = []
+    for metric in metrics:
+        aggregates += [
+            f'COUNT({metric})', f'COALESCE(SUM({metric}), 0)', f'MIN({metric})',
+            f'MAX({metric})', f'COALESCE(SUM({metric} * {metric}), 0)'
+        ]
+    where, params = ('WHERE user_id = ?', (user_id,)) if user_id is not None else ('', ())
+    cursor.execute(f'DELETE FROM {table} {where}', params)
+    cursor.execute(
+        f'''INSERT INTO {table} (user_id, day, samples, {', '.join(_stat_columns(metrics))})
+            SELECT user_id, substr(timestamp, 1, 10), COUNT(*), {', '.join(aggregates)}
+            FROM {source_table} {where}
+            GROUP BY user_id, substr(timestamp, 1, 10)''',
+        params
+    )
+
+
+def record_samples(cursor, source_table, user_id, samples):
+    """
+    Fold new raw samples into the daily rollups
+    samples: dicts holding the metric values and an optional canonical
+    'timestamp' (defaults to now, matching CURRENT_TIMESTAMP)
+    """
+    table, metrics = ROLLUPS[source_table]
+    days = {}
+    now = None
+    for sample in samples:
+        timestamp = sample.get('timestamp')
+        if not timestamp:
+            now = now or utc_timestamp()
+            timestamp = now
+        stats = days.setdefault(timestamp[:10], _empty_stats(metrics))
+        stats['samples'] += 1
+        for metric in metrics:
+            try:
+                value = float(sample.get(metric))
+            except (TypeError, ValueError):
+                continue
+            if not math.isfinite(value):
+                continue
+            stats[f'{metric}_count'] += 1
+            stats[f'{metric}_sum'] += value
+            stats[f'{metric}_sumsq'] += value * value
+            low, high = stats[f'{metric}_min'], stats[f'{metric}_max']
+            stats[f'{metric}_min'] = value if low is None else min(low, value)
+            stats[f'{metric}_max'] = value if high is None else max(high, value)
+
+    columns = ['samples'] + _stat_columns(metrics)
+    updates = ['samples = samples + excluded.samples']
+    for metric in metrics:
+        for suffix in ('count', 'sum', 'sumsq'):
+            column = f'{metric}_{suffix}'
+            updates.append(f'{column} = {column} + excluded.{column}')
+        for suffix in ('min', 'max'):
+            column = f'{metric}_{suffix}'
+            updates.append(
+                f'{column} = COALESCE({suffix}({column}, excluded.{column}), {column}, excluded.{column})'
+            )
+    cursor.executemany(
+        f'''INSERT INTO {table} (user_id, day, {', '.join(columns)})
+            VALUES (?, ?, {', '.join('?' for _ in columns)})
+            ON CONFLICT (user_id, day) DO UPDATE SET {', '.join(updates)}''',
+        [(user_id, day) + tuple(stats[c] for c in columns) for day, stats in days.items()]
+    )
+
+
+def get_trends(cursor, source_table, user_id, since_day):
+    """
+    Summarize a user's rollups from since_day (inclusive) onward
+    Returns: (samples, summary, daily) where summary maps each metric to its
+    window statistics and daily lists per-day means
+    """
+    table, metrics = ROLLUPS[source_table]
+    cursor.execute(
+        f'SELECT * FROM {table} WHERE user_id = ? AND day >= ? ORDER BY day ASC',
+        (user_id, since_day)
+    )
+    totals = _empty_stats(metrics)
+    daily = []
+    for row in cursor:
+        point = {'timestamp': row['day'], 'samples': row['samples']}
+        totals['samples'] += row['samples']
+        for metric in metrics:
+            count = row[f'{metric}_count']
+            point[metric] = round(row[f'{metric}_sum'] / count, 3) if count else None
+            if not count:
+                continue
+            for suffix in ('count', 'sum', 'sumsq'):
+                totals[f'{metric}_{suffix}'] += row[f'{metric}_{suffix}']
+            low, high = totals[f'{metric}_min'], totals[f'{metric}_max']
+            totals[f'{metric}_min'] = row[f'{metric}_min'] if low is None else min(low, row[f'{metric}_min'])
+            totals[f'{metric}_max'] = row[f'{metric}_max'] if high is None else max(high, row[f'{metric}_max'])
+        daily.append(point)
+
+    summary = {}
+    for metric in metrics:
+        count = totals[f'{metric}_count']
+        mean = totals[f'{metric}_sum'] / count if count else 0
+        variance = max(totals[f'{metric}_sumsq'] / count - mean * mean, 0) if count else 0
+        summary[metric] = {
+            'count': count,
+            'mean': round(mean, 3),
+            'min': totals[f'{metric}_min'],
+            'max': totals[f'{metric}_max'],
+            'stddev': round(math.sqrt(variance), 3)
+        }
+    return totals['samples'], summary, daily
+
+
+def _stat_columns(metrics):
+    return [f'{metric}_{suffix}' for metric in metrics for suffix in STAT_SUFFIXES]
+
+
+def _empty_stats(metrics):
+    stats = {'samples': 0}
+    for metric in metrics:
+        stats.update({
+            f'{metric}_count': 0, f'{metric}_sum': 0.0, f'{metric}_min': None,
+            f'{metric}_max': None, f'{metric}_sumsq': 0.0
+        })
+    return stats
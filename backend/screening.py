@@ -0,0 +1,231 @@
+"""Cohort-wide cognitive decline screening
+
+Runs the decline check of CognitiveAnalyzer.detect_decline_trend (least
+squares over each user's last TREND_WINDOW assessments) for every user at
+once. The user id space is split into ranges that a pool of processes screens
+in parallel. Each range is one ordered scan of cognitive_assessments by
+(user_id, timestamp, id) over a covering index, read in chunks. Per-user
+slopes come from NumPy segment reductions over each chunk, with no Python
+loop over users. Users whose trend is declining are written to
+cognitive_screening_results under a cognitive_screening_runs row.
+
+Usage:
+    python screening.py [--workers N] [--chunk-rows 100000]
+    python screening.py --status
+"""
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import database
+from config import Config
+from database import get_db, init_database, utc_timestamp
+from models.ai_models import CognitiveAnalyzer
+
+RANGES_PER_WORKER = 8
+
+
+def create_screening_tables(cursor):
+    """Create the screening run and result tables"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cognitive_screening_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            started_at TEXT NOT NULL,
+            completed_at TEXT,
+            window_size INTEGER NOT NULL,
+            slope_threshold REAL NOT NULL,
+            users_screened INTEGER NOT NULL DEFAULT 0,
+            users_flagged INTEGER NOT NULL DEFAULT 0,
+            rows_scanned INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cognitive_screening_results (
+            run_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            slope REAL NOT NULL,
+            samples INTEGER NOT NULL,
+            avg_cognitive_score REAL NOT NULL,
+            PRIMARY KEY (run_id, user_id),
+            FOREIGN KEY (run_id) REFERENCES cognitive_screening_runs (id)
+        ) WITHOUT ROWID
+    ''')
+    # Lets each range scan read the scores in order without touching the table
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_cognitive_assessments_screening
+        ON cognitive_assessments (user_id, timestamp, id, cognitive_score)
+    ''')
+
+
+def segment_trends(user_ids, scores, window):
+    """
+    Least-squares slope of each user's last window scores
+    user_ids, scores: arrays ordered by (user_id, timestamp, id)
+    Returns: (user ids, samples, slopes, mean scores), one entry per user
+    """
+    import numpy as np
+
+    starts = np.flatnonzero(np.r_[True, user_ids[1:] != user_ids[:-1]])
+    lengths = np.diff(np.r_[starts, len(user_ids)])
+    from_end = np.repeat(starts + lengths, lengths) - 1 - np.arange(len(user_ids))
+    keep = from_end < window
+
+    # x runs 0..n-1 over each user's kept scores, oldest first
+    samples = np.minimum(lengths, window)
+    y = scores[keep]
+    x = np.repeat(samples, samples) - 1 - from_end[keep]
+    offsets = np.r_[0, np.cumsum(samples)[:-1]]
+    sum_y = np.add.reduceat(y, offsets)
+    sum_xy = np.add.reduceat(x * y, offsets)
+    sum_x = samples * (samples - 1) / 2
+    sum_xx = (samples - 1) * samples * (2 * samples - 1) / 6
+    spread = samples * sum_xx - sum_x * sum_x
+    slopes = np.divide(samples * sum_xy - sum_x * sum_y, spread,
+                       out=np.zeros(len(samples)), where=spread > 0)
+    return user_ids[starts], samples, slopes, sum_y / samples
+
+
+def _init_worker(database_name):
+    database.DATABASE_NAME = database_name
+
+
+def _screen_range(low, high, window, threshold, min_samples, chunk_rows):
+    """Screen users low <= user_id < high; returns (rows, users screened, flagged rows)"""
+    import numpy as np
+
+    rows_scanned = screened = 0
+    flagged = []
+    carry = np.empty((0, 2))
+
+    def screen(data):
+        nonlocal screened
+        users, samples, slopes, means = segment_trends(data[:, 0], data[:, 1], window)
+        enough = samples >= min_samples
+        screened += int(enough.sum())
+        hits = enough & (slopes < -threshold)
+        flagged.extend(zip(users[hits].astype(int).tolist(), slopes[hits].tolist(),
+                           samples[hits].tolist(), means[hits].tolist()))
+
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(
+            '''SELECT user_id, cognitive_score FROM cognitive_assessments
+               WHERE user_id >= ? AND user_id < ? AND cognitive_score IS NOT NULL
+               ORDER BY user_id, timestamp, id''',
+            (low, high)
+        )
+        while True:
+            chunk = cursor.fetchmany(chunk_rows)
+            if not chunk:
+                break
+            rows_scanned += len(chunk)
+            data = np.concatenate([carry, np.array(chunk, dtype=float)])
+            # The last user may continue in the next chunk; only their newest
+            # window scores can matter
+            tail = int(np.searchsorted(data[:, 0], data[-1, 0]))
+            carry = data[tail:][-window:]
+            if tail:
+                screen(data[:tail])
+    if len(carry):
+        screen(carry)
+    return rows_scanned, screened, flagged
+
+
+def screen_population(pool, workers, chunk_rows=100000, window=None, threshold=None):
+    """
+    Screen every user with cognitive assessments
+    Returns: the cognitive_screening_runs row of this run, as a dict
+    """
+    window = window or CognitiveAnalyzer.TREND_WINDOW
+    threshold = CognitiveAnalyzer.TREND_SLOPE_THRESHOLD if threshold is None else threshold
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            '''INSERT INTO cognitive_screening_runs (started_at, window_size, slope_threshold)
+               VALUES (?, ?, ?)''',
+            (utc_timestamp(), window, threshold)
+        )
+        run_id = cursor.lastrowid
+        low, high = cursor.execute(
+            'SELECT MIN(user_id), MAX(user_id) FROM cognitive_assessments'
+        ).fetchone()
+
+    start = time.perf_counter()
+    totals = {'rows_scanned': 0, 'users_screened': 0, 'users_flagged': 0}
+    if low is not None:
+        count = max(workers * RANGES_PER_WORKER, 1)
+        step = max((high - low + 1 + count - 1) // count, 1)
+        futures = [
+            pool.submit(_screen_range, first, first + step, window, threshold,
+                        CognitiveAnalyzer.TREND_MIN_SAMPLES, chunk_rows)
+            for first in range(low, high + 1, step)
+        ]
+        for done, future in enumerate(as_completed(futures), 1):
+            rows_scanned, screened, flagged = future.result()
+            with get_db() as conn:
+                conn.executemany(
+                    '''INSERT INTO cognitive_screening_results
+                       (run_id, user_id, slope, samples, avg_cognitive_score)
+                       VALUES (?, ?, ?, ?, ?)''',
+                    [(run_id,) + row for row in flagged]
+                )
+            totals['rows_scanned'] += rows_scanned
+            totals['users_screened'] += screened
+            totals['users_flagged'] += len(flagged)
+            elapsed = time.perf_counter() - start
+            print(f"{done}/{len(futures)} ranges, {totals['rows_scanned']} rows, "
+                  f"{totals['rows_scanned'] / elapsed:.0f} rows/s", flush=True)
+
+    with get_db() as conn:
+        conn.execute(
+            '''UPDATE cognitive_screening_runs
+               SET completed_at = ?, users_screened = ?, users_flagged = ?, rows_scanned = ?
+               WHERE id = ?''',
+            (utc_timestamp(), totals['users_screened'], totals['users_flagged'],
+             totals['rows_scanned'], run_id)
+        )
+        return dict(conn.execute('SELECT * FROM cognitive_screening_runs WHERE id = ?', (run_id,)).fetchone())
+
+
+def print_status(limit=5):
+    with get_db() as conn:
+        runs = conn.execute(
+            'SELECT * FROM cognitive_screening_runs ORDER BY id DESC LIMIT ?', (limit,)
+        ).fetchall()
+        if not runs:
+            print('No screening runs yet')
+        for run in runs:
+            state = f"completed {run['completed_at']}" if run['completed_at'] else 'incomplete'
+            print(f"Run {run['id']} started {run['started_at']}, {state}: "
+                  f"{run['users_flagged']} of {run['users_screened']} users flagged "
+                  f"({run['rows_scanned']} rows, window {run['window_size']}, "
+                  f"slope < -{run['slope_threshold']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int,
+                        default=Config.ANALYSIS_EXECUTOR_WORKERS or multiprocessing.cpu_count())
+    parser.add_argument('--chunk-rows', type=int, default=100000)
+    parser.add_argument('--status', action='store_true', help='show the latest screening runs')
+    args = parser.parse_args()
+
+    init_database()
+    if args.status:
+        print_status()
+        return
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers,
+                             mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=(database.DATABASE_NAME,)) as pool:
+        run = screen_population(pool, args.workers, args.chunk_rows)
+    elapsed = time.perf_counter() - start
+    print(f"Run {run['id']}: {run['users_flagged']} of {run['users_screened']} users flagged, "
+          f"{run['rows_scanned']} rows in {elapsed:.1f}s ({run['rows_scanned'] / elapsed:.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
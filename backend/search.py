@@ -0,0 +1,172 @@
+"""Full-text search over journal entries and chat messages
+
+search_index is an FTS5 table kept in sync with journal_entries and
+chatbot_conversations by triggers. Journal entries are indexed under their
+id as rowid and chat messages under the negated id, so both sources share
+one bm25 ranking and every sync is a rowid lookup. Each row carries an owner
+token ("u<user_id>") that every query must match, so a search only walks the
+postings of the user's own rows.
+
+Result pages are addressed by offset, not by a (rank, rowid) keyset: bm25
+scores depend on statistics of the whole index, so any write rescales them
+and a stored rank no longer marks the same position. The cursor also keeps
+the highest journal and chat ids at the first page, so rows added later
+never show up in the middle of a listing.
+"""
+import json
+import re
+import zlib
+
+from pagination import InvalidCursor, clamp_limit, decode_token, encode_token
+
+# source -> (table, text column, rowid sign)
+SOURCES = {
+    'journal': ('journal_entries', 'content', 1),
+    'chat': ('chatbot_conversations', 'message', -1)
+}
+
+MAX_QUERY_TERMS = 16
+
+# "quoted phrases" or bare words, a trailing * on a word searches by prefix
+_QUERY_PART = re.compile(r'"([^"]*)"|([^\s"]+)')
+_WORD_CHAR = re.compile(r'\w')
+
+
+class InvalidQuery(ValueError):
+    """Raised when a search query has no searchable terms"""
+
+
+def create_search_index(cursor):
+    """Create the FTS5 table and the triggers that keep it in sync"""
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+            body, owner, timestamp UNINDEXED,
+            tokenize = 'porter unicode61'
+        )
+    ''')
+    # Rank on the text only; the owner token matches every row of a user
+    cursor.execute("INSERT INTO search_index (search_index, rank) VALUES ('rank', 'bm25(1.0, 0.0)')")
+
+    for table, column, sign in SOURCES.values():
+        rowid = '-' if sign < 0 else ''
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO search_index (rowid, body, owner, timestamp)
+                VALUES ({rowid}new.id, new.{column}, 'u' || new.user_id, new.timestamp);
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table}
+            BEGIN
+                DELETE FROM search_index WHERE rowid = {rowid}old.id;
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_search_update
+            AFTER UPDATE OF {column}, user_id, timestamp ON {table}
+            BEGIN
+                UPDATE search_index
+                SET body = new.{column}, owner = 'u' || new.user_id, timestamp = new.timestamp
+                WHERE rowid = {rowid}old.id;
+            END
+        ''')
+
+
+def rebuild_search_index(cursor):
+    """Re-index every journal entry and chat message"""
+    cursor.execute('DELETE FROM search_index')
+    for table, column, sign in SOURCES.values():
+        rowid = '-id' if sign < 0 else 'id'
+        cursor.execute(f'''
+            INSERT INTO search_index (rowid, body, owner, timestamp)
+            SELECT {rowid}, {column}, 'u' || user_id, timestamp FROM {table}
+        ''')
+    cursor.execute("INSERT INTO search_index (search_index) VALUES ('optimize')")
+
+
+def build_match(user_id, query):
+    """
+    Turn free text into an FTS5 query limited to the user's rows
+    Words and "quoted phrases" must all match; word* matches by prefix.
+    FTS5 operators in the text are searched for as plain words.
+    """
+    parts = []
+    for phrase, word in _QUERY_PART.findall(query or ''):
+        text = phrase or word
+        prefix = bool(word) and word.endswith('*')
+        text = text.rstrip('*') if prefix else text
+        if not _WORD_CHAR.search(text):
+            continue
+        parts.append(f'"{text}"' + ('*' if prefix else ''))
+    if not parts:
+        raise InvalidQuery('Search query has no searchable terms')
+    return f'owner:"u{int(user_id)}" AND body:({" ".join(parts[:MAX_QUERY_TERMS])})'
+
+
+def search(cursor, user_id, query, sources=('journal',), since=None, until=None,
+           limit=20, after=None):
+    """
+    One page of the user's best matches, best first
+    since/until: canonical timestamps bounding the rows' timestamps
+    (inclusive/exclusive); after: next_cursor of the previous page
+    A write between pages can still move a row across a page boundary, so it
+    may be returned twice or not at all, but the rows present at the first
+    page keep their order under any write that rescales every score
+    Returns: (results, next_cursor)
+    """
+    limit = clamp_limit(limit)
+    match = build_match(user_id, query)
+    fingerprint = zlib.crc32(json.dumps([match, sorted(sources), since, until]).encode('utf-8'))
+    if after:
+        offset, max_journal_id, max_chat_id, token_fingerprint = decode_token(after, 4)
+        if (not all(isinstance(value, int) and not isinstance(value, bool)
+                    for value in (offset, max_journal_id, max_chat_id))
+                or offset < 0 or token_fingerprint != fingerprint):
+            raise InvalidCursor('Invalid cursor')
+    else:
+        offset = 0
+        max_journal_id, max_chat_id = (
+            cursor.execute(f'SELECT COALESCE(MAX(id), 0) FROM {table}').fetchone()[0]
+            for table in ('journal_entries', 'chatbot_conversations')
+        )
+
+    conditions = ['search_index MATCH ?', 'rowid BETWEEN ? AND ?']
+    values = [match, -max_chat_id, max_journal_id]
+    if set(sources) == {'journal'}:
+        conditions.append('rowid > 0')
+    elif set(sources) == {'chat'}:
+        conditions.append('rowid < 0')
+    if since:
+        conditions.append('timestamp >= ?')
+        values.append(since)
+    if until:
+        conditions.append('timestamp < ?')
+        values.append(until)
+
+    cursor.execute(
+        f'''SELECT rowid, rank, timestamp,
+                   snippet(search_index, 0, '<mark>', '</mark>', '…', 16) AS snippet
+            FROM search_index
+            WHERE {' AND '.join(conditions)}
+            ORDER BY rank, rowid
+            LIMIT ? OFFSET ?''',
+        values + [limit + 1, offset]
+    )
+    rows = cursor.fetchall()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    results = [
+        {
+            'source': 'journal' if row['rowid'] > 0 else 'chat',
+            'id': abs(row['rowid']),
+            'timestamp': row['timestamp'],
+            'snippet': row['snippet'],
+            'score': -row['rank']
+        }
+        for row in rows
+    ]
+    next_cursor = (
+        encode_token([offset + limit, max_journal_id, max_chat_id, fingerprint]) if has_more else None
+    )
+    return results, next_cursor
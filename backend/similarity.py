@@ -0,0 +1,141 @@
+"""Per-user "similar entries" index for journal entries
+
+Each entry is kept as a sparse unit vector of its VECTOR_TERMS strongest
+TF-IDF terms (see keywords.rank_terms), with one posting per term in an
+inverted index keyed by (user_id, term) and ordered by weight. Finding the
+entries most similar to one entry reads only the heaviest MAX_POSTINGS
+postings of its QUERY_TERMS strongest terms, so a query's cost is bounded
+however many entries the user has. Postings are read heaviest first because
+they carry most of each term's share of the similarity.
+"""
+import json
+
+import keywords
+from pagination import clamp_limit
+
+VECTOR_TERMS = 32
+QUERY_TERMS = 12
+MAX_POSTINGS = 300  # heaviest postings read per query term
+MIN_SIMILARITY = 0.05
+
+
+def create_similarity_tables(cursor):
+    """Create the entry vector and posting tables"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS journal_vectors (
+            entry_id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            terms TEXT NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS journal_postings (
+            user_id INTEGER NOT NULL,
+            term TEXT NOT NULL,
+            entry_id INTEGER NOT NULL,
+            weight REAL NOT NULL,
+            PRIMARY KEY (user_id, term, entry_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_journal_postings_weight
+        ON journal_postings (user_id, term, weight DESC)
+    ''')
+
+
+def index_entry(cursor, user_id, entry_id, ranked):
+    """
+    Store an entry's vector and postings
+    ranked: the entry's [(term, weight), ...] best first, from keywords.record_entry
+    """
+    vector = ranked[:VECTOR_TERMS]
+    norm = sum(weight * weight for _, weight in vector) ** 0.5
+    vector = [(term, round(weight / norm, 4)) for term, weight in vector] if norm else []
+    cursor.execute(
+        'INSERT OR REPLACE INTO journal_vectors (entry_id, user_id, terms) VALUES (?, ?, ?)',
+        (entry_id, user_id, json.dumps(vector))
+    )
+    cursor.executemany(
+        'INSERT OR REPLACE INTO journal_postings (user_id, term, entry_id, weight) VALUES (?, ?, ?, ?)',
+        [(user_id, term, entry_id, weight) for term, weight in vector]
+    )
+    return vector
+
+
+def rebuild_similarity(cursor, batch_size=500):
+    """Re-index every journal entry against the current document frequencies"""
+    cursor.execute('DELETE FROM journal_vectors')
+    cursor.execute('DELETE FROM journal_postings')
+    global_df = {}
+    for rows in keywords.iter_entry_batches(cursor, batch_size):
+        for entry_id, user_id, _, content in rows:
+            ranked = keywords.rank_terms(
+                cursor, user_id, keywords.extract_terms(content or ''), VECTOR_TERMS, global_df
+            )
+            index_entry(cursor, user_id, entry_id, ranked)
+
+
+def similar_entries(cursor, user_id, entry_id, k=5):
+    """
+    The user's entries written before entry_id that are most similar to it
+    Similarity is the cosine over the query entry's strongest terms. Earlier
+    means an older (timestamp, id); k is clamped to 1..MAX_PAGE_SIZE.
+    Returns: [(entry_id, similarity), ...] best first; empty if the entry is
+    not indexed or not the user's
+    """
+    cursor.execute(
+        '''SELECT v.terms, e.timestamp FROM journal_vectors AS v
+           JOIN journal_entries AS e ON e.id = v.entry_id
+           WHERE v.entry_id = ? AND v.user_id = ?''',
+        (entry_id, user_id)
+    )
+    row = cursor.fetchone()
+    if row is None:
+        return []
+
+    vector = json.loads(row[0])[:QUERY_TERMS]
+    if not vector:
+        return []
+    # One capped, weight-ordered posting scan per query term, summed per entry
+    scans = ' UNION ALL '.join(
+        '''SELECT * FROM (
+               SELECT entry_id, weight * ? AS score FROM journal_postings
+               WHERE user_id = ? AND term = ?
+               ORDER BY weight DESC LIMIT ?
+           )'''
+        for _ in vector
+    )
+    values = []
+    for term, weight in vector:
+        values += [weight, user_id, term, MAX_POSTINGS]
+    cursor.execute(
+        f'''SELECT m.entry_id, m.similarity FROM (
+                SELECT entry_id, SUM(score) AS similarity FROM ({scans})
+                GROUP BY entry_id
+                HAVING similarity >= ?
+            ) AS m
+            JOIN journal_entries AS e ON e.id = m.entry_id
+            WHERE (e.timestamp, e.id) < (?, ?)
+            ORDER BY m.similarity DESC, m.entry_id DESC
+            LIMIT ?''',
+        values + [MIN_SIMILARITY, row[1], entry_id, clamp_limit(k)]
+    )
+    return [(other_id, round(score, 4)) for other_id, score in cursor.fetchall()]
+
+
+def get_similar_entries(cursor, user_id, entry_id, k=5):
+    """similar_entries with each entry's date, excerpt, sentiment and keywords"""
+    matches = similar_entries(cursor, user_id, entry_id, k)
+    if not matches:
+        return []
+    cursor.execute(
+        f'''SELECT id, timestamp, substr(content, 1, 200) AS excerpt, sentiment_score, keywords
+            FROM journal_entries
+            WHERE user_id = ? AND id IN ({', '.join('?' for _ in matches)})''',
+        [user_id] + [other_id for other_id, _ in matches]
+    )
+    entries = {row['id']: dict(row) for row in cursor.fetchall()}
+    return [
+        dict(entries[other_id], similarity=score)
+        for other_id, score in matches if other_id in entries
+    ]
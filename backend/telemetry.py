@@ -0,0 +1,203 @@
+"""Per-trial telemetry for cognitive games
+
+A game's trials are kept as one blob per assessment instead of one row per
+trial: each channel is a packed little-endian array (reaction times as
+float32 milliseconds, outcomes as int16, 1 for a correct trial), stored one
+after the other, optionally zlib-compressed. Reading a game back is a
+np.frombuffer view per channel over the stored (or decompressed) bytes, so
+the trial data is never copied into Python objects.
+"""
+import zlib
+
+# channel -> dtype, in blob order
+CHANNELS = {
+    'reaction_times': '<f4',
+    'correct': '<i2'
+}
+MAX_REACTION_TIME_MS = 60000
+
+
+class InvalidTelemetry(ValueError):
+    """Raised when submitted trial arrays cannot be stored"""
+
+
+def create_telemetry_table(cursor):
+    """Create the cognitive_telemetry table"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cognitive_telemetry (
+            assessment_id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            trials INTEGER NOT NULL,
+            encoding TEXT NOT NULL,
+            data BLOB NOT NULL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (assessment_id) REFERENCES cognitive_assessments (id),
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_cognitive_telemetry_user ON cognitive_telemetry (user_id, assessment_id)'
+    )
+
+
+def validate_trials(data, max_trials):
+    """
+    Check submitted trial arrays
+    data: {'reaction_times': [...], 'correct': [...] (optional, default all 1)}
+    Returns: {channel: array} in CHANNELS order
+    """
+    import numpy as np  # deferred so importing the app stays cheap
+
+    if not isinstance(data, dict):
+        raise InvalidTelemetry('Expected an object of trial arrays')
+    reaction_times = data.get('reaction_times')
+    if not isinstance(reaction_times, list) or not reaction_times:
+        raise InvalidTelemetry('reaction_times must be a non-empty array')
+    if len(reaction_times) > max_trials:
+        raise InvalidTelemetry(f'At most {max_trials} trials per game')
+    correct = data.get('correct', [1] * len(reaction_times))
+    if not isinstance(correct, list) or len(correct) != len(reaction_times):
+        raise InvalidTelemetry('correct must be an array with one value per trial')
+
+    try:
+        times = np.array(reaction_times, dtype=np.float64)
+        outcomes = np.array(correct, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise InvalidTelemetry('Trial values must be numbers')
+    if not np.isfinite(times).all() or (times < 0).any() or (times > MAX_REACTION_TIME_MS).any():
+        raise InvalidTelemetry(f'reaction_times must be between 0 and {MAX_REACTION_TIME_MS} ms')
+    if not np.isin(outcomes, (0, 1)).all():
+        raise InvalidTelemetry('correct values must be 0 or 1')
+    return {
+        'reaction_times': times.astype(CHANNELS['reaction_times']),
+        'correct': outcomes.astype(CHANNELS['correct'])
+    }
+
+
+def pack_trials(channels, compress=True):
+    """Returns: (encoding, blob) for validated channel arrays"""
+    raw = b''.join(channels[name].astype(dtype, copy=False).tobytes() for name, dtype in CHANNELS.items())
+    if compress:
+        packed = zlib.compress(raw, 6)
+        if len(packed) < len(raw):
+            return 'zlib', packed
+    return 'raw', raw
+
+
+def unpack_trials(encoding, trials, data):
+    """Returns: {channel: read-only array view over the blob}"""
+    import numpy as np
+
+    if encoding == 'zlib':
+        data = zlib.decompress(data)
+    elif encoding != 'raw':
+        raise ValueError(f'Unknown telemetry encoding: {encoding}')
+    channels, offset = {}, 0
+    for name, dtype in CHANNELS.items():
+        channels[name] = np.frombuffer(data, dtype=dtype, count=trials, offset=offset)
+        offset += trials * np.dtype(dtype).itemsize
+    return channels
+
+
+def store_telemetry(cursor, assessment_id, user_id, channels, compress=True):
+    """Store a game's trials; returns the stored size in bytes"""
+    encoding, data = pack_trials(channels, compress)
+    cursor.execute(
+        '''INSERT OR REPLACE INTO cognitive_telemetry (assessment_id, user_id, trials, encoding, data)
+           VALUES (?, ?, ?, ?, ?)''',
+        (assessment_id, user_id, len(channels['reaction_times']), encoding, data)
+    )
+    return len(data)
+
+
+def summarize_trials(reaction_times, correct):
+    """
+    Reaction-time distribution of the correct trials and the share correct
+    isd is the intra-individual standard deviation, cv the same relative to
+    the mean; both None with fewer than two correct trials
+    """
+    return summarize_games([reaction_times], [correct])[0]
+
+
+def summarize_games(reaction_times, correct):
+    """
+    summarize_trials for many games at once, with segment reductions over
+    the concatenated trials instead of a NumPy call per game
+    reaction_times, correct: one array per game
+    """
+    import numpy as np
+
+    games = len(reaction_times)
+    trials = np.array([len(times) for times in reaction_times])
+    game = np.repeat(np.arange(games), trials)
+    outcomes = np.concatenate(correct).astype(np.float64)
+    hit = outcomes == 1
+    times = np.concatenate(reaction_times).astype(np.float64)[hit]
+    game_hits = game[hit]
+
+    accuracy = np.bincount(game, weights=outcomes, minlength=games) / np.maximum(trials, 1)
+    hits = np.bincount(game_hits, minlength=games)
+    mean = np.bincount(game_hits, weights=times, minlength=games) / np.maximum(hits, 1)
+    squares = np.bincount(game_hits, weights=(times - mean[game_hits]) ** 2, minlength=games)
+    isd = np.sqrt(squares / np.maximum(hits - 1, 1))
+
+    # Each game's correct times in order; quantiles interpolate like np.percentile
+    ordered = times[np.lexsort((times, game_hits))]
+    offsets = np.cumsum(hits) - hits
+
+    def quantile(q):
+        position = q * np.maximum(hits - 1, 0)
+        low = np.floor(position).astype(int)
+        high = np.minimum(low + 1, np.maximum(hits - 1, 0))
+        if not len(ordered):
+            return np.zeros(games)
+        first = ordered[np.minimum(offsets + low, len(ordered) - 1)]
+        second = ordered[np.minimum(offsets + high, len(ordered) - 1)]
+        return first + (second - first) * (position - low)
+
+    q25, median, q75 = quantile(0.25), quantile(0.5), quantile(0.75)
+    summaries = []
+    for i in range(games):
+        summary = {
+            'trials': int(trials[i]),
+            'accuracy': round(float(accuracy[i]), 3) if trials[i] else None,
+            'median_rt': None, 'iqr_rt': None, 'isd_rt': None, 'cv_rt': None
+        }
+        if hits[i]:
+            summary.update(median_rt=round(float(median[i]), 1), iqr_rt=round(float(q75[i] - q25[i]), 1))
+        if hits[i] > 1:
+            summary.update(isd_rt=round(float(isd[i]), 1),
+                           cv_rt=round(float(isd[i] / mean[i]), 3) if mean[i] else None)
+        summaries.append(summary)
+    return summaries
+
+
+def get_telemetry_summaries(cursor, user_id, game_type=None, limit=20):
+    """
+    Summaries of the user's latest games with telemetry, newest first, plus
+    one over all of their trials pooled
+    Returns: (games, pooled)
+    """
+    import numpy as np
+
+    where, params = ('AND a.game_type = ?', (game_type,)) if game_type else ('', ())
+    cursor.execute(
+        f'''SELECT t.assessment_id, t.trials, t.encoding, t.data, a.game_type, a.timestamp
+            FROM cognitive_telemetry t
+            JOIN cognitive_assessments a ON a.id = t.assessment_id
+            WHERE t.user_id = ? {where}
+            ORDER BY t.assessment_id DESC
+            LIMIT ?''',
+        (user_id,) + params + (limit,)
+    )
+    rows = cursor.fetchall()
+    if not rows:
+        return [], None
+    channels = [unpack_trials(row['encoding'], row['trials'], row['data']) for row in rows]
+    times = [game['reaction_times'] for game in channels]
+    correct = [game['correct'] for game in channels]
+    games = [
+        dict(summary, assessment_id=row['assessment_id'], game_type=row['game_type'], timestamp=row['timestamp'])
+        for summary, row in zip(summarize_games(times, correct), rows)
+    ]
+    return games, summarize_trials(np.concatenate(times), np.concatenate(correct))
@@ -0,0 +1,108 @@
+"""Materialized per-user "latest state" snapshot
+
+The dashboard, recommendations and chatbot all need the newest health, mood
+and cognitive rows plus a couple of counters. Writers keep one user_state row
+per user current, so those reads become a single primary-key lookup.
+"""
+import json
+
+# snapshot column -> source table
+LATEST_SOURCES = {
+    'latest_health': 'health_metrics',
+    'latest_mood': 'mood_assessments',
+    'latest_cognitive': 'cognitive_assessments'
+}
+
+
+def create_user_state_table(cursor):
+    """Create the user_state snapshot table"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_state (
+            user_id INTEGER PRIMARY KEY,
+            latest_health TEXT,
+            latest_mood TEXT,
+            latest_cognitive TEXT,
+            unread_alerts INTEGER NOT NULL DEFAULT 0,
+            conversation_count INTEGER NOT NULL DEFAULT 0,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+
+
+def _latest_row(cursor, table, user_id):
+    cursor.execute(
+        f'SELECT * FROM {table} WHERE user_id = ? ORDER BY timestamp DESC, id DESC LIMIT 1',
+        (user_id,)
+    )
+    row = cursor.fetchone()
+    return json.dumps(dict(row)) if row else None
+
+
+def rebuild_user_state(cursor, user_id):
+    """Recompute a user's snapshot from the source tables"""
+    latest = {column: _latest_row(cursor, table, user_id) for column, table in LATEST_SOURCES.items()}
+    cursor.execute(
+        'SELECT COUNT(*) FROM alerts WHERE user_id = ? AND acknowledged = 0', (user_id,)
+    )
+    unread_alerts = cursor.fetchone()[0]
+    cursor.execute(
+        'SELECT COUNT(*) FROM chatbot_conversations WHERE user_id = ?', (user_id,)
+    )
+    conversation_count = cursor.fetchone()[0]
+    cursor.execute(
+        '''INSERT OR REPLACE INTO user_state
+           (user_id, latest_health, latest_mood, latest_cognitive,
+            unread_alerts, conversation_count)
+           VALUES (?, ?, ?, ?, ?, ?)''',
+        (user_id, latest['latest_health'], latest['latest_mood'],
+         latest['latest_cognitive'], unread_alerts, conversation_count)
+    )
+
+
+def refresh_latest(cursor, user_id, table):
+    """Refresh the snapshot after rows were written to a source table"""
+    column = next(c for c, t in LATEST_SOURCES.items() if t == table)
+    cursor.execute(
+        f'UPDATE user_state SET {column} = ? WHERE user_id = ?',
+        (_latest_row(cursor, table, user_id), user_id)
+    )
+    if cursor.rowcount == 0:
+        rebuild_user_state(cursor, user_id)
+
+
+def adjust_counter(cursor, user_id, column, delta):
+    """Add delta to one of the snapshot counters"""
+    cursor.execute(
+        f'UPDATE user_state SET {column} = MAX({column} + ?, 0) WHERE user_id = ?',
+        (delta, user_id)
+    )
+    if cursor.rowcount == 0:
+        rebuild_user_state(cursor, user_id)
+
+
+def reset_counter(cursor, user_id, column):
+    """Reset one of the snapshot counters to zero"""
+    cursor.execute(f'UPDATE user_state SET {column} = 0 WHERE user_id = ?', (user_id,))
+    if cursor.rowcount == 0:
+        rebuild_user_state(cursor, user_id)
+
+
+def get_user_state(cursor, user_id):
+    """
+    Read a user's snapshot with one primary-key lookup
+    Returns: dict with 'health', 'mood', 'cognitive' (row dicts or None),
+    'unread_alerts' and 'conversation_count'
+    """
+    cursor.execute('SELECT * FROM user_state WHERE user_id = ?', (user_id,))
+    row = cursor.fetchone()
+    if row is None:
+        rebuild_user_state(cursor, user_id)
+        cursor.execute('SELECT * FROM user_state WHERE user_id = ?', (user_id,))
+        row = cursor.fetchone()
+    return {
+        'health': json.loads(row['latest_health']) if row['latest_health'] else None,
+        'mood': json.loads(row['latest_mood']) if row['latest_mood'] else None,
+        'cognitive': json.loads(row['latest_cognitive']) if row['latest_cognitive'] else None,
+        'unread_alerts': row['unread_alerts'],
+        'conversation_count': row['conversation_count']
+    }
@@ -9,6 +9,8 @@ export default function MemoryGame({ onComplete }) {
   const [matched, setMatched] = useState([])
   const [moves, setMoves] = useState(0)
   const [startTime, setStartTime] = useState(null)
+  const [lastMoveTime, setLastMoveTime] = useState(null)
+  const [trials, setTrials] = useState({ reaction_times: [], correct: [] })
   const [gameComplete, setGameComplete] = useState(false)
 
   useEffect(() => {
@@ -24,7 +26,7 @@ export default function MemoryGame({ onComplete }) {
       
       setGameComplete(true)
       setTimeout(() => {
-        onComplete(score, timeTaken * 1000, accuracy)
+        onComplete(score, timeTaken * 1000, accuracy, trials)
       }, 1500)
     }
   }, [matched])
@@ -39,6 +41,8 @@ export default function MemoryGame({ onComplete }) {
     setMatched([])
     setMoves(0)
     setStartTime(Date.now())
+    setLastMoveTime(Date.now())
+    setTrials({ reaction_times: [], correct: [] })
     setGameComplete(false)
   }
 
@@ -54,7 +58,14 @@ export default function MemoryGame({ onComplete }) {
       setMoves(moves + 1)
       
       const [first, second] = newFlipped
-      if (cards[first].emoji === cards[second].emoji) {
+      const isMatch = cards[first].emoji === cards[second].emoji
+      const now = Date.now()
+      setTrials({
+        reaction_times: [...trials.reaction_times, now - lastMoveTime],
+        correct: [...trials.correct, isMatch ? 1 : 0]
+      })
+      setLastMoveTime(now)
+      if (isMatch) {
         setMatched([...matched, first, second])
         setFlipped([])
       } else {
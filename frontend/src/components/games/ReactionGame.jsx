@@ -6,6 +6,7 @@ export default function ReactionGame({ onComplete }) {
   const [reactionTimes, setReactionTimes] = useState([])
   const [startTime, setStartTime] = useState(null)
   const [round, setRound] = useState(0)
+  const [trials, setTrials] = useState({ reaction_times: [], correct: [] })
   const totalRounds = 5
 
   const startGame = () => {
@@ -20,6 +21,10 @@ export default function ReactionGame({ onComplete }) {
 
   const handleClick = () => {
     if (gameState === 'waiting') {
+      setTrials({
+        reaction_times: [...trials.reaction_times, 0],
+        correct: [...trials.correct, 0]
+      })
       setGameState('ready')
       alert('Too early! Wait for the green screen.')
       return
@@ -29,6 +34,11 @@ export default function ReactionGame({ onComplete }) {
       const reactionTime = Date.now() - startTime
       const newTimes = [...reactionTimes, reactionTime]
       setReactionTimes(newTimes)
+      const newTrials = {
+        reaction_times: [...trials.reaction_times, reactionTime],
+        correct: [...trials.correct, 1]
+      }
+      setTrials(newTrials)
       
       if (round + 1 >= totalRounds) {
         const avgTime = newTimes.reduce((a, b) => a + b, 0) / newTimes.length
@@ -37,7 +47,7 @@ export default function ReactionGame({ onComplete }) {
         
         setGameState('result')
         setTimeout(() => {
-          onComplete(Math.round(score), avgTime, accuracy)
+          onComplete(Math.round(score), avgTime, accuracy, newTrials)
         }, 2000)
       } else {
         setRound(round + 1)
@@ -49,6 +59,7 @@ export default function ReactionGame({ onComplete }) {
   const reset = () => {
     setGameState('ready')
     setReactionTimes([])
+    setTrials({ reaction_times: [], correct: [] })
     setRound(0)
   }
 
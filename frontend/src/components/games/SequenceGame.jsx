@@ -8,6 +8,8 @@ export default function SequenceGame({ onComplete }) {
   const [level, setLevel] = useState(1)
   const [score, setScore] = useState(0)
   const [showingIndex, setShowingIndex] = useState(-1)
+  const [lastInputTime, setLastInputTime] = useState(null)
+  const [trials, setTrials] = useState({ reaction_times: [], correct: [] })
 
   const startGame = () => {
     const newSequence = Array.from({ length: level + 2 }, () => Math.floor(Math.random() * 9) + 1)
@@ -24,6 +26,7 @@ export default function SequenceGame({ onComplete }) {
       setShowingIndex(-1)
       await new Promise(resolve => setTimeout(resolve, 300))
     }
+    setLastInputTime(Date.now())
     setGameState('input')
   }
 
@@ -33,14 +36,23 @@ export default function SequenceGame({ onComplete }) {
     const newInput = [...userInput, num]
     setUserInput(newInput)
 
-    if (newInput[newInput.length - 1] !== sequence[newInput.length - 1]) {
+    const isCorrect = newInput[newInput.length - 1] === sequence[newInput.length - 1]
+    const now = Date.now()
+    const newTrials = {
+      reaction_times: [...trials.reaction_times, now - lastInputTime],
+      correct: [...trials.correct, isCorrect ? 1 : 0]
+    }
+    setTrials(newTrials)
+    setLastInputTime(now)
+
+    if (!isCorrect) {
       setGameState('wrong')
       const finalScore = score
       const avgTime = 500
       const accuracy = (score / (level * 10)) * 100
       
       setTimeout(() => {
-        onComplete(finalScore, avgTime, accuracy)
+        onComplete(finalScore, avgTime, accuracy, newTrials)
       }, 1500)
       return
     }
@@ -56,7 +68,7 @@ export default function SequenceGame({ onComplete }) {
           const avgTime = 500
           const accuracy = 100
           setTimeout(() => {
-            onComplete(newScore, avgTime, accuracy)
+            onComplete(newScore, avgTime, accuracy, newTrials)
           }, 1500)
         }, 1000)
       } else {
@@ -74,6 +86,7 @@ export default function SequenceGame({ onComplete }) {
     setGameState('ready')
     setLevel(1)
     setScore(0)
+    setTrials({ reaction_times: [], correct: [] })
   }
 
   return (
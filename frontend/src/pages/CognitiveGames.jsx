@@ -9,6 +9,7 @@ export default function CognitiveGames() {
   const [selectedGame, setSelectedGame] = useState(null)
   const [assessment, setAssessment] = useState(null)
   const [loading, setLoading] = useState(true)
+  const [lastResult, setLastResult] = useState(null)
 
   useEffect(() => {
     fetchAssessment()
@@ -25,15 +26,20 @@ export default function CognitiveGames() {
     }
   }
 
-  const handleGameComplete = async (gameType, score, reactionTime, accuracy) => {
+  const handleGameComplete = async (gameType, score, reactionTime, accuracy, trials) => {
     try {
-      await axios.post('/api/cognitive/game-result', {
+      const response = await axios.post('/api/cognitive/game-result', {
         game_type: gameType,
         score,
         reaction_time: reactionTime,
         accuracy,
         difficulty_level: 1
       })
+      if (trials?.reaction_times?.length) {
+        await axios.post(`/api/cognitive/game-result/${response.data.assessment_id}/telemetry`, trials)
+          .catch((error) => console.error('Error submitting game telemetry:', error))
+      }
+      setLastResult({ gameType, ...response.data.analysis })
       fetchAssessment()
       setSelectedGame(null)
     } catch (error) {
@@ -79,8 +85,8 @@ export default function CognitiveGames() {
           ← Back to Games
         </button>
         <GameComponent
-          onComplete={(score, reactionTime, accuracy) => 
-            handleGameComplete(selectedGame.id, score, reactionTime, accuracy)
+          onComplete={(score, reactionTime, accuracy, trials) => 
+            handleGameComplete(selectedGame.id, score, reactionTime, accuracy, trials)
           }
         />
       </div>
@@ -94,6 +100,23 @@ export default function CognitiveGames() {
         <p className="text-gray-600 mt-1">Train your brain and track cognitive performance</p>
       </div>
 
+      {/* Last Game Result */}
+      {lastResult && (
+        <div className="card bg-blue-50 border-blue-200">
+          <h3 className="text-lg font-semibold text-gray-900 mb-2">
+            Last Game: {games.find((game) => game.id === lastResult.gameType)?.name || lastResult.gameType}
+          </h3>
+          <p className="text-gray-700">
+            Score {Math.round(lastResult.cognitive_score * 100)} · {lastResult.performance_level}
+          </p>
+          {lastResult.population_percentile !== null && lastResult.population_percentile !== undefined && (
+            <p className="text-sm text-gray-600 mt-1">
+              Better than {Math.round(lastResult.population_percentile)}% of {lastResult.population_size.toLocaleString()} games played at this level
+            </p>
+          )}
+        </div>
+      )}
+
       {/* Assessment Summary */}
       {assessment?.summary && (
         <div className="card bg-gradient-to-br from-purple-50 to-blue-50 border-purple-200">
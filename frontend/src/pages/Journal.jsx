@@ -1,15 +1,21 @@
 import React, { useState, useEffect } from 'react'
 import axios from '../utils/axios'
-import { BookOpen, Plus, Calendar, Smile, Meh, Frown } from 'lucide-react'
+import { BookOpen, Plus, Calendar, Smile, Meh, Frown, Search } from 'lucide-react'
 
 export default function Journal() {
   const [entries, setEntries] = useState([])
+  const [themes, setThemes] = useState([])
+  const [query, setQuery] = useState('')
+  const [results, setResults] = useState(null)
+  const [nextCursor, setNextCursor] = useState(null)
+  const [similar, setSimilar] = useState([])
   const [showForm, setShowForm] = useState(false)
   const [content, setContent] = useState('')
   const [loading, setLoading] = useState(false)
 
   useEffect(() => {
     fetchEntries()
+    fetchThemes()
   }, [])
 
   const fetchEntries = async () => {
@@ -21,16 +27,59 @@ export default function Journal() {
     }
   }
 
+  const fetchThemes = async () => {
+    try {
+      const response = await axios.get('/api/journal/themes', { params: { days: 30, limit: 8 } })
+      setThemes(response.data.themes || [])
+    } catch (error) {
+      console.error('Error fetching themes:', error)
+    }
+  }
+
+  const runSearch = async (e, after = null) => {
+    if (e) e.preventDefault()
+    if (!query.trim()) {
+      setResults(null)
+      return
+    }
+    try {
+      const response = await axios.get('/api/journal/search', {
+        params: { q: query, sources: 'journal,chat', limit: 10, after }
+      })
+      const found = response.data.results || []
+      setResults(after ? [...(results || []), ...found] : found)
+      setNextCursor(response.data.next_cursor)
+    } catch (error) {
+      console.error('Error searching:', error)
+      setResults([])
+      setNextCursor(null)
+    }
+  }
+
+  // Snippets mark matches with <mark>…</mark>; render them without innerHTML
+  const renderSnippet = (snippet) =>
+    (snippet || '').split(/(<mark>.*?<\/mark>)/).map((part, index) =>
+      part.startsWith('<mark>') ? (
+        <mark key={index} className="bg-yellow-200 rounded px-0.5">
+          {part.slice(6, -7)}
+        </mark>
+      ) : (
+        part
+      )
+    )
+
   const handleSubmit = async (e) => {
     e.preventDefault()
     if (!content.trim()) return
 
     setLoading(true)
     try {
-      await axios.post('/api/journal/entry', { content })
+      const response = await axios.post('/api/journal/entry', { content })
+      setSimilar(response.data.similar || [])
       setContent('')
       setShowForm(false)
       fetchEntries()
+      fetchThemes()
     } catch (error) {
       console.error('Error creating entry:', error)
     } finally {
@@ -50,6 +99,12 @@ export default function Journal() {
     return 'bg-red-50 border-red-200'
   }
 
+  const getSectionColor = (score) => {
+    if (score >= 0.6) return 'bg-green-400'
+    if (score >= 0.4) return 'bg-yellow-400'
+    return 'bg-red-400'
+  }
+
   return (
     <div className="space-y-6 animate-fadeIn">
       <div className="flex items-center justify-between">
@@ -105,6 +160,84 @@ export default function Journal() {
         </div>
       )}
 
+      {/* Past entries similar to the one just written */}
+      {similar.length > 0 && (
+        <div className="card bg-blue-50 border-blue-200">
+          <div className="flex items-center justify-between mb-3">
+            <h3 className="text-lg font-semibold text-gray-900">You wrote something similar before</h3>
+            <button onClick={() => setSimilar([])} className="text-sm text-gray-500">
+              Dismiss
+            </button>
+          </div>
+          <div className="space-y-3">
+            {similar.map((entry) => (
+              <div key={entry.id} className="border-l-4 border-blue-200 pl-3">
+                <p className="text-xs text-gray-500 mb-1">
+                  {new Date(entry.timestamp).toLocaleDateString()} · mood{' '}
+                  {Math.round((entry.sentiment_score || 0.5) * 100)}
+                </p>
+                <p className="text-sm text-gray-800">{entry.excerpt}</p>
+              </div>
+            ))}
+          </div>
+        </div>
+      )}
+
+      {/* Search journal entries and chat history */}
+      <div className="card">
+        <form onSubmit={runSearch} className="flex space-x-3">
+          <input
+            type="text"
+            value={query}
+            onChange={(e) => setQuery(e.target.value)}
+            placeholder="Search your journal and conversations..."
+            className="input flex-1"
+          />
+          <button type="submit" className="btn btn-secondary flex items-center space-x-2">
+            <Search size={18} />
+            <span>Search</span>
+          </button>
+        </form>
+
+        {results && (
+          <div className="mt-4 space-y-3">
+            {results.length === 0 && <p className="text-sm text-gray-600">No matches found.</p>}
+            {results.map((result) => (
+              <div key={`${result.source}-${result.id}`} className="border-l-4 border-purple-200 pl-3">
+                <p className="text-xs text-gray-500 mb-1">
+                  {result.source === 'chat' ? 'Conversation' : 'Journal'} ·{' '}
+                  {new Date(result.timestamp).toLocaleDateString()}
+                </p>
+                <p className="text-sm text-gray-800">{renderSnippet(result.snippet)}</p>
+              </div>
+            ))}
+            {nextCursor && (
+              <button onClick={() => runSearch(null, nextCursor)} className="btn btn-secondary">
+                More results
+              </button>
+            )}
+          </div>
+        )}
+      </div>
+
+      {/* Recurring themes over the last 30 days */}
+      {themes.length > 0 && (
+        <div className="card">
+          <h3 className="text-lg font-semibold text-gray-900 mb-3">Recurring Themes (30 days)</h3>
+          <div className="flex flex-wrap gap-2">
+            {themes.map((theme) => (
+              <span
+                key={theme.term}
+                className="badge badge-info"
+                title={`${theme.entries} entries on ${theme.days} days`}
+              >
+                {theme.term}
+              </span>
+            ))}
+          </div>
+        </div>
+      )}
+
       {/* Journal Entries */}
       <div className="space-y-4">
         {entries.length > 0 ? (
@@ -148,6 +281,33 @@ export default function Journal() {
                   ))}
                 </div>
               )}
+
+              {entry.keywords && JSON.parse(entry.keywords).length > 0 && (
+                <div className="mt-3 flex flex-wrap gap-2">
+                  {JSON.parse(entry.keywords).map((keyword) => (
+                    <span key={keyword} className="text-xs text-gray-500">
+                      #{keyword}
+                    </span>
+                  ))}
+                </div>
+              )}
+
+              {/* Mood through long entries, one segment per section */}
+              {entry.sections && JSON.parse(entry.sections).length > 1 && (
+                <div className="mt-4">
+                  <p className="text-xs font-medium text-gray-600 mb-1">Mood through this entry</p>
+                  <div className="flex h-3 rounded overflow-hidden">
+                    {JSON.parse(entry.sections).map((section) => (
+                      <div
+                        key={section.index}
+                        className={getSectionColor(section.mood_score)}
+                        style={{ flexGrow: section.end - section.start }}
+                        title={`Section ${section.index + 1}: ${Math.round(section.mood_score * 100)}`}
+                      />
+                    ))}
+                  </div>
+                </div>
+              )}
             </div>
           ))
         ) : (